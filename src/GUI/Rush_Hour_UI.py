@@ -1,11 +1,20 @@
 # Creating UI as described in the documentation of the project desing using pygame
 import setup_path # NOQA
 
-import pygame
-import time
+import logging
+import os
+import queue
 import random
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pygame
+from PIL import Image
 from stable_baselines3 import PPO
-from GUI.board_to_image import generate_board_image,letter_to_color
+from GUI.board_to_image import letter_to_color, render_batch
+from environments.init_boards_from_database import CACHE_FOLDER_NAME, default_database_folder
 from environments.rush_hour_env import RushHourEnv
 from utils.config import MODEL_PATH
 # Constants
@@ -19,21 +28,115 @@ WINDOW_HEIGHT = TITLE_HEIGHT + GRID_ROWS * (TILE_SIZE + PADDING) + PADDING
 FONT_NAME = "arial"
 GRAY = (128, 128, 128)
 
-# Load boards
+THUMBNAIL_SCALE = 10
+THUMBNAILS_FOLDER_NAME = "thumbnails"
+
+logger = logging.getLogger(__name__)
+
+
+# Load boards and thumbnails in the background
+
+class ThumbnailLoader:
+    """
+    Picks the sample boards and produces their thumbnails in a background thread, so
+    the window opens before the test boards are loaded.
+
+    Thumbnails are cached on disk by board hash (`Board.get_zobrist_hash`), size and
+    render scale; the missing ones are rendered together (`render_batch`) and saved.
+    `boards[i]` is None until the boards are picked, and `poll` hands over the finished
+    thumbnails. Failures are logged, and a board whose thumbnail fails keeps its placeholder.
+
+    Args:
+        count (int): The number of sample boards.
+        cache_folder: Folder of the on-disk cache. Defaults to `database/.cache/thumbnails`.
+    """
+
+    def __init__(self, count, cache_folder=None):
+        if cache_folder is None:
+            cache_folder = Path(default_database_folder()) / CACHE_FOLDER_NAME / THUMBNAILS_FOLDER_NAME
+        self.cache_folder = Path(cache_folder)
+        self.count = count
+        self.boards = [None] * count
+        self._ready = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def poll(self):
+        """
+        The (index, RGB array) thumbnails finished since the last call.
+        """
+        ready = []
+        while True:
+            try:
+                ready.append(self._ready.get_nowait())
+            except queue.Empty:
+                return ready
+
+    def loaded_boards(self):
+        return [board for board in self.boards if board is not None]
+
+    def _path(self, board):
+        name = f"{board.get_zobrist_hash():016x}-{TILE_SIZE}-{THUMBNAIL_SCALE}.png"
+        return self.cache_folder / name
+
+    def _run(self):
+        try:
+            boards = random.sample(RushHourEnv.test_boards, self.count)
+        except Exception:
+            logger.exception("Could not pick the sample boards")
+            return
+        self.boards[:] = boards
+
+        missing = []
+        for index, board in enumerate(boards):
+            try:
+                with Image.open(self._path(board)) as img:
+                    self._ready.put((index, np.asarray(img.convert("RGB"))))
+            except FileNotFoundError:
+                missing.append(index)
+            except Exception:
+                logger.exception("Could not read the cached thumbnail of board %d", index)
+                missing.append(index)
+        if not missing:
+            return
+
+        # Render all the missing boards small and resized to a tile at once
+        try:
+            images = render_batch([boards[index] for index in missing], scale=THUMBNAIL_SCALE,
+                                  size=(TILE_SIZE, TILE_SIZE))
+        except Exception:
+            logger.exception("Could not render the thumbnails of %d boards", len(missing))
+            return
+        for index, img in zip(missing, images):
+            self._ready.put((index, img))
+            try:
+                self._save(boards[index], img)
+            except Exception:
+                logger.exception("Could not cache the thumbnail of board %d", index)
+
+    def _save(self, board, img):
+        path = self._path(board)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        Image.fromarray(img).save(tmp_path, format="PNG")
+        os.replace(tmp_path, path)
+
 
-sample_boards = random.sample(RushHourEnv.test_boards, GRID_COLS * GRID_ROWS)
-# Generate thumbnails (board_to_image returns PIL.Image)
+def thumbnail_surface(img):
+    return pygame.image.fromstring(img.tobytes(), (TILE_SIZE, TILE_SIZE), "RGB")
 
 
-def generate_thumbnails():
-    thumbnails = []
-    for board in sample_boards:
-        # Generate a PIL image from the board (scale down for thumbnails)
-        img = generate_board_image(board, scale=10, draw_letters=False)
-        img = img.resize((TILE_SIZE, TILE_SIZE))  # TILE_SIZE is 60
-        thumbnails.append(pygame.image.fromstring(
-            img.tobytes(), img.size, img.mode))
-    return thumbnails
+def draw_placeholder(screen, rect, font):
+    """
+    Stand-in for a thumbnail that is not ready yet.
+    """
+    pygame.draw.rect(screen, (220, 220, 220), rect)
+    pygame.draw.rect(screen, GRAY, rect, 1)
+    dots = font.render("...", True, GRAY)
+    screen.blit(dots, dots.get_rect(center=rect.center))
 
 # Solve the selected board
 
@@ -102,8 +205,9 @@ def main():
     font = pygame.font.SysFont(FONT_NAME, 18)
 
     big_font = pygame.font.SysFont(FONT_NAME, 28)
-    model = PPO.load(MODEL_PATH)
-    thumbnails = generate_thumbnails()
+    model = None  # Loaded on the first solve
+    loader = ThumbnailLoader(GRID_COLS * GRID_ROWS).start()
+    thumbnails = [None] * loader.count
 
     # Prepare level button rects
     buttons = []
@@ -124,9 +228,14 @@ def main():
             "Select level or generate one", True, (0, 0, 0))
         screen.blit(title_text, (PADDING, 20))
 
-        # Draw all thumbnails
+        # Draw all thumbnails, with placeholders until they are ready
+        for idx, img in loader.poll():
+            thumbnails[idx] = thumbnail_surface(img)
         for idx, thumb in enumerate(thumbnails):
-            screen.blit(thumb, buttons[idx].topleft)
+            if thumb is None:
+                draw_placeholder(screen, buttons[idx], font)
+            else:
+                screen.blit(thumb, buttons[idx].topleft)
             level_label = font.render(f"Level 1-{idx+1}", True, (0, 0, 0))
             screen.blit(
                 level_label, (buttons[idx].x, buttons[idx].y + TILE_SIZE + 2))
@@ -143,13 +252,16 @@ def main():
                 running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 pos = event.pos
-                if question_rect.collidepoint(pos):
+                if model is None and (question_rect.collidepoint(pos)
+                                      or any(rect.collidepoint(pos) for rect in buttons)):
+                    model = PPO.load(MODEL_PATH)
+                if question_rect.collidepoint(pos) and loader.loaded_boards():
                     print("🎲 Random board")
-                    solve_board(screen, model, random.choice(sample_boards))
+                    solve_board(screen, model, random.choice(loader.loaded_boards()))
                 for i, rect in enumerate(buttons):
-                    if rect.collidepoint(pos):
+                    if rect.collidepoint(pos) and loader.boards[i] is not None:
                         print(f"▶️ Solving level {i+1}")
-                        solve_board(screen, model, sample_boards[i])
+                        solve_board(screen, model, loader.boards[i])
 
     pygame.quit()
 
@@ -1,6 +1,11 @@
 """
 This module provides functions to generate images and videos from board states.
 """
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from types import SimpleNamespace
+
 import numpy as np
 import imageio.v2 as imageio
 from PIL import Image, ImageDraw, ImageFont
@@ -94,6 +99,304 @@ def generate_board_image(board, scale: int = 50, draw_letters: bool = False) ->
     return img
 
 
+def nearest_samples(src: int, dst: int) -> np.ndarray:
+    """
+    The source index of every output pixel of a `Image.NEAREST` resize along one axis.
+
+    Pillow steps through the source by adding `src / dst` once per pixel from the
+    center of the first one, so the rounding of the running sum decides ties; the
+    sequential `cumsum` reproduces it exactly.
+
+    Args:
+        src (int): Source length in pixels.
+        dst (int): Output length in pixels.
+
+    Returns:
+        numpy.ndarray: The `dst` source indices.
+    """
+    steps = np.full(dst, src / dst)
+    steps[0] /= 2
+    return np.minimum(np.cumsum(steps).astype(np.intp), src - 1)
+
+
+def code_palette() -> np.ndarray:
+    """
+    The colors of the board cells by letter code, as in `generate_board_image`.
+
+    Returns:
+        numpy.ndarray: A (256, 3) `uint8` array; code 0 is an empty cell and codes
+        without a color in `letter_to_color` are gray.
+    """
+    palette = np.empty((256, 3), dtype=np.uint8)
+    palette[:] = GRAY
+    for letter, color in letter_to_color.items():
+        palette[ord(letter) if letter else 0] = color
+    return palette
+
+
+class TileAtlas:
+    """
+    Renders boards of one layout by indexing precomputed pixel tables with the code grid.
+
+    Every pixel of a frame is either inside a board cell, and takes the color of the
+    cell's letter code, or part of the static layout (grid lines, exit marker and
+    padding), which never changes. The tables record the cell of every pixel and the
+    static colors, so a frame is a single lookup instead of drawing.
+
+    At the native size the frames are bit-identical to `generate_board_image` without
+    letters. With an output `size` they are bit-identical to
+    `generate_board_image(...).resize(size, Image.NEAREST)`; the default bicubic resize
+    blurs the tile edges and grid lines instead, with the same layout and colors.
+
+    Args:
+        rows (int): Board rows.
+        cols (int): Board columns.
+        win_x (int): Row of the exit.
+        win_y (int): Column of the exit.
+        scale (int): Size of each tile in pixels, before resizing.
+        size (tuple): Optional output (width, height).
+    """
+
+    def __init__(self, rows: int, cols: int, win_x: int, win_y: int, scale: int = 50, size=None):
+        self.rows = rows
+        self.cols = cols
+        self.scale = scale
+
+        # Two renders whose cells all differ in color: the pixels that do not change are static
+        def layout(letter):
+            board = np.full((rows, cols), letter, dtype=object)
+            return np.asarray(generate_board_image(
+                SimpleNamespace(board=board, win_x=win_x, win_y=win_y), scale))
+
+        empty, full = layout(""), layout("X")
+        height, width = empty.shape[:2]
+        if size is not None:
+            ys, xs = nearest_samples(height, size[1]), nearest_samples(width, size[0])
+            empty, full = empty[np.ix_(ys, xs)], full[np.ix_(ys, xs)]
+            height, width = size[1], size[0]
+        self.shape = (height, width, 3)
+
+        y, x = np.mgrid[:height, :width]
+        if size is not None:
+            y, x = ys[y], xs[x]
+        cells = np.minimum(y // scale, rows - 1) * cols + np.minimum(x // scale, cols - 1)
+        dynamic = (empty != full).any(axis=2)
+
+        # Index of every pixel into [cell colors..., static colors...], then of every
+        # pixel channel into the flattened colors: one 1-D gather is the fastest lookup
+        static_colors, static_index = np.unique(
+            empty[~dynamic].reshape(-1, 3), axis=0, return_inverse=True)
+        pixels = np.where(dynamic, cells, 0).ravel()
+        pixels[~dynamic.ravel()] = rows * cols + static_index.ravel()
+        self.index = (pixels[:, None] * 3 + np.arange(3)).ravel()
+        # The cell pixels grouped by cell, for redrawing single cells
+        dynamic_pixels = np.flatnonzero(dynamic)
+        dynamic_cells = cells.ravel()[dynamic_pixels]
+        order = np.argsort(dynamic_cells, kind="stable")
+        self.cell_pixels = dynamic_pixels[order]
+        self.cell_starts = np.searchsorted(dynamic_cells[order], np.arange(rows * cols + 1))
+        self.static_colors = static_colors.astype(np.uint8)
+        self.palette = code_palette()
+
+    def render(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Render a board from its letter codes.
+
+        Args:
+            codes (numpy.ndarray): The (rows, cols) `uint8` letter codes (`Board.grid`).
+
+        Returns:
+            numpy.ndarray: The (height, width, 3) `uint8` frame.
+        """
+        colors = np.concatenate([self.palette[codes.ravel()], self.static_colors])
+        return colors.ravel()[self.index].reshape(self.shape)
+
+    def render_batch(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Render many boards from their letter codes with one gather.
+
+        Args:
+            codes (numpy.ndarray): The (N, rows, cols) `uint8` letter codes.
+
+        Returns:
+            numpy.ndarray: The (N, height, width, 3) `uint8` frames.
+        """
+        n = len(codes)
+        static = np.broadcast_to(self.static_colors, (n, *self.static_colors.shape))
+        colors = np.concatenate([self.palette[codes.reshape(n, self.rows * self.cols)], static], axis=1)
+        return colors.reshape(n, colors.shape[1] * 3)[:, self.index].reshape(n, *self.shape)
+
+    def draw_cells(self, frame: np.ndarray, codes: np.ndarray, cells) -> np.ndarray:
+        """
+        Redraw some cells of a frame of this atlas in place, e.g. the cells a move changed.
+
+        Args:
+            frame (numpy.ndarray): A frame returned by `render`.
+            codes (numpy.ndarray): The (rows, cols) `uint8` letter codes of the board.
+            cells: Flat indices (row * cols + col) of the cells to redraw.
+
+        Returns:
+            numpy.ndarray: The frame.
+        """
+        pixels = frame.reshape(-1, 3)
+        codes = codes.ravel()
+        for cell in cells:
+            pixels[self.cell_pixels[self.cell_starts[cell]:self.cell_starts[cell + 1]]] = \
+                self.palette[codes[cell]]
+        return frame
+
+
+@lru_cache(maxsize=None)
+def tile_atlas(rows: int, cols: int, win_x: int, win_y: int, scale: int = 50, size=None) -> TileAtlas:
+    """
+    The shared `TileAtlas` of a board layout, built on first use.
+    """
+    return TileAtlas(rows, cols, win_x, win_y, scale, size)
+
+
+def render_board_array(board, scale: int = 50, size=None) -> np.ndarray:
+    """
+    Render a `Board` without letters as an `uint8` array, see `TileAtlas`.
+
+    Args:
+        board (Board): The board to render.
+        scale (int): Size of each tile in pixels.
+        size (tuple): Optional output (width, height).
+
+    Returns:
+        numpy.ndarray: The (height, width, 3) `uint8` frame.
+    """
+    atlas = tile_atlas(board.row, board.col, board.win_x, board.win_y, scale,
+                       None if size is None else tuple(size))
+    return atlas.render(board.grid)
+
+
+def render_batch(boards, scale: int = 50, size=None) -> np.ndarray:
+    """
+    Render many boards of the same size without letters, see `TileAtlas`.
+
+    Args:
+        boards: `Board` objects, or their (N, rows, cols) `uint8` letter codes
+            (`Board.grid`), with the exit where `Board` puts it.
+        scale (int): Size of each tile in pixels.
+        size (tuple): Optional output (width, height).
+
+    Returns:
+        numpy.ndarray: The (N, height, width, 3) `uint8` frames.
+    """
+    if isinstance(boards, np.ndarray):
+        codes = boards
+        rows, cols = codes.shape[1:]
+        win_x, win_y = (rows - 1) // 2, cols - 1
+    else:
+        boards = list(boards)
+        if not boards:
+            raise ValueError("No boards to render")
+        codes = np.stack([board.grid for board in boards])
+        win_x, win_y = boards[0].win_x, boards[0].win_y
+        rows, cols = codes.shape[1:]
+    atlas = tile_atlas(rows, cols, win_x, win_y, scale, None if size is None else tuple(size))
+    return atlas.render_batch(codes)
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of rendered boards.
+
+    Frames are keyed by the board's Zobrist hash (`Board.get_zobrist_hash`) and size
+    and by the render parameters, so every position that comes back in a trajectory,
+    a video or the thumbnails is drawn once. Frames are stored as read-only `uint8`
+    arrays; the least recently used ones are dropped beyond `max_bytes`.
+
+    Args:
+        max_bytes (int): Memory budget of the stored frames.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+
+    @staticmethod
+    def key(board, scale: int, draw_letters: bool = False, size=None, renderer: str = "pil") -> tuple:
+        """
+        The cache key of a board rendered with the given parameters.
+        """
+        return (board.get_zobrist_hash(), board.row, board.col, scale, draw_letters,
+                None if size is None else tuple(size), renderer)
+
+    def get(self, key, render) -> np.ndarray:
+        """
+        The frame of `key`, rendered with `render()` and stored on a miss.
+        """
+        frame = self._frames.get(key)
+        if frame is not None:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return frame
+
+        self.misses += 1
+        frame = np.array(render(), dtype=np.uint8)
+        frame.flags.writeable = False
+        self._frames[key] = frame
+        self.nbytes += frame.nbytes
+        while self.nbytes > self.max_bytes and len(self._frames) > 1:
+            _, dropped = self._frames.popitem(last=False)
+            self.nbytes -= dropped.nbytes
+        return frame
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """
+        The hit and miss counters and the cache occupancy.
+        """
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate,
+                "frames": len(self._frames), "nbytes": self.nbytes}
+
+    def clear(self):
+        self._frames.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+
+# Shared by the image environment, the video writers and the GUI (one per process)
+render_cache = RenderCache()
+
+
+def cached_board_image(board, scale: int = 50, draw_letters: bool = False, size=None,
+                       cache: RenderCache = None) -> np.ndarray:
+    """
+    `generate_board_image` as a read-only `uint8` array, through a `RenderCache`.
+
+    Args:
+        board (Board): The board to render.
+        scale (int): Size of each tile in pixels.
+        draw_letters (bool): Whether to draw letters on the board tiles.
+        size (tuple): Optional (width, height) the image is resized to.
+        cache (RenderCache): The cache to use, the shared `render_cache` by default.
+
+    Returns:
+        numpy.ndarray: The (height, width, 3) frame.
+    """
+    cache = render_cache if cache is None else cache
+
+    def render():
+        img = generate_board_image(board, scale, draw_letters)
+        return img.resize(tuple(size)) if size is not None else img
+
+    return cache.get(cache.key(board, scale, draw_letters, size), render)
+
+
 def save_board_to_image(
     board, filename: str, scale: int = 50, draw_letters: bool = False
 ):
@@ -112,6 +415,131 @@ def save_board_to_image(
     print(f"Board saved to {filename}")
 
 
+def board_frames(board, moves, scale: int = 50, draw_letters: bool = False):
+    """
+    Yield the frame of a board, then of the board after every move, moving it in place.
+
+    Without letters the frames are drawn with the tile atlas into one buffer, and
+    every move only redraws the cells it changed; each frame must be used (e.g.
+    encoded) before asking for the next. Letters need `generate_board_image`, and
+    those frames come from the shared `render_cache`.
+
+    Args:
+        board (Board): The start board.
+        moves: (letter, direction) single-cell moves; unknown letters are skipped.
+        scale (int): Size of each tile in pixels.
+        draw_letters (bool): Whether to draw letters on the board tiles.
+
+    Yields:
+        numpy.ndarray: The (height, width, 3) `uint8` frames.
+    """
+    if draw_letters:
+        yield cached_board_image(board, scale, draw_letters=True)
+    else:
+        atlas = tile_atlas(board.row, board.col, board.win_x, board.win_y, scale)
+        frame = atlas.render(board.grid)
+        codes = board.grid.copy()
+        yield frame
+
+    for letter, direction in moves:
+        vehicle = board.get_vehicle_by_letter(letter)
+        if vehicle is None:
+            continue
+        board.move_vehicle(vehicle, direction)
+        if draw_letters:
+            yield cached_board_image(board, scale, draw_letters=True)
+        else:
+            atlas.draw_cells(frame, board.grid, np.flatnonzero(board.grid != codes))
+            codes[...] = board.grid
+            yield frame
+
+
+def video_writer(video_name: str, fps: int):
+    """
+    An imageio writer of `video_name` playing `fps` frames per second. The GIF
+    plugin takes the time of every frame in milliseconds instead of a frame rate.
+    """
+    if str(video_name).lower().endswith(".gif"):
+        return imageio.get_writer(video_name, duration=1000 / fps)
+    return imageio.get_writer(video_name, fps=fps)
+
+
+def write_board_video(board, moves, video_name: str, scale: int = 50, draw_letters: bool = False,
+                      fps: int = 4) -> str:
+    """
+    Encode the video of a board and its moves, pushing every frame to the encoder as
+    soon as it is drawn (see `board_frames`), so memory does not grow with the length.
+
+    Args:
+        board (Board): The start board; it is moved in place.
+        moves: (letter, direction) single-cell moves.
+        video_name (str): Output video file name (e.g. "output.mp4" or "output.gif").
+        scale (int): Size of each tile in pixels.
+        draw_letters (bool): Whether to draw letters on the board tiles.
+        fps (int): Frames per second for the output video.
+
+    Returns:
+        str: The video file name.
+    """
+    with video_writer(video_name, fps) as writer:
+        for frame in board_frames(board, moves, scale, draw_letters):
+            writer.append_data(frame)
+    return video_name
+
+
+class VideoExporter:
+    """
+    Encodes board videos (`write_board_video`) in a pool of worker processes.
+
+    At most `2 * workers` videos are queued; `submit` waits for the oldest beyond
+    that, so exporting many videos runs at the encoders' speed in constant memory.
+    With `workers=0` the videos are encoded right away in the calling process.
+
+    Args:
+        workers (int): Number of worker processes.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self._pool = ProcessPoolExecutor(workers) if workers > 0 else None
+        self._pending = deque()
+
+    def submit(self, board, moves, video_name: str, **kwargs) -> Future:
+        """
+        Queue the video of `board` and its moves, see `write_board_video`.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the video file name.
+        """
+        moves = list(moves)
+        if self._pool is None:
+            future = Future()
+            future.set_result(write_board_video(board, moves, video_name, **kwargs))
+            return future
+
+        while len(self._pending) >= 2 * self.workers:
+            self._pending.popleft().result()
+        future = self._pool.submit(write_board_video, board, moves, video_name, **kwargs)
+        self._pending.append(future)
+        return future
+
+    def close(self):
+        """
+        Wait for the queued videos and stop the workers.
+        """
+        while self._pending:
+            self._pending.popleft().result()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 def save_board_to_video(
     board, sol: tuple[str], video_name: str, draw_letters: bool = False, fps: int = 4
 ):
@@ -126,25 +554,8 @@ def save_board_to_video(
         draw_letters: Whether to draw letters on the board tiles.
         fps: Frames per second for the output video.
     """
-    frames = []
-
-    # Generate the initial board state as an image
-    img = generate_board_image(board, draw_letters=draw_letters)
-    frames.append(img.copy())
-
-    # Apply each move in the solution and capture frames
-    for move in sol:
-        letter = move[0]
-        car = board.get_vehicle_by_letter(letter)
-        direction = move[1]
-        times = move[2]
-        for _ in range(int(times)):
-            board.move_vehicle(car, direction)
-            img = generate_board_image(board, draw_letters=draw_letters)
-            frames.append(img.copy())
-
-    # Convert and save using imageio
-    imageio.mimsave(video_name, [frame.convert("RGB")
-                    for frame in frames], fps=fps)
+    # Every move of the solution is (letter, direction, number of cells)
+    moves = [(move[0], move[1]) for move in sol for _ in range(int(move[2]))]
+    write_board_video(board, moves, video_name, draw_letters=draw_letters, fps=fps)
 
     print(f"Video saved as {video_name}")
@@ -33,15 +33,18 @@ class Button:
         self.text = text
         self.action = action
         self.hovered = False
+        self._surfaces = {}  # Pre-rendered button by hover state
 
     def draw(self, screen, font):
-        color = BUTTON_HOVER_COLOR if self.hovered else BUTTON_COLOR
-        pygame.draw.rect(screen, color, self.rect)
-        pygame.draw.rect(screen, BLACK, self.rect, 2)
-        
-        text_surface = font.render(self.text, True, BLACK)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        surface = self._surfaces.get(self.hovered)
+        if surface is None:
+            surface = pygame.Surface(self.rect.size)
+            surface.fill(BUTTON_HOVER_COLOR if self.hovered else BUTTON_COLOR)
+            pygame.draw.rect(surface, BLACK, surface.get_rect(), 2)
+            text_surface = font.render(self.text, True, BLACK)
+            surface.blit(text_surface, text_surface.get_rect(center=surface.get_rect().center))
+            self._surfaces[self.hovered] = surface
+        screen.blit(surface, self.rect)
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEMOTION:
@@ -52,10 +55,29 @@ class Button:
         return None
 
 class RushHourGame:
+    """
+    Playable Rush Hour in a pygame window.
+
+    The window is only redrawn after events that change it: every change marks the
+    screen areas it affects as dirty (`invalidate`), and only those areas are drawn
+    again and sent to the display. The background, the vehicles and the static labels
+    are rendered once into cached surfaces and then only blitted; the step counter is
+    rendered again when the step count changes.
+    """
+
     def __init__(self, all_boards=None,initial_board=None):
         self.screen = pygame.display.set_mode((TOTAL_SIZE, TOTAL_SIZE + BUTTON_HEIGHT + BUTTON_MARGIN))
         pygame.display.set_caption("Rush Hour Game")
         self.clock = pygame.time.Clock()
+
+        # Screen areas to redraw, and the cached surfaces
+        self._dirty = []
+        self._background = None
+        self._background_exit = None
+        self._sprites = {}
+        self._texts = {}
+        self._steps_text = None
+        self._steps_rect = pygame.Rect(0, 0, 0, 0)
         
         self.all_boards = all_boards
 
@@ -84,6 +106,7 @@ class RushHourGame:
         self.selected_vehicle = None
         self.game_over = False
         self.steps = 0
+        self.invalidate()
 
     def new_level(self):
         if self.all_boards:
@@ -93,6 +116,88 @@ class RushHourGame:
             self.selected_vehicle = None
             self.game_over = False
             self.steps = 0
+            self.invalidate()
+
+    def invalidate(self, rect=None):
+        """
+        Mark a screen area to be redrawn, the whole window by default.
+        """
+        self._dirty.append(self.screen.get_rect() if rect is None else pygame.Rect(rect))
+
+    def vehicle_rect(self, vehicle):
+        """
+        The screen rectangle of a vehicle.
+        """
+        if vehicle.direction == "RL":
+            width, height = vehicle.length * CELL_SIZE, CELL_SIZE
+        else:
+            width, height = CELL_SIZE, vehicle.length * CELL_SIZE
+        return pygame.Rect(MARGIN + vehicle.col * CELL_SIZE, MARGIN + vehicle.row * CELL_SIZE,
+                           width, height)
+
+    def render_text(self, font, text, color):
+        """
+        A text surface, rendered on first use. Only for the static labels (the vehicle
+        letters), as every distinct text stays cached; see `steps_text`.
+        """
+        key = (id(font), text, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = font.render(text, True, color)
+        return surface
+
+    def steps_text(self):
+        """
+        The step counter, rendered again only when the step count changes.
+        """
+        if self._steps_text is None or self._steps_text[0] != self.steps:
+            self._steps_text = (self.steps, self.font.render(f"Steps: {self.steps}", True, BLACK))
+        return self._steps_text[1]
+
+    def background(self):
+        """
+        The empty board with its grid and exit, rendered once per exit position.
+        """
+        exit_cell = (self.board.win_x, self.board.win_y)
+        if self._background is None or self._background_exit != exit_cell:
+            background = pygame.Surface(self.screen.get_size())
+            background.fill(WHITE)
+            # Draw grid
+            for i in range(BOARD_SIZE + 1):
+                # Vertical lines
+                pygame.draw.line(background, BLACK,
+                               (MARGIN + i * CELL_SIZE, MARGIN),
+                               (MARGIN + i * CELL_SIZE, MARGIN + WINDOW_SIZE))
+                # Horizontal lines
+                pygame.draw.line(background, BLACK,
+                               (MARGIN, MARGIN + i * CELL_SIZE),
+                               (MARGIN + WINDOW_SIZE, MARGIN + i * CELL_SIZE))
+            # Draw exit as a stripe, moved right one tile
+            exit_x = MARGIN + (self.board.win_y+1) * CELL_SIZE
+            exit_y = MARGIN + self.board.win_x * CELL_SIZE
+            pygame.draw.rect(background, BLACK, (exit_x, exit_y, 10, CELL_SIZE))
+            self._background = background
+            self._background_exit = exit_cell
+        return self._background
+
+    def vehicle_sprite(self, vehicle, selected):
+        """
+        A vehicle with its color, letter and selection border, rendered on first use.
+        """
+        key = (vehicle.letter, vehicle.length, vehicle.direction, selected)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            rect = self.vehicle_rect(vehicle)
+            sprite = pygame.Surface(rect.size)
+            # Get base color from letter_to_color
+            sprite.fill(letter_to_color.get(vehicle.letter, GRAY))
+            if selected:
+                pygame.draw.rect(sprite, HIGHLIGHT_COLOR, sprite.get_rect(), 3)  # Yellow border
+            # Vehicle letter, centered on its first cell
+            text = self.render_text(self.font, vehicle.letter, WHITE)
+            sprite.blit(text, text.get_rect(center=(CELL_SIZE // 2, CELL_SIZE // 2)))
+            self._sprites[key] = sprite
+        return sprite
 
     def show_win_choice(self):
         # Create a semi-transparent overlay
@@ -151,7 +256,7 @@ class RushHourGame:
         # Wait for user choice
         waiting = True
         while waiting:
-            for event in pygame.event.get():
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
@@ -166,74 +271,45 @@ class RushHourGame:
                     if action:
                         action()
                         waiting = False
+        self.invalidate()
+
+    def draw_board(self, area=None):
+        """
+        Draw the game into the screen buffer, only inside `area` if given.
+        """
+        area = self.screen.get_rect() if area is None else pygame.Rect(area)
+        self.screen.set_clip(area)
+        self.screen.blit(self.background(), area, area)
 
-    def draw_board(self):
-        self.screen.fill(WHITE)
-        
-        # Draw grid
-        for i in range(BOARD_SIZE + 1):
-            # Vertical lines
-            pygame.draw.line(self.screen, BLACK, 
-                           (MARGIN + i * CELL_SIZE, MARGIN),
-                           (MARGIN + i * CELL_SIZE, MARGIN + WINDOW_SIZE))
-            # Horizontal lines
-            pygame.draw.line(self.screen, BLACK,
-                           (MARGIN, MARGIN + i * CELL_SIZE),
-                           (MARGIN + WINDOW_SIZE, MARGIN + i * CELL_SIZE))
-        
         # Draw vehicles using colors from board_to_image
+        selected = self.selected_vehicle.letter if self.selected_vehicle else None
         for vehicle in self.board.vehicles:
-            # Get base color from letter_to_color
-            color = letter_to_color.get(vehicle.letter, GRAY)
-            
-            # Calculate rectangle coordinates
-            if vehicle.direction == "RL":
-                rect = pygame.Rect(
-                    MARGIN + vehicle.col * CELL_SIZE,
-                    MARGIN + vehicle.row * CELL_SIZE,
-                    vehicle.length * CELL_SIZE,
-                    CELL_SIZE
-                )
-            else:
-                rect = pygame.Rect(
-                    MARGIN + vehicle.col * CELL_SIZE,
-                    MARGIN + vehicle.row * CELL_SIZE,
-                    CELL_SIZE,
-                    vehicle.length * CELL_SIZE
-                )
-            
-            # Draw the vehicle
-            pygame.draw.rect(self.screen, color, rect)
-            
-            # Draw highlight for selected vehicle
-            if self.selected_vehicle and self.selected_vehicle.letter == vehicle.letter:
-                pygame.draw.rect(self.screen, HIGHLIGHT_COLOR, rect, 3)  # Draw yellow border
-            
-            # Draw vehicle letter
-            text = self.font.render(vehicle.letter, True, WHITE)
-            text_rect = text.get_rect(center=(
-                MARGIN + vehicle.col * CELL_SIZE + CELL_SIZE // 2,
-                MARGIN + vehicle.row * CELL_SIZE + CELL_SIZE // 2
-            ))
-            self.screen.blit(text, text_rect)
-        
-        # Draw exit as a stripe, moved right one tile and up half a tile
-        exit_x = MARGIN + (self.board.win_y+1) * CELL_SIZE  # Move right one tile
-        exit_y = MARGIN + self.board.win_x * CELL_SIZE  # Move up half a tile (remove + CELL_SIZE // 2 - 5)
-        pygame.draw.rect(self.screen, BLACK,
-                        (exit_x,
-                         exit_y,
-                         10,
-                         CELL_SIZE))
-        
+            rect = self.vehicle_rect(vehicle)
+            if rect.colliderect(area):
+                self.screen.blit(self.vehicle_sprite(vehicle, vehicle.letter == selected), rect)
+
         # Draw step counter (always at bottom)
-        steps_text = self.font.render(f"Steps: {self.steps}", True, BLACK)
-        steps_rect = steps_text.get_rect(center=(TOTAL_SIZE // 2, TOTAL_SIZE + BUTTON_MARGIN // 2))
-        self.screen.blit(steps_text, steps_rect)
-        
+        steps_text = self.steps_text()
+        self._steps_rect = steps_text.get_rect(center=(TOTAL_SIZE // 2, TOTAL_SIZE + BUTTON_MARGIN // 2))
+        if self._steps_rect.colliderect(area):
+            self.screen.blit(steps_text, self._steps_rect)
+
         # Draw buttons
         for button in self.buttons:
-            button.draw(self.screen, self.font)
+            if button.rect.colliderect(area):
+                button.draw(self.screen, self.font)
+        self.screen.set_clip(None)
+
+    def update_display(self):
+        """
+        Redraw the dirty areas and send them to the display.
+        """
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, []
+        for rect in dirty:
+            self.draw_board(rect)
+        pygame.display.update(dirty)
 
     def handle_click(self, pos):
         if self.game_over:
@@ -253,9 +329,12 @@ class RushHourGame:
             board_y = (y - MARGIN) // CELL_SIZE
             
             if 0 <= board_x < BOARD_SIZE and 0 <= board_y < BOARD_SIZE:
+                if self.selected_vehicle:
+                    self.invalidate(self.vehicle_rect(self.selected_vehicle))
                 cell_value = self.board.board[board_y, board_x]
                 if cell_value != "":
                     self.selected_vehicle = self.board.get_vehicle_by_letter(cell_value)
+                    self.invalidate(self.vehicle_rect(self.selected_vehicle))
                 else:
                     self.selected_vehicle = None
 
@@ -273,30 +352,40 @@ class RushHourGame:
         elif key == pygame.K_DOWN:
             move = "D"
             
+        before = self.vehicle_rect(self.selected_vehicle)
         if move and self.board.move_vehicle(self.selected_vehicle, move):
             self.steps += 1
+            # The old and new cells of the vehicle, and the old and new step counter
+            self.invalidate(before.union(self.vehicle_rect(self.selected_vehicle)))
+            self.invalidate(self._steps_rect.union(
+                self.steps_text().get_rect(center=self._steps_rect.center)))
             if self.board.game_over():
                 self.game_over = True
                 self.draw_board()  # Update the display
                 self.show_win_choice()
 
     def run(self):
+        self.invalidate()
         running = True
         while running:
-            for event in pygame.event.get():
+            # Sleep until something happens, then handle everything that is queued
+            for event in [pygame.event.wait()] + pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self.handle_click(event.pos)
                 elif event.type == pygame.MOUSEMOTION:
                     for button in self.buttons:
+                        hovered = button.hovered
                         button.handle_event(event)
+                        if button.hovered != hovered:
+                            self.invalidate(button.rect)
                 elif event.type == pygame.KEYDOWN:
                     self.handle_key(event.key)
-            
-            self.draw_board()
-            pygame.display.flip()
-            self.clock.tick(60)
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    self.invalidate()
+
+            self.update_display()
         
         pygame.quit()
         sys.exit()
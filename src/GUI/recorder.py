@@ -0,0 +1,45 @@
+"""
+Headless recording of agent episodes, without pygame, a display or waits.
+
+Frames are rendered straight from the environment's board (see `cached_board_image`)
+and streamed to the video writer as the episode runs.
+"""
+from sb3_contrib.ppo_mask import MaskablePPO
+
+import setup_path  # NOQA
+from GUI.board_to_image import cached_board_image, video_writer
+
+TILE_SIZE = 80  # The tile size of the pygame visualizer
+
+
+def record_episode(model, env, output_video: str, fps: int = 3, scale: int = TILE_SIZE,
+                   draw_letters: bool = True, deterministic: bool = True) -> dict:
+    """
+    Play one episode of `model` on `env` and save it as a video, one frame per step.
+
+    Args:
+        model: A Stable-Baselines3 model; MaskablePPO models get the env's
+            `get_action_mask()`.
+        env: `RushHourEnv` or `RushHourImageEnv`; frames are drawn from `env.board`.
+        output_video (str): Output video file name (e.g. "demo.mp4" or "demo.gif").
+        fps (int): Frames per second for the output video.
+        scale (int): Size of each tile in pixels.
+        draw_letters (bool): Whether to draw letters on the board tiles.
+        deterministic (bool): Whether the model picks its most likely actions.
+
+    Returns:
+        dict: "steps", "total_reward" and "escaped" of the episode.
+    """
+    obs, _ = env.reset()
+    total_reward = 0.0
+    done = truncated = False
+    with video_writer(output_video, fps) as writer:
+        writer.append_data(cached_board_image(env.board, scale, draw_letters))
+        while not done and not truncated:
+            masks = {"action_masks": env.get_action_mask()} if isinstance(model, MaskablePPO) else {}
+            action, _ = model.predict(obs, deterministic=deterministic, **masks)
+            obs, reward, done, truncated, _ = env.step(action)
+            total_reward += reward
+            writer.append_data(cached_board_image(env.board, scale, draw_letters))
+
+    return {"steps": env.num_steps, "total_reward": total_reward, "escaped": bool(done)}
@@ -4,6 +4,7 @@ import time
 import numpy as np
 import cv2
 from GUI.board_to_image import letter_to_color
+from GUI.recorder import record_episode
 from utils.config import BOARD_SIZE
 
 # === Settings ===
@@ -33,14 +34,21 @@ def draw_board(screen, board, font):
 
 
 def draw_image_obs(obs):
-    """Draw normalized image-based observation (RushHourImageEnv)."""
-    img = (obs * 255).astype(np.uint8)
+    """Draw image-based observation (RushHourImageEnv), float in [0, 1] or uint8."""
+    img = obs if obs.dtype == np.uint8 else (obs * 255).astype(np.uint8)
     img_resized = cv2.resize(
         img, (WINDOW_SIZE, WINDOW_SIZE), interpolation=cv2.INTER_NEAREST)
     return img_resized
 
 
-def run_visualizer(model, env, record=False, output_video="videos/rush_hour_solution.mp4"):
+def run_visualizer(model, env, record=False, output_video="videos/rush_hour_solution.mp4",
+                   headless=False):
+    if headless:
+        # No window or waits: frames come from the board state, see `record_episode`
+        record_episode(model, env, output_video)
+        print(f"✅ Video saved to {output_video}")
+        return
+
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
     pygame.display.set_caption("Rush Hour - Agent Demo")
@@ -82,7 +90,7 @@ def run_visualizer(model, env, record=False, output_video="videos/rush_hour_solu
                     out.release()
                 return
 
-        action_mask = info.get("action_mask")
+        action_mask = env.get_action_mask()
         action, _ = model.predict(obs, action_masks=action_mask)
         obs, reward, done, truncated, info = env.step(action)
         print(f"Step {env.num_steps}: reward: {reward}")
@@ -3,12 +3,11 @@ import os
 import json
 from pathlib import Path
 from copy import deepcopy
-import imageio
 import random
 from stable_baselines3 import PPO
 from environments.rush_hour_env import RushHourEnv
 from environments.board import Board
-from GUI.board_to_image import generate_board_image
+from GUI.board_to_image import VideoExporter
 from utils.config import NUM_VEHICLES
 
 
@@ -20,7 +19,8 @@ class TrajectoryGenerator:
                  scale: int = 52,
                  max_steps: int = 50,
                  max_invalid_moves: int = 20,
-                 save_video: bool = True):
+                 save_video: bool = True,
+                 video_workers: int = os.cpu_count() or 1):
         self.model_path = model_path
         self.output_dir = output_dir
         self.num_boards = num_boards
@@ -28,10 +28,14 @@ class TrajectoryGenerator:
         self.max_steps = max_steps
         self.max_invalid_moves = max_invalid_moves
         self.save_video = save_video
+        # Videos are encoded by worker processes while the episodes run; `run` starts
+        # them and stops them when the episodes are done
+        self.video_workers = video_workers
+        self.videos = None
 
         self.env = RushHourEnv(num_of_vehicle=NUM_VEHICLES, train=False)
         self.model = self.load_model()
-        all_boards = self.env.boards.copy()
+        all_boards = list(self.env.boards)
         random.shuffle(all_boards)
 
         if len(all_boards) < self.num_boards:
@@ -47,12 +51,14 @@ class TrajectoryGenerator:
         return PPO.load(self.model_path)
 
     def run(self):
-        for board_idx, board in enumerate(self.boards):
-            print(f"\n=== Generating Trajectories for Board {board_idx} ===")
-            board_copy = deepcopy(board)
+        self.videos = VideoExporter(self.video_workers if self.save_video else 0)
+        with self.videos:
+            for board_idx, board in enumerate(self.boards):
+                print(f"\n=== Generating Trajectories for Board {board_idx} ===")
+                board_copy = deepcopy(board)
 
-            self.run_episode(board_idx, 0, board)
-            self.run_episode(board_idx, 1, board_copy)
+                self.run_episode(board_idx, 0, board)
+                self.run_episode(board_idx, 1, board_copy)
 
     def run_episode(self, board_idx: int, run_idx: int, board: Board):
         obs, _ = self.env.reset(board=board)
@@ -143,24 +149,12 @@ class TrajectoryGenerator:
         print(f"📄 Trajectory saved: {path}")
 
     def save_video_mp4(self, board_idx, run_idx, all_moves, initial_board):
-        frames = [generate_board_image(
-            initial_board, scale=self.scale, draw_letters=False)]
-        board = deepcopy(initial_board)
-
-        for letter, direction, valid in all_moves:
-            if not letter:
-                continue
-            vehicle = board.get_vehicle_by_letter(letter)
-            if not vehicle:
-                continue
-            board.move_vehicle(vehicle, direction)
-            frames.append(generate_board_image(
-                board, scale=self.scale, draw_letters=False))
-
+        moves = [(letter, direction) for letter, direction, valid in all_moves if letter]
         video_path = self.output_dir / \
             f"trajectory_{board_idx}_agent{run_idx + 1}_video.mp4"
-        imageio.mimsave(video_path, [f.convert("RGB") for f in frames], fps=4)
-        print(f"🎥 Video saved: {video_path}")
+        future = self.videos.submit(deepcopy(initial_board), moves, str(video_path),
+                                    scale=self.scale, draw_letters=False)
+        future.add_done_callback(lambda done: print(f"🎥 Video saved: {done.result()}"))
 
 
 if __name__ == "__main__":
@@ -4,15 +4,19 @@ import tensorflow as tf
 
 
 class PreferenceRewardWrapper(Wrapper):
-    def __init__(self, env, reward_model_path):
+    def __init__(self, env, reward_model_path, shaping=None):
         super().__init__(env)
         self.reward_model = tf.keras.models.load_model(reward_model_path)
         self.trajectory = []
+        # Optional `DistanceShaping` for the dense reward of non-final steps
+        self.shaping = shaping
 
     def reset(self, **kwargs):
         obs, info = self.env.reset(**kwargs)
         self.trajectory = [obs.copy()]
         self.num_steps = 0
+        if self.shaping is not None:
+            self.shaping.reset(self.env.unwrapped.board)
         return obs, info
 
     def step(self, action):
@@ -48,11 +52,14 @@ class PreferenceRewardWrapper(Wrapper):
 
     def _shaped_reward(self, obs):
         """
-        Dense shaping: reward progress toward goal based on red car path clearance.
+        Dense shaping: reward progress toward goal, from the exact distance to the goal
+        when a `DistanceShaping` is given, else from the red car path clearance.
         Encourages the agent to unblock the red car's row early.
         """
-        board = np.array(obs).reshape(6, 6)
-        red_row = board[2]
-        blocked = sum(1 for i in range(5, -1, -1) if red_row[i] != 0)
-        # The more the path is clear, the higher the reward (max: +0.5)
-        return -1.0 + 0.1 * (6 - blocked)
+        board = self.env.unwrapped.board
+        if self.shaping is not None:
+            return -1.0 + self.shaping.step(board, False)
+        red_row = board.grid[board.win_x]
+        blocked = np.count_nonzero(red_row)
+        # The more the path is clear, the higher the reward (max: +0.1 * (col - 2))
+        return -1.0 + 0.1 * (board.col - blocked)
@@ -0,0 +1,105 @@
+from collections import deque
+
+import numpy as np
+
+import setup_path  # NOQA
+from environments.board import ZOBRIST_KEYS, Board
+from environments.vehicles import HORIZONTAL
+
+
+def distance_table(board: Board, max_states: int = 200_000):
+    """
+    Compute the exact number of moves to the goal from every state reachable from `board`.
+
+    Every vehicle only moves along one axis, so a state is the tuple of the vehicles'
+    positions on their axis and the occupied cells are a bit mask; the search never
+    builds `Board` objects. Moves are reversible, so the distances are a breadth-first
+    search from the goal states of the reachable component.
+
+    Args:
+        board (Board): The start board.
+        max_states (int): Give up when more states than this are reachable.
+
+    Returns:
+        dict: Zobrist hash (`Board.get_zobrist_hash`) -> number of moves to the goal, for
+        every reachable state; empty if the board cannot be solved. None if the
+        search gave up.
+    """
+    count = board.num_of_vehicles
+    horizontal = board.vehicle_orientations == HORIZONTAL
+    lengths = board.vehicle_lengths.astype(int)
+    fixed = np.where(horizontal, board.vehicle_rows, board.vehicle_cols).astype(int)
+    start = tuple(int(p) for p in np.where(horizontal, board.vehicle_cols, board.vehicle_rows))
+    axis_size = np.where(horizontal, board.col, board.row)
+
+    # Per vehicle and position: the bit mask of its cells and its Zobrist key
+    masks, keys = [], []
+    for index in range(count):
+        vehicle_masks, vehicle_keys = [], []
+        for position in range(int(axis_size[index]) - lengths[index] + 1):
+            cells = [(fixed[index], position + i) if horizontal[index] else (position + i, fixed[index])
+                     for i in range(lengths[index])]
+            mask, key = 0, 0
+            for row, col in cells:
+                mask |= 1 << (row * board.col + col)
+                key ^= int(ZOBRIST_KEYS[row * board.col + col, board.vehicle_letters[index]])
+            vehicle_masks.append(mask)
+            vehicle_keys.append(key)
+        masks.append(vehicle_masks)
+        keys.append(vehicle_keys)
+
+    red = np.flatnonzero(board.vehicle_letters == ord("X"))
+    if len(red) == 0:
+        raise ValueError("RedCar not found on the board!")
+    red = int(red[0])
+    goal_position = board.win_y - lengths[red] + 1
+
+    def neighbors(state):
+        occupied = 0
+        for index, position in enumerate(state):
+            occupied |= masks[index][position]
+        for index, position in enumerate(state):
+            vehicle_masks = masks[index]
+            others = occupied & ~vehicle_masks[position]
+            for new_position in (position - 1, position + 1):
+                if 0 <= new_position < len(vehicle_masks) and not others & vehicle_masks[new_position]:
+                    yield state[:index] + (new_position,) + state[index + 1:]
+
+    # Enumerate the reachable states, then search back from the goal states
+    reachable = {start}
+    queue = deque([start])
+    while queue:
+        for next_state in neighbors(queue.popleft()):
+            if next_state not in reachable:
+                if len(reachable) >= max_states:
+                    return None
+                reachable.add(next_state)
+                queue.append(next_state)
+
+    distances = {state: 0 for state in reachable if state[red] == goal_position}
+    queue = deque(distances)
+    while queue:
+        state = queue.popleft()
+        distance = distances[state] + 1
+        for next_state in neighbors(state):
+            if next_state not in distances:
+                distances[next_state] = distance
+                queue.append(next_state)
+
+    table = {}
+    for state, distance in distances.items():
+        state_hash = 0
+        for index, position in enumerate(state):
+            state_hash ^= keys[index][position]
+        table[state_hash] = distance
+    return table
+
+
+if __name__ == "__main__":
+    import time
+
+    card = Board.load("database/original/cards/card1.json")
+    start = time.time()
+    table = distance_table(card)
+    print(f"{len(table)} states, {table[card.get_zobrist_hash()]} moves to the goal "
+          f"({time.time() - start:.2f}s)")
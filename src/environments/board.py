@@ -4,21 +4,51 @@ The board manages the placement and movement of vehicles, ensuring they follow r
 """
 import setup_path # NOQA
 
+import hashlib
 import json
 
 import numpy as np
 
-from environments.vehicles import RedCar, create_vehicle
+from environments.vehicles import (
+    DIRECTION_CODES,
+    HORIZONTAL,
+    RedCar,
+    create_vehicle,
+    vehicle_class,
+)
 from algorithms.utils import get_solution,get_total_steps
+
+# Cell letter of every letter code, "" for empty cells
+CELL_LETTERS = np.array([""] + [chr(code) for code in range(1, 256)])
+
+# Zobrist keys, one per (cell, letter code), for boards of up to 256 cells and every
+# `uint8` code. Codes 128-255 draw their keys after codes 0-127, so the keys of the
+# ASCII codes do not depend on the width of the table
+_zobrist_rng = np.random.default_rng(20240101)
+ZOBRIST_KEYS = np.concatenate([
+    _zobrist_rng.integers(0, np.iinfo(np.uint64).max, size=(256, 128), dtype=np.uint64, endpoint=True),
+    _zobrist_rng.integers(0, np.iinfo(np.uint64).max, size=(256, 128), dtype=np.uint64, endpoint=True),
+], axis=1)
+
+
 class Board:
     """
     Represents the game board for the vehicle puzzle game.
 
+    Vehicles are stored as parallel arrays (struct-of-arrays), one entry per vehicle
+    in insertion order. The `vehicles` list holds lightweight views over them.
+
     Attributes:
         vehicles (list): A list of vehicles currently on the board.
         row (int): The number of rows on the board.
         col (int): The number of columns on the board.
         board (numpy.ndarray): A 2D array representing the board state.
+        grid (numpy.ndarray): The board state as letter codes (`ord(letter)`, 0 when empty).
+        vehicle_rows (numpy.ndarray): Topmost row of every vehicle.
+        vehicle_cols (numpy.ndarray): Leftmost column of every vehicle.
+        vehicle_lengths (numpy.ndarray): Length of every vehicle.
+        vehicle_orientations (numpy.ndarray): `HORIZONTAL` or `VERTICAL` for every vehicle.
+        vehicle_letters (numpy.ndarray): Letter code (`ord(letter)`) of every vehicle.
     """
 
     def __init__(self, row: int = 6, col: int = 6, init_red_car=True):
@@ -39,9 +69,15 @@ class Board:
         """
         Resets the board by removing all vehicles except the red car.
         """
-        self.vehicles = []
         self.board = np.empty((self.row, self.col), dtype=str)
-        self.num_of_vehicles = 0
+        self.grid = np.zeros((self.row, self.col), dtype=np.uint8)
+        self._set_vehicle_arrays(
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype=np.uint8),
+        )
         if init_red_car:
             self.add_vehicle(RedCar(), self.win_x, self.win_y-1)
         self.vehicles_letter = None
@@ -49,6 +85,44 @@ class Board:
         self.min_steps = 0
         self.heuristic = 0
 
+    def _set_vehicle_arrays(self, rows, cols, lengths, orientations, letters):
+        """
+        Replace the vehicle arrays and drop the cached vehicle views.
+        """
+        self.vehicle_rows = rows
+        self.vehicle_cols = cols
+        self.vehicle_lengths = lengths
+        self.vehicle_orientations = orientations
+        self.vehicle_letters = letters
+        self.num_of_vehicles = len(letters)
+        self._vehicles = None
+        self.vehicles_letter = None
+        self._zobrist = None
+
+    @property
+    def vehicles(self) -> list:
+        """
+        Vehicles on the board, as views over the vehicle arrays.
+        """
+        if self._vehicles is None:
+            self._vehicles = [
+                vehicle_class(int(length), chr(letter)).view(self, index)
+                for index, (length, letter) in enumerate(
+                    zip(self.vehicle_lengths, self.vehicle_letters))
+            ]
+        return self._vehicles
+
+    def _vehicle_cells(self, index: int):
+        """
+        Get the numpy index (row slice/int, col slice/int) of the cells a vehicle covers.
+        """
+        row = int(self.vehicle_rows[index])
+        col = int(self.vehicle_cols[index])
+        length = int(self.vehicle_lengths[index])
+        if self.vehicle_orientations[index] == HORIZONTAL:
+            return row, slice(col, col + length)
+        return slice(row, row + length), col
+
     def update_heuristic_and_min_steps(self,func):
         if not self.is_updated:
             solution = func(self)
@@ -66,14 +140,21 @@ class Board:
             row (int): The starting row of the vehicle.
             col (int): The starting column of the vehicle.
         """
-        if vehicle.direction == "RL":
-            self.board[row, col: col + vehicle.length] = vehicle.letter
-        else:
-            self.board[row: row + vehicle.length, col] = vehicle.letter
-        vehicle.row = row
-        vehicle.col = col
-        self.vehicles.append(vehicle)
-        self.num_of_vehicles += 1
+        vehicles = self.vehicles
+        index = self.num_of_vehicles
+        self._set_vehicle_arrays(
+            np.append(self.vehicle_rows, np.int8(row)),
+            np.append(self.vehicle_cols, np.int8(col)),
+            np.append(self.vehicle_lengths, np.int8(vehicle.length)),
+            np.append(self.vehicle_orientations,
+                      np.int8(DIRECTION_CODES[vehicle.direction])),
+            np.append(self.vehicle_letters, np.uint8(ord(vehicle.letter))),
+        )
+        cells = self._vehicle_cells(index)
+        self.board[cells] = vehicle.letter
+        self.grid[cells] = ord(vehicle.letter)
+        vehicle.bind(self, index)
+        self._vehicles = vehicles + [vehicle]
         self.is_updated = False
 
 
@@ -127,28 +208,32 @@ class Board:
         """
         if move not in vehicle.get_possible_moves(self):
             return False
-        if vehicle.direction == "RL":
-            if move == "L":
-                vehicle.col -= 1
-                self.board[vehicle.row, vehicle.col + vehicle.length] = ""
-                self.board[vehicle.row, vehicle.col] = vehicle.letter
-            elif move == "R":
-                vehicle.col += 1
-                self.board[vehicle.row, vehicle.col - 1] = ""
-                self.board[
-                    vehicle.row, vehicle.col + vehicle.length - 1
-                ] = vehicle.letter
+        index = vehicle._index
+        if vehicle._board is not self:
+            index = int(np.flatnonzero(self.vehicle_letters == ord(vehicle.letter))[0])
+        row = int(self.vehicle_rows[index])
+        col = int(self.vehicle_cols[index])
+        length = int(self.vehicle_lengths[index])
+        code = self.vehicle_letters[index]
+        if move == "L":
+            freed, taken = (row, col + length - 1), (row, col - 1)
+            self.vehicle_cols[index] = col - 1
+        elif move == "R":
+            freed, taken = (row, col), (row, col + length)
+            self.vehicle_cols[index] = col + 1
+        elif move == "U":
+            freed, taken = (row + length - 1, col), (row - 1, col)
+            self.vehicle_rows[index] = row - 1
         else:
-            if move == "U":
-                vehicle.row -= 1
-                self.board[vehicle.row + vehicle.length, vehicle.col] = ""
-                self.board[vehicle.row, vehicle.col] = vehicle.letter
-            elif move == "D":
-                vehicle.row += 1
-                self.board[vehicle.row - 1, vehicle.col] = ""
-                self.board[
-                    vehicle.row + vehicle.length - 1, vehicle.col
-                ] = vehicle.letter
+            freed, taken = (row, col), (row + length, col)
+            self.vehicle_rows[index] = row + 1
+        self.board[freed] = ""
+        self.board[taken] = vehicle.letter
+        self.grid[freed] = 0
+        self.grid[taken] = code
+        if self._zobrist is not None:
+            self._zobrist ^= int(ZOBRIST_KEYS[freed[0] * self.col + freed[1], code]
+                                 ^ ZOBRIST_KEYS[taken[0] * self.col + taken[1], code])
         self.is_updated = False
         return True
 
@@ -189,10 +274,10 @@ class Board:
         Returns:
             Vehicle: The vehicle with the specified letter, or None if not found.
         """
-        for vehicle in self.vehicles:
-            if vehicle.letter == letter:
-                return vehicle
-        return None
+        matches = np.flatnonzero(self.vehicle_letters == ord(letter))
+        if len(matches) == 0:
+            return None
+        return self.vehicles[matches[0]]
 
     def __str__(self):
         """
@@ -231,7 +316,7 @@ class Board:
                     "row": vehicle.row,
                     "col": vehicle.col,
                     "direction": vehicle.direction,
-                 
+
                 }
             )
 
@@ -245,14 +330,17 @@ class Board:
         Args:
             json_board (dict): The dictionary representing the board state.
         """
-        row = json_board["row"]
-        col = json_board["col"]
-        board = Board(row, col, init_red_car=False)
-        for vehicle_data in json_board["vehicles"]:
-            vehicle = create_vehicle(vehicle_data)
-            board.add_vehicle(
-                vehicle, vehicle_data["row"], vehicle_data["col"])
-            
+        vehicles = [create_vehicle(vehicle_data) for vehicle_data in json_board["vehicles"]]
+        board = Board.from_arrays(
+            json_board["row"],
+            json_board["col"],
+            np.array([v["row"] for v in json_board["vehicles"]], dtype=np.int8),
+            np.array([v["col"] for v in json_board["vehicles"]], dtype=np.int8),
+            np.array([v.length for v in vehicles], dtype=np.int8),
+            np.array([DIRECTION_CODES[v.direction] for v in vehicles], dtype=np.int8),
+            np.array([ord(v.letter) for v in vehicles], dtype=np.uint8),
+        )
+
         if "heuristic" in json_board:
             board.heuristic = json_board["heuristic"]
             board.min_steps = json_board["min_steps"]
@@ -263,6 +351,72 @@ class Board:
             board.heuristic = 0
         return board
 
+    @staticmethod
+    def from_arrays(row: int, col: int, rows, cols, lengths, orientations, letters):
+        """
+        Creates a board directly from parallel vehicle arrays.
+
+        The arrays are used as given (no copy), so read-only arrays, e.g. views into a
+        memory-mapped dataset, give a read-only board; `deepcopy` it before moving vehicles.
+
+        Args:
+            row (int): The number of rows on the board.
+            col (int): The number of columns on the board.
+            rows, cols, lengths, orientations, letters (numpy.ndarray): The vehicle arrays.
+        """
+        board = Board(row, col, init_red_car=False)
+        board._set_vehicle_arrays(rows, cols, lengths, orientations, letters)
+        board._fill_grid()
+        return board
+
+    def load_arrays(self, rows, cols, lengths, orientations, letters, grid):
+        """
+        Overwrites the board in place from vehicle arrays and their code grid.
+
+        The vehicle arrays are copied; `board` and `grid` are updated in place, so a
+        board can be reused instead of copying a new one.
+
+        Args:
+            rows, cols, lengths, orientations, letters (numpy.ndarray): The vehicle arrays.
+            grid (numpy.ndarray): The matching letter codes, 0 when empty.
+        """
+        self._set_vehicle_arrays(rows.copy(), cols.copy(), lengths.copy(),
+                                 orientations.copy(), letters.copy())
+        self.grid[:] = grid
+        self.board[:] = CELL_LETTERS[grid]
+
+    def _fill_grid(self):
+        """
+        Rebuild `board` and `grid` from the vehicle arrays.
+        """
+        self.board[:] = ""
+        self.grid[:] = 0
+        self._zobrist = None
+        for index in range(self.num_of_vehicles):
+            cells = self._vehicle_cells(index)
+            self.board[cells] = chr(self.vehicle_letters[index])
+            self.grid[cells] = self.vehicle_letters[index]
+
+    def __deepcopy__(self, memo):
+        """
+        Copy the board arrays directly instead of walking the vehicle objects.
+        """
+        new_board = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new_board
+        new_board.__dict__.update(self.__dict__)
+        new_board.board = self.board.copy()
+        new_board.grid = self.grid.copy()
+        new_board.vehicle_rows = self.vehicle_rows.copy()
+        new_board.vehicle_cols = self.vehicle_cols.copy()
+        new_board.vehicle_orientations = self.vehicle_orientations.copy()
+        new_board._vehicles = None
+        return new_board
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_vehicles"] = None
+        return state
+
     def save(self, filename: str):
         """
         Saves the current board state to a file.
@@ -323,8 +477,8 @@ class Board:
         Returns:
             bool: True if the two board states are equal, False otherwise.
         """
-        board_equal = np.array_equal(self.board, other.board)
-        vehicles_len_equal = len(self.vehicles) == len(other.vehicles)
+        board_equal = np.array_equal(self.grid, other.grid)
+        vehicles_len_equal = self.num_of_vehicles == other.num_of_vehicles
 
         return board_equal and vehicles_len_equal
 
@@ -337,18 +491,122 @@ class Board:
         """
         num_of_move = num_of_vehicles *4
         valid_actions = np.zeros(num_of_move, dtype=bool)
-        for vehicle in self.vehicles:
-            vehicle_moves = vehicle.get_possible_moves(self)
-            if vehicle_moves:
-                if len (vehicle_moves) == 1:
-                    reverse_action = self.reverse_action(vehicle.letter, vehicle_moves[0])
-                    valid_actions[reverse_action] = True
-                else:
-                    reverse_action_1 = self.reverse_action(vehicle.letter, vehicle_moves[0])
-                    reverse_action_2 = self.reverse_action(vehicle.letter, vehicle_moves[1])
-                    valid_actions[reverse_action_1] = True
-                    valid_actions[reverse_action_2] = True
+        can_back, can_front = self.get_vehicles_movable()
+        horizontal = self.vehicle_orientations == HORIZONTAL
+        # U/D for vertical vehicles, L/R for horizontal ones (see `reverse_action`)
+        base = self.get_action_order() * 4 + np.where(horizontal, 2, 0)
+        valid_actions[base[can_back]] = True
+        valid_actions[base[can_front] + 1] = True
         return valid_actions
+
+    def get_vehicles_movable(self):
+        """
+        Check, for all vehicles at once, whether they can move one cell backward
+        (left/up) or forward (right/down).
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Boolean arrays (can_back, can_front),
+            one entry per vehicle in insertion order.
+        """
+        horizontal = self.vehicle_orientations == HORIZONTAL
+        rows = self.vehicle_rows.astype(np.intp)
+        cols = self.vehicle_cols.astype(np.intp)
+        lengths = self.vehicle_lengths.astype(np.intp)
+
+        back_rows = np.where(horizontal, rows, rows - 1)
+        back_cols = np.where(horizontal, cols - 1, cols)
+        front_rows = np.where(horizontal, rows, rows + lengths)
+        front_cols = np.where(horizontal, cols + lengths, cols)
+        return (self._cells_empty(back_rows, back_cols),
+                self._cells_empty(front_rows, front_cols))
+
+    def get_free_distances(self, max_distance: int):
+        """
+        How many cells, up to `max_distance`, every vehicle can slide backward
+        (left/up) and forward (right/down).
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Integer arrays (back, front), one entry
+            per vehicle in insertion order.
+        """
+        horizontal = self.vehicle_orientations == HORIZONTAL
+        rows = self.vehicle_rows.astype(np.intp)
+        cols = self.vehicle_cols.astype(np.intp)
+        lengths = self.vehicle_lengths.astype(np.intp)
+        step_rows = np.where(horizontal, 0, 1)
+        step_cols = np.where(horizontal, 1, 0)
+
+        back = np.zeros(self.num_of_vehicles, dtype=np.intp)
+        front = np.zeros(self.num_of_vehicles, dtype=np.intp)
+        can_back = can_front = np.ones(self.num_of_vehicles, dtype=bool)
+        for distance in range(1, max_distance + 1):
+            can_back = can_back & self._cells_empty(rows - step_rows * distance,
+                                                    cols - step_cols * distance)
+            front_offset = lengths - 1 + distance
+            can_front = can_front & self._cells_empty(rows + step_rows * front_offset,
+                                                      cols + step_cols * front_offset)
+            back += can_back
+            front += can_front
+        return back, front
+
+    def get_all_valid_slides(self, num_of_vehicles: int = 6, max_slide: int = 1) -> np.ndarray:
+        """
+        Get the valid compact actions: two directions per vehicle slot, each with a
+        slide distance of 1 to `max_slide` cells.
+
+        Action `(slot * 2 + direction) * max_slide + distance - 1` slides the vehicle in
+        action slot `slot` backward (direction 0, left/up) or forward (direction 1,
+        right/down) by `distance` cells.
+
+        Returns:
+            numpy.ndarray: Boolean mask of shape (num_of_vehicles * 2 * max_slide,).
+        """
+        back, front = self.get_free_distances(max_slide)
+        free = np.zeros((num_of_vehicles, 2), dtype=np.intp)
+        order = self.get_action_order()
+        free[order, 0] = back
+        free[order, 1] = front
+        distances = np.arange(1, max_slide + 1)
+        return (distances <= free[:, :, None]).ravel()
+
+    def slide_vehicle(self, vehicle, move: str, distance: int = 1) -> bool:
+        """
+        Moves a vehicle `distance` cells in the specified direction, only if every cell
+        on the way is free.
+
+        Returns:
+            bool: True if the vehicle moved, False otherwise (the board is unchanged).
+        """
+        if distance == 1:
+            return self.move_vehicle(vehicle, move)
+        if distance < 1:
+            return False
+        index = int(np.flatnonzero(self.vehicle_letters == ord(vehicle.letter))[0])
+        horizontal = self.vehicle_orientations[index] == HORIZONTAL
+        if horizontal != (move in ("L", "R")):
+            return False
+        back, front = self.get_free_distances(distance)
+        free = back[index] if move in ("L", "U") else front[index]
+        if free < distance:
+            return False
+        for _ in range(distance):
+            self.move_vehicle(vehicle, move)
+        return True
+
+    def _cells_empty(self, rows, cols) -> np.ndarray:
+        """
+        Vectorized `empty_space` over arrays of cell coordinates.
+        """
+        inside = (rows >= 0) & (rows < self.row) & (cols >= 0) & (cols < self.col)
+        empty = np.zeros(len(rows), dtype=bool)
+        empty[inside] = self.grid[rows[inside], cols[inside]] == 0
+        return empty
+
+    def get_action_order(self) -> np.ndarray:
+        """
+        Get the action slot of every vehicle: its position among the sorted vehicle letters.
+        """
+        return np.argsort(np.argsort(self.vehicle_letters, kind="stable"), kind="stable")
     
     def reverse_action(self, vehicle_letter: str, move_direction: str) -> int:
         """
@@ -380,12 +638,7 @@ class Board:
         Returns:
             numpy.ndarray: A flattened numpy array representing the board state.
         """
-        arr = np.zeros((self.row * self.col), dtype=int)
-        for i, row in enumerate(self.board):
-            for j, cell in enumerate(row):
-                if cell != "":
-                    arr[i * self.col + j] = ord(cell)
-        return arr
+        return self.grid.flatten().astype(int)
     
     def get_hash(self):
         """
@@ -394,14 +647,52 @@ class Board:
         Returns:
             int: A hash value representing the board state.
         """
-        return hash(tuple(self.get_board_flatten()))
-    
+        return hash(tuple(self.grid.ravel().tolist()))
+
+    def get_zobrist_hash(self) -> int:
+        """
+        Get a 64-bit Zobrist hash of the board state.
+
+        The hash is computed once and then updated by every `move_vehicle` with two
+        XORs, so hashing the state after each move is O(1).
+
+        Returns:
+            int: The hash value.
+        """
+        if self._zobrist is None:
+            cells = np.flatnonzero(self.grid)
+            keys = ZOBRIST_KEYS[cells, self.grid.ravel()[cells]]
+            self._zobrist = int(np.bitwise_xor.reduce(keys)) if len(keys) else 0
+        return self._zobrist
+
+    def get_canonical_hash(self) -> int:
+        """
+        Get a stable 64-bit hash of the board position, independent of vehicle letters.
+
+        The red car keeps its own label and the other vehicles are relabelled by the
+        order in which they first appear in a row-major scan, so boards that differ
+        only in vehicle colors hash the same. Unlike `get_hash`, the value is the
+        same in every process.
+
+        Returns:
+            int: The canonical hash of the board position.
+        """
+        codes, first, inverse = np.unique(
+            self.grid.ravel(), return_index=True, return_inverse=True)
+        priority = np.where(codes == 0, -2, np.where(codes == ord("X"), -1, first))
+        rank = np.empty(len(codes), dtype=np.uint8)
+        rank[np.argsort(priority, kind="stable")] = np.arange(len(codes))
+        labels = rank[inverse]
+        digest = hashlib.blake2b(
+            bytes((self.row, self.col)) + labels.tobytes(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
     def get_all_vehicles_letter(self):
         """"
         Get all vehicle letters on the board.
         """
         if self.vehicles_letter is None:
-            vehicles_str = [vehicle.letter for vehicle in self.vehicles]
+            vehicles_str = [chr(letter) for letter in self.vehicle_letters]
             vehicles_str.sort()
             self.vehicles_letter = vehicles_str
         return self.vehicles_letter
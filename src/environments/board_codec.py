@@ -0,0 +1,140 @@
+"""
+Single-string board codec.
+
+A board is written as one character per cell in row-major order, as in the widely
+used 36-character Rush Hour format: `o` (or `.`) is an empty cell and every vehicle
+is a letter repeated over the cells it covers. For example, a 6x6 board is:
+
+    "AAoooOPooQoOPXXQoOPooQooBoooCCBoRRRo"
+
+Decoding is strict: the string must describe a square board, every letter must
+cover a straight, contiguous run of 2 or 3 cells, and the red car must lie
+horizontally on the exit row. Walls (`x`) are not supported.
+"""
+import setup_path  # NOQA
+
+import math
+
+import numpy as np
+
+from environments.board import Board
+from environments.vehicles import HORIZONTAL, VERTICAL
+
+EMPTY = "o"
+EMPTY_CHARS = (EMPTY, ".")
+RED_CAR = "X"
+CAR_LETTERS = "ABCDEFGHIJK"
+TRUCK_LETTERS = "OPQR"
+
+
+def encode_board(board) -> str:
+    """
+    Encodes a board as a single string, one character per cell.
+
+    Args:
+        board (Board): The board to encode.
+
+    Returns:
+        str: The encoded board.
+    """
+    codes = board.grid.ravel().copy()
+    codes[codes == 0] = ord(EMPTY)
+    return codes.tobytes().decode("ascii")
+
+
+def decode_arrays(text: str, red_letter: str = RED_CAR, relabel: bool = None):
+    """
+    Decodes a board string into parallel vehicle arrays (see `Board.from_arrays`).
+
+    Args:
+        text (str): The encoded board.
+        red_letter (str): The letter of the red car in `text` ("A" in the standard
+            Rush Hour collections).
+        relabel (bool): Whether to rename the vehicles to this repo's letters: the red
+            car to "X", cars to A-K and trucks to O-R, in letter order. Defaults to
+            True when `red_letter` is not "X".
+
+    Returns:
+        tuple: (size, rows, cols, lengths, orientations, letters).
+
+    Raises:
+        ValueError: If the string is not a valid board.
+    """
+    size = math.isqrt(len(text))
+    if size * size != len(text) or size < 2:
+        raise ValueError(f"Board string of length {len(text)} is not a square board")
+    if relabel is None:
+        relabel = red_letter != RED_CAR
+
+    # Plain Python beats NumPy on strings this short
+    cells = {}
+    for index, char in enumerate(text):
+        if char not in EMPTY_CHARS:
+            cells.setdefault(char, []).append(index)
+
+    letters, rows, cols, lengths, orientations = [], [], [], [], []
+    for letter in sorted(cells):
+        if not ("A" <= letter <= "Z"):
+            raise ValueError(f"Board string contains invalid cell {letter!r}: {text!r}")
+        positions = cells[letter]
+        count = len(positions)
+        first, last = positions[0], positions[-1]
+        row, col = divmod(first, size)
+        if last - first == count - 1 and last // size == row:
+            orientation = HORIZONTAL
+        elif last - first == (count - 1) * size and all(p % size == col for p in positions):
+            orientation = VERTICAL
+        else:
+            orientation = None
+        if orientation is None or not 2 <= count <= 3:
+            raise ValueError(
+                f"Vehicle {letter} is not a straight run of 2 or 3 cells: {text!r}")
+        letters.append(letter)
+        rows.append(row)
+        cols.append(col)
+        lengths.append(count)
+        orientations.append(orientation)
+
+    win_row = (size - 1) // 2
+    if red_letter not in cells:
+        raise ValueError(f"Board has no red car {red_letter!r}: {text!r}")
+    red = letters.index(red_letter)
+    if orientations[red] != HORIZONTAL or lengths[red] != 2 or rows[red] != win_row:
+        raise ValueError(f"Red car must be a horizontal car on row {win_row}: {text!r}")
+
+    if relabel:
+        letters = _relabel(letters, lengths, red)
+
+    return (size, np.array(rows, dtype=np.int8), np.array(cols, dtype=np.int8),
+            np.array(lengths, dtype=np.int8), np.array(orientations, dtype=np.int8),
+            np.array([ord(letter) for letter in letters], dtype=np.uint8))
+
+
+def _relabel(letters: list, lengths: list, red: int) -> list:
+    """
+    Rename vehicles to the red car letter and the car and truck letter pools.
+    """
+    cars = [i for i in range(len(letters)) if i != red and lengths[i] == 2]
+    trucks = [i for i in range(len(letters)) if lengths[i] == 3]
+    if len(cars) > len(CAR_LETTERS) or len(trucks) > len(TRUCK_LETTERS):
+        raise ValueError(
+            f"Board has {len(cars)} cars and {len(trucks)} trucks, at most "
+            f"{len(CAR_LETTERS)} and {len(TRUCK_LETTERS)} are supported")
+    relabelled = list(letters)
+    relabelled[red] = RED_CAR
+    for index, letter in zip(cars, CAR_LETTERS):
+        relabelled[index] = letter
+    for index, letter in zip(trucks, TRUCK_LETTERS):
+        relabelled[index] = letter
+    return relabelled
+
+
+def decode_board(text: str, red_letter: str = RED_CAR, relabel: bool = None) -> Board:
+    """
+    Decodes a board string into a `Board`. See `decode_arrays` for the arguments.
+
+    Raises:
+        ValueError: If the string is not a valid board.
+    """
+    size, rows, cols, lengths, orientations, letters = decode_arrays(text, red_letter, relabel)
+    return Board.from_arrays(size, size, rows, cols, lengths, orientations, letters)
@@ -0,0 +1,324 @@
+"""
+Compact binary format for board datasets, read through `np.memmap`.
+
+File layout (little endian):
+    header   -- HEADER_DTYPE, 32 bytes: magic, version, board size, slot count and table sizes.
+    layouts  -- `num_layouts` records describing the vehicles of a board
+                (count, letter codes, lengths, orientations); boards that share the
+                same vehicles share one layout.
+    boards   -- `num_boards` fixed-size records: layout id, vehicle rows and cols,
+                min_steps, heuristic and is_updated.
+
+Opening a file only maps it, so datasets of millions of boards open in milliseconds,
+and worker processes mapping the same file share its pages. `BoardDataset[i]` returns a
+`Board` whose vehicle arrays are read-only views into the mapping.
+"""
+import setup_path  # NOQA
+
+import os
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from environments.board import Board
+
+MAGIC = b"RHBD"
+VERSION = 1
+EXTENSION = ".rhb"
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("rows", "u1"),
+    ("cols", "u1"),
+    ("max_vehicles", "<u2"),
+    ("reserved", "V6"),
+    ("num_layouts", "<u4"),
+    ("reserved_2", "V4"),
+    ("num_boards", "<u8"),
+])
+
+
+def layout_dtype(max_vehicles: int) -> np.dtype:
+    """
+    Record type of the vehicle-layout table for `max_vehicles` slots.
+    """
+    return np.dtype([
+        ("count", "u1"),
+        ("letters", "u1", (max_vehicles,)),
+        ("lengths", "i1", (max_vehicles,)),
+        ("orientations", "i1", (max_vehicles,)),
+    ])
+
+
+def board_dtype(max_vehicles: int) -> np.dtype:
+    """
+    Record type of the per-board position table for `max_vehicles` slots.
+    """
+    return np.dtype([
+        ("layout", "<u4"),
+        ("rows", "i1", (max_vehicles,)),
+        ("cols", "i1", (max_vehicles,)),
+        ("min_steps", "<i2"),
+        ("heuristic", "<i2"),
+        ("is_updated", "u1"),
+    ])
+
+
+def int16_value(name: str, value) -> int:
+    """
+    `value` as an int for the int16 fields of a record (min_steps and heuristic).
+
+    Raises:
+        ValueError: If `value` is not a whole number in the int16 range, e.g. the
+            infinite heuristic of `Board.get_heuristic` for a blocked board.
+    """
+    info = np.iinfo(np.int16)
+    if not np.isfinite(value) or value != int(value) or not info.min <= value <= info.max:
+        raise ValueError(f"{name} {value!r} does not fit the int16 {name} field")
+    return int(value)
+
+
+class BoardDataset(Sequence):
+    """
+    A memory-mapped, random-access collection of boards stored in the binary format.
+
+    Boards are built on access; their vehicle arrays are zero-copy, read-only views
+    into the file. `deepcopy` a board before moving its vehicles.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a board dataset file: {self.path}")
+        if header["version"][0] != VERSION:
+            raise ValueError(f"Unsupported board dataset version: {header['version'][0]}")
+
+        self.row = int(header["rows"][0])
+        self.col = int(header["cols"][0])
+        self.max_vehicles = int(header["max_vehicles"][0])
+        num_layouts = int(header["num_layouts"][0])
+        num_boards = int(header["num_boards"][0])
+
+        layouts_dtype = layout_dtype(self.max_vehicles)
+        layouts_offset = HEADER_DTYPE.itemsize
+        boards_offset = layouts_offset + num_layouts * layouts_dtype.itemsize
+        self.layouts = np.asarray(np.memmap(
+            self.path, dtype=layouts_dtype, mode="r", offset=layouts_offset, shape=(num_layouts,)))
+        if num_boards:
+            self.records = np.asarray(np.memmap(
+                self.path, dtype=board_dtype(self.max_vehicles), mode="r",
+                offset=boards_offset, shape=(num_boards,)))
+        else:
+            self.records = np.empty(0, dtype=board_dtype(self.max_vehicles))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record = self.records[index]
+        layout = self.layouts[record["layout"]]
+        count = layout["count"]
+        board = Board.from_arrays(
+            self.row,
+            self.col,
+            record["rows"][:count],
+            record["cols"][:count],
+            layout["lengths"][:count],
+            layout["orientations"][:count],
+            layout["letters"][:count],
+        )
+        board.min_steps = int(record["min_steps"])
+        board.heuristic = int(record["heuristic"])
+        board.is_updated = bool(record["is_updated"])
+        return board
+
+    def __reduce__(self):
+        # Workers re-open the file instead of receiving a copy, so they share its pages.
+        return (BoardDataset, (self.path,))
+
+    @property
+    def num_vehicles(self) -> np.ndarray:
+        """
+        Number of vehicles of every board.
+        """
+        return self.layouts["count"][self.records["layout"]]
+
+
+class BoardDatasetWriter:
+    """
+    Streams boards into a binary dataset file.
+
+    Records are buffered and spilled to a temporary file, and the header and layout
+    table are written in front of them on `close`. Only the layout table stays in
+    memory, so memory use grows with the number of distinct vehicle layouts, not with
+    the number of boards.
+
+    Args:
+        filename (str): The name of the file to write.
+        row (int): The number of rows of every board.
+        col (int): The number of columns of every board.
+        max_vehicles (int): The number of vehicle slots of every record.
+    """
+
+    def __init__(self, filename: str, row: int, col: int, max_vehicles: int = 16,
+                 buffer_size: int = 65536):
+        self.filename = str(filename)
+        self.row = row
+        self.col = col
+        self.max_vehicles = max_vehicles
+        self.num_boards = 0
+        self._layout_ids = {}
+        self._buffer = np.zeros(buffer_size, dtype=board_dtype(max_vehicles))
+        self._buffered = 0
+        self._records_path = f"{self.filename}.{os.getpid()}.records.tmp"
+        self._records_file = open(self._records_path, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._records_file.close()
+            os.remove(self._records_path)
+
+    def add(self, board):
+        """
+        Appends a board to the dataset.
+        """
+        if (board.row, board.col) != (self.row, self.col):
+            raise ValueError(
+                f"Board is {board.row}x{board.col}, expected {self.row}x{self.col}")
+        self.add_arrays(board.vehicle_rows, board.vehicle_cols, board.vehicle_lengths,
+                        board.vehicle_orientations, board.vehicle_letters,
+                        board.min_steps, board.heuristic, board.is_updated)
+
+    def add_arrays(self, rows, cols, lengths, orientations, letters,
+                   min_steps: int = 0, heuristic: int = 0, is_updated: bool = False):
+        """
+        Appends a board given as parallel vehicle arrays (see `Board.from_arrays`).
+        """
+        count = len(letters)
+        if count > self.max_vehicles:
+            raise ValueError(f"Board has {count} vehicles, the dataset holds {self.max_vehicles}")
+        key = (np.asarray(letters, dtype=np.uint8).tobytes(),
+               np.asarray(lengths, dtype=np.int8).tobytes(),
+               np.asarray(orientations, dtype=np.int8).tobytes())
+        record = self._buffer[self._buffered]
+        record["layout"] = self._layout_ids.setdefault(key, len(self._layout_ids))
+        record["rows"][:count] = rows
+        record["rows"][count:] = 0
+        record["cols"][:count] = cols
+        record["cols"][count:] = 0
+        record["min_steps"] = int16_value("min_steps", min_steps)
+        record["heuristic"] = int16_value("heuristic", heuristic)
+        record["is_updated"] = is_updated
+        self._buffered += 1
+        self.num_boards += 1
+        if self._buffered == len(self._buffer):
+            self._flush()
+
+    def _flush(self):
+        self._buffer[:self._buffered].tofile(self._records_file)
+        self._buffered = 0
+
+    def close(self):
+        """
+        Writes the header and layout table, followed by the buffered records.
+        """
+        self._flush()
+        self._records_file.close()
+
+        layouts = np.zeros(len(self._layout_ids), dtype=layout_dtype(self.max_vehicles))
+        for (letters, lengths, orientations), layout_id in self._layout_ids.items():
+            count = len(letters)
+            layout = layouts[layout_id]
+            layout["count"] = count
+            layout["letters"][:count] = np.frombuffer(letters, dtype=np.uint8)
+            layout["lengths"][:count] = np.frombuffer(lengths, dtype=np.int8)
+            layout["orientations"][:count] = np.frombuffer(orientations, dtype=np.int8)
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["rows"] = self.row
+        header["cols"] = self.col
+        header["max_vehicles"] = self.max_vehicles
+        header["num_layouts"] = len(layouts)
+        header["num_boards"] = self.num_boards
+
+        with open(self.filename, "wb") as file:
+            header.tofile(file)
+            layouts.tofile(file)
+            with open(self._records_path, "rb") as records_file:
+                shutil.copyfileobj(records_file, file)
+        os.remove(self._records_path)
+
+
+def save_boards_binary(boards, filename: str):
+    """
+    Saves multiple boards to a binary dataset file.
+
+    Args:
+        boards (list): The boards to save. All boards must have the same size.
+        filename (str): The name of the file to save to.
+    """
+    if not boards:
+        raise ValueError("Cannot save an empty board dataset")
+    max_vehicles = max(board.num_of_vehicles for board in boards)
+    with BoardDatasetWriter(filename, boards[0].row, boards[0].col, max_vehicles) as writer:
+        for board in boards:
+            writer.add(board)
+
+
+def load_boards_binary(filename: str) -> BoardDataset:
+    """
+    Opens a binary dataset file.
+
+    Args:
+        filename (str): The name of the file to load from.
+    """
+    return BoardDataset(filename)
+
+
+def convert_json_to_binary(json_path, output_path=None) -> str:
+    """
+    Converts a JSON board list (as written by `Board.save_multiple_boards`) to the binary format.
+
+    Args:
+        json_path: The JSON file to convert.
+        output_path: The binary file to write. Defaults to `json_path` with the `.rhb` extension.
+
+    Returns:
+        str: The path of the written binary file.
+    """
+    json_path = Path(json_path)
+    if output_path is None:
+        output_path = json_path.with_suffix(EXTENSION)
+    boards = Board.load_multiple_boards(str(json_path))
+    save_boards_binary(boards, str(output_path))
+    return str(output_path)
+
+
+def convert_database(input_folder="database"):
+    """
+    Converts every board JSON file in `input_folder` to the binary format, next to the JSON file.
+    """
+    for file in sorted(os.listdir(input_folder)):
+        if not file.endswith(".json"):
+            continue
+        if "trajectory" in file or "feedback" in file or "config" in file:
+            continue  # skip non-board data
+        output_path = convert_json_to_binary(os.path.join(input_folder, file))
+        print(f"Converted {file} -> {output_path}")
+
+
+if __name__ == "__main__":
+    convert_database()
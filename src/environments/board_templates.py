@@ -0,0 +1,228 @@
+"""
+Packed, array-only copies of a board collection.
+
+Every board becomes one row of a set of NumPy arrays: its code grid and its
+vehicles in action-slot order (sorted by letter, as in `Board.get_all_vehicles_letter`),
+padded to a fixed number of slots. Vectorized environments step these arrays
+directly, and restoring a board is an array copy instead of a `deepcopy`.
+"""
+import setup_path  # NOQA
+
+import weakref
+
+import numpy as np
+
+from environments.board import Board
+from environments.board_dataset import BoardDataset, int16_value
+from environments.init_boards_from_database import BoardSubset
+from environments.vehicles import VERTICAL
+
+# Templates of board collections that are reused, e.g. the database splits shared by
+# every environment of a process
+_templates_cache = weakref.WeakKeyDictionary()
+
+
+def _board_sizes(boards) -> np.ndarray:
+    """
+    The (rows, columns) of every board of a collection, without building any `Board`
+    for the binary datasets.
+    """
+    if isinstance(boards, BoardDataset):
+        return np.tile(np.array([boards.row, boards.col], dtype=np.int8), (len(boards), 1))
+    if isinstance(boards, BoardSubset):
+        dataset_sizes = np.array([[dataset.row, dataset.col] for dataset in boards.datasets],
+                                 dtype=np.int8)
+        dataset_ids = np.searchsorted(boards.offsets, boards.indices, side="right") - 1
+        return dataset_sizes[dataset_ids]
+    return np.array([[board.row, board.col] for board in boards], dtype=np.int8).reshape(-1, 2)
+
+
+class BoardTemplates:
+    """
+    Packed copies of a board collection, one row per board.
+
+    Boards of different sizes can be mixed: the grids are padded to the largest size
+    and `sizes` records the size of every board.
+
+    Attributes:
+        row (int): The largest number of rows of the boards.
+        col (int): The largest number of columns of the boards.
+        sizes (numpy.ndarray): (M, 2) rows and columns of every board.
+        mixed_sizes (bool): Whether the boards do not all have the same size.
+        num_slots (int): The number of vehicle slots of every board.
+        grids (numpy.ndarray): (M, row, col) letter codes, 0 when empty or outside the board.
+        rows, cols, lengths, orientations (numpy.ndarray): (M, num_slots) vehicle arrays.
+        letters (numpy.ndarray): (M, num_slots) letter codes, 0 for unused slots.
+        counts (numpy.ndarray): (M,) number of vehicles of every board.
+        min_steps, heuristic (numpy.ndarray): (M,) values stored with every board.
+        ids_by_count (dict): Vehicle count -> ids of the boards with that many vehicles.
+    """
+
+    def __init__(self, boards, num_slots: int = None):
+        if len(boards) == 0:
+            raise ValueError("Cannot build templates from an empty board collection")
+        self.sizes = _board_sizes(boards)
+        self.row, self.col = (int(size) for size in self.sizes.max(axis=0))
+        self.mixed_sizes = bool((self.sizes != self.sizes[0]).any())
+        if isinstance(boards, (BoardDataset, BoardSubset)):
+            self.counts = np.asarray(boards.num_vehicles, dtype=np.int8)
+        else:
+            self.counts = np.fromiter(
+                (board.num_of_vehicles for board in boards), dtype=np.int8, count=len(boards))
+        if num_slots is None:
+            num_slots = int(self.counts.max())
+        if self.counts.max() > num_slots:
+            raise ValueError(
+                f"Boards have up to {self.counts.max()} vehicles, only {num_slots} slots available")
+        self.num_slots = num_slots
+
+        size = len(boards)
+        self.grids = np.zeros((size, self.row, self.col), dtype=np.uint8)
+        self.rows = np.zeros((size, num_slots), dtype=np.int8)
+        self.cols = np.zeros((size, num_slots), dtype=np.int8)
+        self.lengths = np.zeros((size, num_slots), dtype=np.int8)
+        self.orientations = np.zeros((size, num_slots), dtype=np.int8)
+        self.letters = np.zeros((size, num_slots), dtype=np.uint8)
+        self.min_steps = np.zeros(size, dtype=np.int16)
+        self.heuristic = np.zeros(size, dtype=np.int16)
+
+        if isinstance(boards, BoardDataset):
+            self._pack_records(boards, np.arange(size), np.arange(size))
+        elif isinstance(boards, BoardSubset):
+            for dataset_index, dataset in enumerate(boards.datasets):
+                start, stop = boards.offsets[dataset_index], boards.offsets[dataset_index + 1]
+                ids = np.flatnonzero((boards.indices >= start) & (boards.indices < stop))
+                self._pack_records(dataset, ids, boards.indices[ids] - start)
+        else:
+            self._pack_boards(boards)
+
+        self.ids_by_count = {int(count): np.flatnonzero(self.counts == count)
+                             for count in np.unique(self.counts)}
+
+    def _pack_boards(self, boards):
+        """
+        Fill the template arrays from `Board` objects.
+        """
+        for index, board in enumerate(boards):
+            order = np.argsort(board.vehicle_letters, kind="stable")
+            count = len(order)
+            self.grids[index, :board.row, :board.col] = board.grid
+            self.rows[index, :count] = board.vehicle_rows[order]
+            self.cols[index, :count] = board.vehicle_cols[order]
+            self.lengths[index, :count] = board.vehicle_lengths[order]
+            self.orientations[index, :count] = board.vehicle_orientations[order]
+            self.letters[index, :count] = board.vehicle_letters[order]
+            self.min_steps[index] = int16_value("min_steps", board.min_steps)
+            self.heuristic[index] = int16_value("heuristic", board.heuristic)
+
+    def _pack_records(self, dataset: BoardDataset, ids: np.ndarray, records_ids: np.ndarray):
+        """
+        Fill templates `ids` from records `records_ids` of a binary dataset, without
+        building any `Board`.
+        """
+        records = dataset.records[records_ids]
+        layouts = dataset.layouts[records["layout"]]
+        width = min(dataset.max_vehicles, self.num_slots)
+        counts = layouts["count"].astype(np.intp)
+
+        # Slot order: sorted by letter, unused slots last
+        used = np.arange(dataset.max_vehicles) < counts[:, None]
+        order = np.argsort(np.where(used, layouts["letters"], 256), axis=1, kind="stable")[:, :width]
+        used = np.take_along_axis(used, order, axis=1)
+        for name, column in (("rows", records["rows"]), ("cols", records["cols"]),
+                             ("lengths", layouts["lengths"]),
+                             ("orientations", layouts["orientations"]),
+                             ("letters", layouts["letters"])):
+            slots = np.take_along_axis(column, order, axis=1)
+            getattr(self, name)[ids, :width] = np.where(used, slots, 0)
+        self.min_steps[ids] = records["min_steps"]
+        self.heuristic[ids] = records["heuristic"]
+
+        rows = self.rows[ids].astype(np.intp)
+        cols = self.cols[ids].astype(np.intp)
+        lengths = self.lengths[ids]
+        vertical = self.orientations[ids] == VERTICAL
+        letters = self.letters[ids]
+        for offset in range(int(lengths.max(initial=0))):
+            board_ids, slots = np.nonzero((letters != 0) & (lengths > offset))
+            cell_rows = rows[board_ids, slots] + offset * vertical[board_ids, slots]
+            cell_cols = cols[board_ids, slots] + offset * ~vertical[board_ids, slots]
+            self.grids[ids[board_ids], cell_rows, cell_cols] = letters[board_ids, slots]
+
+    def __len__(self):
+        return len(self.grids)
+
+    def to_board(self, index: int) -> Board:
+        """
+        Builds a new `Board` from a template.
+        """
+        count = self.counts[index]
+        row, col = (int(size) for size in self.sizes[index])
+        board = Board.from_arrays(
+            row,
+            col,
+            self.rows[index, :count].copy(),
+            self.cols[index, :count].copy(),
+            self.lengths[index, :count].copy(),
+            self.orientations[index, :count].copy(),
+            self.letters[index, :count].copy(),
+        )
+        board.min_steps = int(self.min_steps[index])
+        board.heuristic = int(self.heuristic[index])
+        return board
+
+    def restore(self, board: Board, index: int) -> Board:
+        """
+        Overwrites `board` in place with a template, reusing its grids.
+
+        Args:
+            board (Board): The board to overwrite, or None to build a new one.
+            index (int): The template to restore.
+
+        Returns:
+            Board: `board`, or a new board when it is None or of another size.
+        """
+        row, col = (int(size) for size in self.sizes[index])
+        if board is None or (board.row, board.col) != (row, col):
+            return self.to_board(index)
+        count = self.counts[index]
+        board.load_arrays(
+            self.rows[index, :count],
+            self.cols[index, :count],
+            self.lengths[index, :count],
+            self.orientations[index, :count],
+            self.letters[index, :count],
+            self.grids[index, :row, :col],
+        )
+        board.min_steps = int(self.min_steps[index])
+        board.heuristic = int(self.heuristic[index])
+        board.is_updated = False
+        return board
+
+    def board_ids(self, num_of_vehicles: int) -> np.ndarray:
+        """
+        Ids of the templates with `num_of_vehicles` vehicles.
+
+        Raises:
+            ValueError: If no template has that many vehicles.
+        """
+        ids = self.ids_by_count.get(num_of_vehicles)
+        if ids is None:
+            raise ValueError(f"No board found with {num_of_vehicles} vehicles.")
+        return ids
+
+
+def board_templates(boards) -> BoardTemplates:
+    """
+    Templates of a board collection, built once per collection when it can be
+    weakly referenced (e.g. the database splits), else built on every call.
+    """
+    if isinstance(boards, BoardTemplates):
+        return boards
+    try:
+        templates = _templates_cache.get(boards)
+    except TypeError:
+        return BoardTemplates(boards)
+    if templates is None:
+        templates = _templates_cache[boards] = BoardTemplates(boards)
+    return templates
@@ -7,6 +7,7 @@ import random
 from copy import deepcopy
 from datetime import datetime
 
+from PIL import Image
 from tqdm import tqdm
 
 import setup_path  # NOQA
@@ -14,7 +15,7 @@ from algorithms.ASTAR import astar
 
 from environments.board_random import BoardRandom
 from environments.vehicles import Car, Truck
-from GUI.board_to_image import car_colors, save_board_to_image, truck_colors
+from GUI.board_to_image import car_colors, render_batch, truck_colors
 from utils.config import BOARD_SIZE
 DIRECTIONS = ["UD", "RL"]
 
@@ -86,10 +87,10 @@ def save(boards, path, save_images=False):
     BoardRandom.save_multiple_boards(boards, filename)
     if save_images:
         os.makedirs(path, exist_ok=True)
-        for i, board in enumerate(boards):
-            save_board_to_image(board, rf"{path}/board-{i}.png")
-            if i == 10:
-                break
+        # Preview the first boards, rendered together
+        for i, img in enumerate(render_batch(boards[:11])):
+            Image.fromarray(img).save(rf"{path}/board-{i}.png")
+        print(f"Board images saved to {path}")
 
 def main():
     num_cards = 100
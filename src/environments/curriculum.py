@@ -0,0 +1,164 @@
+"""
+Difficulty-bucketed board index and a curriculum sampler built on it.
+
+`BoardIndex` groups the boards of a `BoardTemplates` collection into buckets of equal
+(vehicle count, min_steps, heuristic, `calculate_difficulty`) and orders the buckets
+from easiest to hardest. `CurriculumSampler` draws boards from the unlocked levels of
+that order and unlocks the next level once the rolling success rate is high enough.
+"""
+import setup_path  # NOQA
+
+from collections import deque
+
+import numpy as np
+
+from environments.board_templates import board_templates
+from environments.calculate_difficulty import calculate_difficulty
+
+BUCKET_FIELDS = ("num_vehicles", "min_steps", "heuristic", "difficulty")
+
+
+class BoardIndex:
+    """
+    Boards bucketed by difficulty features.
+
+    Attributes:
+        templates (BoardTemplates): The indexed boards; ids are template ids.
+        features (numpy.ndarray): (M, 4) features of every board, see `BUCKET_FIELDS`.
+        buckets (dict): Feature tuple -> ids of the boards with those features.
+        order (list): Bucket keys from easiest to hardest, by
+            (min_steps, difficulty, heuristic, num_vehicles).
+    """
+
+    def __init__(self, boards):
+        self.templates = board_templates(boards)
+        templates = self.templates
+        difficulty = np.fromiter(
+            (calculate_difficulty(templates.to_board(i)) for i in range(len(templates))),
+            dtype=np.int16, count=len(templates))
+        self.features = np.stack(
+            [templates.counts, templates.min_steps, templates.heuristic, difficulty],
+            axis=1).astype(np.int16)
+
+        keys, inverse = np.unique(self.features, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        self.buckets = {tuple(int(value) for value in key): np.flatnonzero(inverse == i)
+                        for i, key in enumerate(keys)}
+        self.order = sorted(self.buckets, key=lambda key: (key[1], key[3], key[2], key[0]))
+
+    def __len__(self):
+        return len(self.templates)
+
+    def select(self, num_vehicles=None, min_steps=None, heuristic=None, difficulty=None) -> np.ndarray:
+        """
+        Ids of the boards matching the given features. Each feature is a value or an
+        inclusive (low, high) range; None matches anything.
+        """
+        selected = np.ones(len(self), dtype=bool)
+        for column, value in enumerate((num_vehicles, min_steps, heuristic, difficulty)):
+            if value is None:
+                continue
+            low, high = value if isinstance(value, tuple) else (value, value)
+            selected &= (self.features[:, column] >= low) & (self.features[:, column] <= high)
+        return np.flatnonzero(selected)
+
+    def levels(self, num_levels: int) -> list:
+        """
+        Split the buckets, in difficulty order, into up to `num_levels` levels of
+        similar size. A bucket is never split between levels.
+
+        Returns:
+            list[numpy.ndarray]: The board ids of every non-empty level, easiest first.
+        """
+        if num_levels < 1:
+            raise ValueError(f"num_levels must be positive, got {num_levels}")
+        levels = [[] for _ in range(num_levels)]
+        start = 0
+        for key in self.order:
+            ids = self.buckets[key]
+            levels[start * num_levels // len(self)].append(ids)
+            start += len(ids)
+        return [np.concatenate(level) for level in levels if level]
+
+
+class CurriculumSampler:
+    """
+    Samples boards from the levels of a `BoardIndex`, starting with the easiest one.
+
+    The newest unlocked level is drawn with probability `current_weight`; the rest is
+    spread evenly over the easier levels so they are not forgotten. Once the success
+    rate over the last `window_size` episodes reaches `promote_threshold`, the next
+    level is unlocked and the history is cleared.
+
+    Args:
+        index (BoardIndex): The indexed boards.
+        num_levels (int): The number of difficulty levels.
+        window_size (int): The number of episodes of the rolling success rate.
+        promote_threshold (float): The success rate that unlocks the next level.
+        current_weight (float): The probability of drawing from the newest level.
+    """
+
+    def __init__(self, index: BoardIndex, num_levels: int = 5, window_size: int = 100,
+                 promote_threshold: float = 0.8, current_weight: float = 0.7):
+        if not 0 < current_weight <= 1:
+            raise ValueError(f"current_weight must be in (0, 1], got {current_weight}")
+        self.index = index
+        self.levels = index.levels(num_levels)
+        self.window_size = window_size
+        self.promote_threshold = promote_threshold
+        self.current_weight = current_weight
+        self.level = 0
+        self.history = deque(maxlen=window_size)
+
+    @property
+    def templates(self):
+        return self.index.templates
+
+    @property
+    def success_rate(self) -> float:
+        return sum(self.history) / len(self.history) if self.history else 0.0
+
+    def level_weights(self) -> np.ndarray:
+        """
+        Probability of drawing from every level.
+        """
+        weights = np.zeros(len(self.levels))
+        if self.level == 0:
+            weights[0] = 1.0
+        else:
+            weights[:self.level] = (1 - self.current_weight) / self.level
+            weights[self.level] = self.current_weight
+        return weights
+
+    def sample(self, rng: np.random.Generator) -> int:
+        """
+        Draw a board id.
+        """
+        level = self.levels[rng.choice(len(self.levels), p=self.level_weights())]
+        return int(level[rng.integers(len(level))])
+
+    def update(self, success: bool) -> bool:
+        """
+        Record the outcome of an episode.
+
+        Returns:
+            bool: Whether a new level was unlocked.
+        """
+        self.history.append(bool(success))
+        if (len(self.history) == self.window_size
+                and self.success_rate >= self.promote_threshold
+                and self.level < len(self.levels) - 1):
+            self.level += 1
+            self.history.clear()
+            return True
+        return False
+
+
+if __name__ == "__main__":
+    from environments.rush_hour_env import RushHourEnv
+
+    index = BoardIndex(RushHourEnv.train_boards)
+    for key in index.order:
+        print(dict(zip(BUCKET_FIELDS, key)), len(index.buckets[key]))
+    sampler = CurriculumSampler(index)
+    print([len(level) for level in sampler.levels])
@@ -0,0 +1,116 @@
+"""
+Builders for training environments: action-masked Rush Hour environments, and
+vector environments running one of them per worker process, or stepping all the
+boards together in NumPy (`RushHourVecEnv`).
+
+Every worker gets its own shard of the boards (see `shard_boards`) and its own seed,
+so workers never sample the same sequence of boards.
+"""
+import setup_path  # NOQA
+
+from sb3_contrib.common.wrappers import ActionMasker
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor
+
+from environments.curriculum import BoardIndex, CurriculumSampler
+from environments.init_boards_from_database import shard_boards
+from environments.rewards import basic_reward
+from environments.rush_hour_env import RushHourEnv
+from environments.rush_hour_image_env import RushHourImageEnv
+from environments.rush_hour_vec_env import RushHourVecEnv
+
+VEC_ENV_BACKENDS = ("gym", "numpy")
+
+
+def mask_fn(env):
+    """
+    This function returns the valid action mask for the current state of the env.
+    It must return a boolean np.ndarray of shape (env.action_space.n,)
+    """
+    return env.get_action_mask()
+
+
+def make_env(num_of_vehicle: int, cnn: bool = False, train: bool = True, rewards=basic_reward,
+             image_size=(128, 128), rank: int = 0, num_workers: int = 1, curriculum: bool = False,
+             observation: str = "codes", env_kwargs: dict = None):
+    """
+    Get a function building one action-masked environment, for worker `rank` of `num_workers`.
+
+    Args:
+        num_of_vehicle (int): The number of vehicle slots of the action space.
+        cnn (bool): Whether to build the image environment.
+        train (bool): Whether to use the train or the test boards.
+        rewards: The reward function.
+        image_size (tuple): The observation size of the image environment.
+        rank (int): The index of the worker; selects its shard of the boards.
+        num_workers (int): The number of workers sharing the boards.
+        curriculum (bool): Whether to draw boards through a `CurriculumSampler`
+            (`RushHourEnv` only); every worker tracks its own success rate.
+        observation (str): The observation mode of `RushHourEnv`, see `observations`.
+        env_kwargs (dict): Extra keyword arguments of the environment, e.g.
+            `action_mode="compact"` and `max_slide` for `RushHourEnv`, or
+            `observation="atlas_codes"` for `RushHourImageEnv`.
+
+    Returns:
+        callable: A picklable function returning the environment.
+    """
+    env_kwargs = env_kwargs or {}
+    env_class = RushHourImageEnv if cnn else RushHourEnv
+    boards = env_class.train_boards if train else env_class.test_boards
+    if num_workers > 1:
+        boards = shard_boards(boards, rank, num_workers)
+
+    def _init():
+        if cnn:
+            env = RushHourImageEnv(num_of_vehicle, image_size=image_size, train=train,
+                                   rewards=rewards, boards=boards, **env_kwargs)
+        else:
+            sampler = CurriculumSampler(BoardIndex(boards)) if curriculum else None
+            env = RushHourEnv(num_of_vehicle, rewards=rewards, train=train, boards=boards,
+                              curriculum=sampler, observation=observation, **env_kwargs)
+        return Monitor(ActionMasker(env, mask_fn))
+
+    return _init
+
+
+def make_vec_env(num_of_vehicle: int, num_workers: int = 1, cnn: bool = False, train: bool = True,
+                 rewards=basic_reward, image_size=(128, 128), seed: int = None,
+                 curriculum: bool = False, observation: str = "codes", env_kwargs: dict = None,
+                 backend: str = "gym"):
+    """
+    Build a vector environment of `num_workers` action-masked environments.
+
+    With the "gym" backend, every environment is a `RushHourEnv` (or `RushHourImageEnv`);
+    with more than one worker each runs in its own process (`SubprocVecEnv`), a single
+    worker runs in-process. Worker `rank` is seeded with `seed + rank`.
+
+    With the "numpy" backend, `num_workers` boards are stepped together in one
+    `RushHourVecEnv`, with its "codes" observations and U/D/L/R actions, and
+    episode statistics from `VecMonitor`.
+
+    Either way `MaskablePPO` reads the masks of all boards through
+    `env_method("action_masks")`.
+
+    Raises:
+        ValueError: If the backend is unknown, or the "numpy" backend is asked for
+            an option it does not support.
+
+    Returns:
+        VecEnv: The vector environment.
+    """
+    if backend not in VEC_ENV_BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {VEC_ENV_BACKENDS}")
+    if backend == "numpy":
+        if cnn or curriculum or observation != "codes" or env_kwargs:
+            raise ValueError("The numpy backend only supports the 'codes' observations "
+                             "and the default actions, without curriculum")
+        vec_env = RushHourVecEnv(num_workers, num_of_vehicle, train=train, rewards=rewards)
+        vec_env.seed(seed)
+        return VecMonitor(vec_env)
+
+    env_fns = [make_env(num_of_vehicle, cnn, train, rewards, image_size, rank, num_workers,
+                        curriculum, observation, env_kwargs)
+               for rank in range(num_workers)]
+    vec_env = SubprocVecEnv(env_fns) if num_workers > 1 else DummyVecEnv(env_fns)
+    vec_env.seed(seed)
+    return vec_env
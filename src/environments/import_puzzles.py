@@ -0,0 +1,149 @@
+"""
+Bulk import of puzzle collections stored as text, one board string per line
+(see `board_codec`), into the JSON or binary board format.
+
+Lines may carry extra whitespace-separated fields, as in the standard collections
+("<moves> <board> <cluster size>"); the board is the first field of the right shape.
+Lines are decoded in chunks by a process pool and streamed into the output, so files
+with millions of puzzles never have to fit in memory when writing the binary format.
+"""
+import setup_path  # NOQA
+
+import math
+import os
+import sys
+from itertools import chain, islice
+from multiprocessing import Pool
+
+from tqdm import tqdm
+
+from environments.board import Board
+from environments.board_codec import decode_arrays
+from environments.board_dataset import EXTENSION, BoardDatasetWriter
+
+
+def find_board_field(line: str):
+    """
+    Get the board string of a line, or None for blank and comment lines.
+    """
+    for field in line.split():
+        if field.startswith("#"):
+            return None
+        size = math.isqrt(len(field))
+        if size > 1 and size * size == len(field) and field.replace(".", "o").isalpha():
+            return field
+    return None
+
+
+def _decode_chunk(args):
+    """
+    Decode a chunk of lines. Runs in the worker processes.
+
+    Returns:
+        tuple[list, int]: The decoded vehicle arrays and the number of rejected lines.
+    """
+    lines, red_letter, relabel = args
+    decoded, rejected = [], 0
+    for line in lines:
+        field = find_board_field(line)
+        if field is None:
+            continue
+        try:
+            decoded.append(decode_arrays(field, red_letter, relabel))
+        except ValueError:
+            rejected += 1
+    return decoded, rejected
+
+
+def _chunks(lines, chunk_size: int):
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_decoded(txt_path, red_letter: str = "A", relabel: bool = None, processes: int = None,
+                 chunk_size: int = 10_000, limit: int = None, stats: dict = None):
+    """
+    Stream the decoded vehicle arrays of a puzzle text file, in file order.
+
+    Args:
+        txt_path: The puzzle file.
+        red_letter (str): The letter of the red car in the file ("A" in the standard collections).
+        relabel (bool): See `board_codec.decode_arrays`.
+        processes (int): Number of worker processes. Defaults to the number of CPUs.
+        chunk_size (int): Number of lines decoded per task.
+        limit (int): Stop after this many boards.
+        stats (dict): If given, receives the "boards" and "rejected" counts.
+
+    Yields:
+        tuple: (size, rows, cols, lengths, orientations, letters) for every board.
+    """
+    if stats is None:
+        stats = {}
+    stats.update(boards=0, rejected=0)
+    with open(txt_path, "r") as file, Pool(processes) as pool:
+        tasks = ((chunk, red_letter, relabel) for chunk in _chunks(iter(file), chunk_size))
+        for decoded, rejected in pool.imap(_decode_chunk, tasks):
+            stats["rejected"] += rejected
+            for arrays in decoded:
+                if limit is not None and stats["boards"] >= limit:
+                    return
+                stats["boards"] += 1
+                yield arrays
+
+
+def import_puzzles(txt_path, output_path, red_letter: str = "A", relabel: bool = None,
+                   processes: int = None, chunk_size: int = 10_000, limit: int = None,
+                   max_vehicles: int = 16) -> dict:
+    """
+    Import a puzzle text file into a board file.
+
+    The output format follows the extension of `output_path`: `.rhb` streams into the
+    binary format (see `board_dataset`), anything else is saved with
+    `Board.save_multiple_boards`. All boards must have the same size.
+
+    Returns:
+        dict: The number of imported and rejected boards.
+    """
+    stats = {}
+    decoded = iter_decoded(txt_path, red_letter, relabel, processes, chunk_size, limit, stats)
+    progress = tqdm(decoded, desc="Importing puzzles", unit=" boards")
+
+    if str(output_path).endswith(EXTENSION):
+        progress = iter(progress)
+        first = next(progress, None)
+        if first is None:
+            raise ValueError(f"No boards found in {txt_path}")
+        size = first[0]
+        # The writer removes its temporary records file if the import fails
+        with BoardDatasetWriter(output_path, size, size, max_vehicles) as writer:
+            for board_size, rows, cols, lengths, orientations, letters in chain([first], progress):
+                if board_size != size:
+                    raise ValueError(f"Board of size {board_size} in a {size}x{size} dataset")
+                writer.add_arrays(rows, cols, lengths, orientations, letters)
+    else:
+        boards = [Board.from_arrays(size, size, rows, cols, lengths, orientations, letters)
+                  for size, rows, cols, lengths, orientations, letters in progress]
+        Board.save_multiple_boards(boards, str(output_path))
+
+    print(f"Imported {stats['boards']} boards from {txt_path} ({stats['rejected']} rejected)")
+    return stats
+
+
+def main(argv=None):
+    """
+    Import a puzzle file: `python src/environments/import_puzzles.py <puzzles.txt> [output]`.
+    The output defaults to the puzzle file name with the binary extension.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(argv) <= 2:
+        sys.exit("usage: import_puzzles.py <puzzles.txt> [output]")
+    txt_path = argv[0]
+    output_path = argv[1] if len(argv) > 1 else os.path.splitext(txt_path)[0] + EXTENSION
+    import_puzzles(txt_path, output_path, red_letter="A")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,315 @@
-from sklearn.model_selection import train_test_split
 import setup_path  # NOQA
 from environments.board import Board
+from environments.board_dataset import BoardDataset, save_boards_binary
+from collections.abc import Sequence
+from functools import lru_cache
+import hashlib
 import json
 import os
 from pathlib import Path
 
+import numpy as np
 
-def initialize_boards(input_folder=None):
+CACHE_FOLDER_NAME = ".cache"
+CACHE_INDEX_FILE = "index.json"
+MANIFEST_VERSION = 1
+TEST_SIZE = 0.2
+SPLIT_BUCKETS = 10_000
+
+
+def default_database_folder() -> str:
+    file_path = Path(__file__)
+    return str(file_path.parent.parent.parent / "database")
+
+
+def is_board_file(file: str) -> bool:
+    """
+    Whether a file in the database folder is a board JSON list.
+    """
+    if not file.endswith(".json"):
+        return False
+    return not ("trajectory" in file or "feedback" in file or "config" in file)
+
+
+class BoardSubset(Sequence):
+    """
+    A read-only sequence of boards selected by global index from several datasets.
+    Boards are built on access.
+    """
+
+    def __init__(self, datasets, indices):
+        self.datasets = datasets
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.offsets = np.cumsum([0] + [len(dataset) for dataset in datasets])
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        global_index = int(self.indices[index])
+        dataset_index = int(np.searchsorted(self.offsets, global_index, side="right")) - 1
+        return self.datasets[dataset_index][global_index - int(self.offsets[dataset_index])]
+
+    @property
+    def num_vehicles(self) -> np.ndarray:
+        """
+        Number of vehicles of every board.
+        """
+        if not self.datasets:
+            return np.empty(0, dtype=np.int64)
+        counts = np.concatenate([dataset.num_vehicles for dataset in self.datasets])
+        return counts[self.indices]
+
+    def shard(self, rank: int, num_shards: int) -> "BoardSubset":
+        """
+        Every `num_shards`-th board, starting at `rank`, without loading any board.
+        """
+        return BoardSubset(self.datasets, self.indices[rank::num_shards])
+
+
+def shard_boards(boards, rank: int, num_shards: int):
+    """
+    Split a board collection between `num_shards` workers.
+
+    Args:
+        boards: The boards, a `BoardSubset`, a `BoardDataset` or a list.
+        rank (int): The index of the worker.
+        num_shards (int): The number of workers.
+
+    Returns:
+        Sequence: Every `num_shards`-th board, starting at `rank`. Dataset-backed
+        collections stay lazy, so a shard pickles as file paths and indices.
+    """
+    if not 0 <= rank < num_shards:
+        raise ValueError(f"Invalid shard {rank} of {num_shards}")
+    if isinstance(boards, BoardSubset):
+        return boards.shard(rank, num_shards)
+    if isinstance(boards, BoardDataset):
+        return BoardSubset([boards], np.arange(rank, len(boards), num_shards))
+    return boards[rank::num_shards]
+
+
+class LazyBoards:
+    """
+    Class attribute that loads a board split on first access.
+
+    `loader(*args)` must return a (train, test) pair and should be cached, so that
+    the train and test attributes of a class share one load.
+    """
+
+    def __init__(self, loader, index, *args):
+        self.loader = loader
+        self.index = index
+        self.args = args
+
+    def __get__(self, instance, owner):
+        return self.loader(*self.args)[self.index]
+
+
+def _file_digest(path: Path, index: dict) -> str:
+    """
+    Get the content hash of a file, reusing the digest in `index` while its size and
+    modification time are unchanged.
+    """
+    stat = path.stat()
+    entry = index.get(path.name)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    index[path.name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def _load_index(cache_folder: Path) -> dict:
+    try:
+        with open(cache_folder / CACHE_INDEX_FILE, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_folder: Path, index: dict):
+    tmp_path = cache_folder / f"{CACHE_INDEX_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(index, file)
+    os.replace(tmp_path, cache_folder / CACHE_INDEX_FILE)
+
+
+def _cached_dataset(json_path: Path, digest: str, cache_folder: Path) -> BoardDataset:
+    """
+    Open the binary cache of a board JSON file, parsing the JSON only on a cache miss.
+
+    Returns:
+        BoardDataset: The cached boards, or None if the file has no boards.
+    """
+    cache_path = cache_folder / f"{digest}.rhb"
+    if not cache_path.exists():
+        boards = Board.load_multiple_boards(str(json_path))
+        if not boards:
+            return None
+        tmp_path = cache_folder / f"{digest}.{os.getpid()}.tmp"
+        save_boards_binary(boards, str(tmp_path))
+        os.replace(tmp_path, cache_path)
+    return BoardDataset(cache_path)
+
+
+def _cached_hashes(dataset: BoardDataset, digest: str, cache_folder: Path) -> np.ndarray:
+    """
+    Get the canonical hash of every board of a cached file, computed once per file.
+    """
+    hashes_path = cache_folder / f"{digest}.hashes.npy"
+    if hashes_path.exists():
+        return np.load(hashes_path)
+    hashes = np.fromiter((board.get_canonical_hash() for board in dataset),
+                         dtype=np.uint64, count=len(dataset))
+    tmp_path = cache_folder / f"{digest}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, hashes)
+    os.replace(tmp_path, hashes_path)
+    return hashes
+
+
+def is_test_board(hashes: np.ndarray, test_size: float = TEST_SIZE) -> np.ndarray:
+    """
+    Assign boards to the test set from their canonical hashes.
+
+    The assignment of a board never depends on the other boards, so adding files
+    to the database does not move existing boards between train and test.
+    """
+    return hashes % SPLIT_BUCKETS < int(round(test_size * SPLIT_BUCKETS))
+
+
+def build_manifest(names, digests, hashes_per_file, test_size: float = TEST_SIZE):
+    """
+    Deduplicate boards across files and split them into train and test.
+
+    Files are processed in order, keeping the first occurrence of every canonical
+    position; the split of each kept board comes from `is_test_board`.
+
+    Returns:
+        tuple[dict, numpy.ndarray, numpy.ndarray]: The manifest summary and the global
+        train and test board indices.
+    """
+    seen = np.empty(0, dtype=np.uint64)
+    offset = 0
+    train, test, files = [], [], []
+    for name, digest, hashes in zip(names, digests, hashes_per_file):
+        _, first = np.unique(hashes, return_index=True)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first] = True
+        keep &= ~np.isin(hashes, seen)
+        seen = np.union1d(seen, hashes)
+
+        kept = np.flatnonzero(keep)
+        in_test = is_test_board(hashes[kept], test_size)
+        train.append(kept[~in_test] + offset)
+        test.append(kept[in_test] + offset)
+        files.append({
+            "file": name,
+            "sha256": digest,
+            "boards": len(hashes),
+            "duplicates": int(len(hashes) - len(kept)),
+            "train": int(np.count_nonzero(~in_test)),
+            "test": int(np.count_nonzero(in_test)),
+        })
+        offset += len(hashes)
+
+    manifest = {"version": MANIFEST_VERSION, "test_size": test_size, "files": files}
+    return manifest, np.concatenate(train), np.concatenate(test)
+
+
+def _cached_manifest(names, digests, hashes_per_file, cache_folder: Path, test_size: float):
+    """
+    Get the train/test indices of a set of files, stored in a manifest under the hash
+    of the file hashes.
+    """
+    key = hashlib.sha256(
+        f"{MANIFEST_VERSION}:{test_size}:{''.join(digests)}".encode()).hexdigest()
+    manifest_path = cache_folder / f"manifest-{key}.npz"
+    if manifest_path.exists():
+        with np.load(manifest_path) as manifest:
+            return manifest["train"], manifest["test"]
+
+    manifest, train, test = build_manifest(names, digests, hashes_per_file, test_size)
+    tmp_path = cache_folder / f"manifest-{key}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, train=train, test=test, summary=json.dumps(manifest))
+    os.replace(tmp_path, manifest_path)
+    return train, test
+
+
+def load_boards_cached(json_paths, cache_folder, test_size: float = TEST_SIZE):
+    """
+    Load board JSON files through the on-disk cache and return their train/test split.
+
+    Every file is cached in the binary board format under the hash of its contents,
+    so unchanged files are never parsed again. Duplicate positions are dropped across
+    files and the split is assigned per board from its canonical hash (see
+    `build_manifest`); the result is stored in a manifest under the hash of all file hashes.
+
+    Returns:
+        tuple[BoardSubset, BoardSubset]: The train and test boards.
+    """
+    cache_folder = Path(cache_folder)
+    cache_folder.mkdir(parents=True, exist_ok=True)
+    index = _load_index(cache_folder)
+
+    digests = [_file_digest(Path(path), index) for path in json_paths]
+    datasets = [_cached_dataset(Path(path), digest, cache_folder)
+                for path, digest in zip(json_paths, digests)]
+    _save_index(cache_folder, index)
+
+    # Files without boards have no binary cache and no part in the split
+    files = [(Path(path).name, digest, dataset)
+             for path, digest, dataset in zip(json_paths, digests, datasets) if dataset is not None]
+    if not files:
+        return BoardSubset([], []), BoardSubset([], [])
+    names, digests, datasets = (list(column) for column in zip(*files))
+    hashes_per_file = [_cached_hashes(dataset, digest, cache_folder)
+                       for dataset, digest in zip(datasets, digests)]
+    train, test = _cached_manifest(names, digests, hashes_per_file, cache_folder, test_size)
+    return BoardSubset(datasets, train), BoardSubset(datasets, test)
+
+
+def initialize_boards(input_folder=None, cache_folder=None):
     """
     Initialize all board JSONs from the database folder, excluding non-board files.
     """
     if input_folder is None:
-        file_path = Path(__file__)
-        input_folder = file_path.parent.parent.parent / "database"
-        input_folder = str(input_folder)
-
-    boards = []
-    for file in os.listdir(input_folder):
-        if not file.endswith(".json"):
-            continue
-        if "trajectory" in file or "feedback" in file or "config" in file:
-            continue  # skip non-board data
-        json_boards_path = os.path.join(input_folder, file)
-        boards.extend(Board.load_multiple_boards(json_boards_path))
+        input_folder = default_database_folder()
+    if cache_folder is None:
+        cache_folder = Path(input_folder) / CACHE_FOLDER_NAME
 
-    return train_test_split(boards, test_size=0.2, random_state=42)
+    json_paths = [os.path.join(input_folder, file)
+                  for file in sorted(os.listdir(input_folder)) if is_board_file(file)]
+    return load_boards_cached(json_paths, cache_folder)
 
 
-def load_specific_board_file(filename="1000_cards_4_cars_1_trucks.json", input_folder="database"):
+def load_specific_board_file(filename="1000_cards_4_cars_1_trucks.json", input_folder="database",
+                             cache_folder=None):
     """
     Load a specific board JSON file and return a train/test split.
     """
     json_path = Path(input_folder) / filename
     if not json_path.exists():
         raise FileNotFoundError(f"Board file not found: {json_path}")
+    if cache_folder is None:
+        cache_folder = Path(input_folder) / CACHE_FOLDER_NAME
+
+    return load_boards_cached([str(json_path)], cache_folder)
+
+
+@lru_cache(maxsize=None)
+def database_boards():
+    """
+    The train/test split of the whole database, loaded once per process.
+    """
+    return initialize_boards()
+
 
-    boards = Board.load_multiple_boards(str(json_path))
-    return train_test_split(boards, test_size=0.2, random_state=42)
+@lru_cache(maxsize=None)
+def database_board_file(filename: str, input_folder: str = "database"):
+    """
+    The train/test split of a single database file, loaded once per process.
+    """
+    return load_specific_board_file(filename=filename, input_folder=input_folder)
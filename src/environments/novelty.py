@@ -0,0 +1,51 @@
+"""
+Bounded per-episode record of visited board states, for repetition and novelty rewards.
+"""
+
+
+class NoveltyTracker:
+    """
+    Visit counts of board hashes (see `Board.get_zobrist_hash`), keeping at most
+    `capacity` states. When full, the state first seen longest ago is forgotten,
+    so lookups are O(1) and memory does not grow with the episode length.
+
+    Args:
+        capacity (int): The maximum number of states remembered.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.counts = {}
+
+    def reset(self):
+        """
+        Forget every state, at the start of an episode.
+        """
+        self.counts.clear()
+
+    def visit(self, state_hash: int) -> int:
+        """
+        Record a visit of a state.
+
+        Returns:
+            int: The number of visits of the state, including this one.
+        """
+        count = self.counts.get(state_hash, 0) + 1
+        if count == 1 and len(self.counts) >= self.capacity:
+            del self.counts[next(iter(self.counts))]
+        self.counts[state_hash] = count
+        return count
+
+    def count(self, state_hash: int) -> int:
+        """
+        The number of recorded visits of a state, 0 if unseen or forgotten.
+        """
+        return self.counts.get(state_hash, 0)
+
+    def __contains__(self, state_hash) -> bool:
+        return state_hash in self.counts
+
+    def __len__(self):
+        return len(self.counts)
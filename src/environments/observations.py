@@ -0,0 +1,166 @@
+"""
+Board observations built directly from the board arrays, without rendering.
+
+Observation modes of `RushHourEnv`:
+    "codes" -- the flat `uint8` letter codes of the grid (`Board.get_board_flatten`).
+    "grid"  -- a (C, H, W) one-hot tensor, see `board_to_one_hot`.
+    "entities" -- one feature row per vehicle slot and a validity mask, see
+                `board_to_entities`. The features are relative to the board size, so
+                6x6 and 8x8 boards share one observation space.
+"""
+import setup_path  # NOQA
+
+import numpy as np
+from gymnasium import spaces
+
+from environments.vehicles import HORIZONTAL, VERTICAL
+
+OBSERVATION_MODES = ("codes", "grid", "entities")
+
+# Channels after the vehicle slots of a one-hot grid
+HORIZONTAL_CHANNEL = 0
+VERTICAL_CHANNEL = 1
+RED_CAR_CHANNEL = 2
+EMPTY_CHANNEL = 3
+NUM_EXTRA_CHANNELS = 4
+
+# Columns of an entity row
+ENTITY_FEATURES = (
+    "row",          # Top row / board rows
+    "col",          # Left column / board columns
+    "length",       # Length / board columns
+    "horizontal",
+    "vertical",
+    "red_car",
+    "can_back",     # Can move up or left
+    "can_front",    # Can move down or right
+    "blocks_exit",  # Covers a cell between the red car and the exit
+)
+
+
+def one_hot_channels(num_of_vehicle: int) -> int:
+    """
+    Number of channels of a one-hot grid with `num_of_vehicle` vehicle slots.
+    """
+    return num_of_vehicle + NUM_EXTRA_CHANNELS
+
+
+def observation_space(mode: str, row: int, col: int, num_of_vehicle: int) -> spaces.Box:
+    """
+    The observation space of an observation mode.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    if mode == "codes":
+        return spaces.Box(low=0, high=255, shape=(row * col,), dtype=np.uint8)
+    if mode == "grid":
+        return spaces.Box(low=0, high=1, shape=(one_hot_channels(num_of_vehicle), row, col),
+                          dtype=np.uint8)
+    if mode == "entities":
+        return spaces.Dict({
+            "entities": spaces.Box(low=0, high=1, shape=(num_of_vehicle, len(ENTITY_FEATURES)),
+                                   dtype=np.float32),
+            "mask": spaces.Box(low=0, high=1, shape=(num_of_vehicle,), dtype=np.uint8),
+        })
+    raise ValueError(f"Unknown observation mode {mode!r}, expected one of {OBSERVATION_MODES}")
+
+
+def board_to_one_hot(board, num_of_vehicle: int) -> np.ndarray:
+    """
+    Encodes a board as a (C, H, W) one-hot tensor.
+
+    Channel `i < num_of_vehicle` marks the cells of the vehicle in action slot `i`
+    (vehicles sorted by letter, as in `parse_action`). The last four channels mark
+    horizontal vehicles, vertical vehicles, the red car and empty cells.
+
+    Args:
+        board (Board): The board to encode.
+        num_of_vehicle (int): The number of vehicle slots.
+
+    Returns:
+        numpy.ndarray: The `uint8` tensor of shape (num_of_vehicle + 4, row, col).
+    """
+    if board.num_of_vehicles > num_of_vehicle:
+        raise ValueError(
+            f"Board has {board.num_of_vehicles} vehicles, only {num_of_vehicle} slots available")
+    # Letter code -> 1 + action slot, and letter code -> orientation
+    slot_of_code = np.zeros(256, dtype=np.intp)
+    slot_of_code[board.vehicle_letters] = board.get_action_order() + 1
+    orientation_of_code = np.full(256, -1, dtype=np.int8)
+    orientation_of_code[board.vehicle_letters] = board.vehicle_orientations
+
+    grid = board.grid
+    slots = slot_of_code[grid]
+    orientations = orientation_of_code[grid]
+
+    obs = np.zeros((one_hot_channels(num_of_vehicle), board.row, board.col), dtype=np.uint8)
+    rows, cols = np.nonzero(slots)
+    obs[slots[rows, cols] - 1, rows, cols] = 1
+    extra = obs[num_of_vehicle:]
+    extra[HORIZONTAL_CHANNEL] = orientations == HORIZONTAL
+    extra[VERTICAL_CHANNEL] = orientations == VERTICAL
+    extra[RED_CAR_CHANNEL] = grid == ord("X")
+    extra[EMPTY_CHANNEL] = grid == 0
+    return obs
+
+
+def board_to_entities(board, num_of_vehicle: int) -> dict:
+    """
+    Encodes a board as a fixed-capacity list of vehicle feature rows.
+
+    Row `i` describes the vehicle in action slot `i` (vehicles sorted by letter, as in
+    `parse_action`); see `ENTITY_FEATURES` for the columns. Unused rows are zero and
+    have a zero mask.
+
+    Args:
+        board (Board): The board to encode.
+        num_of_vehicle (int): The number of rows.
+
+    Returns:
+        dict: "entities", a `float32` array of shape (num_of_vehicle, len(ENTITY_FEATURES)),
+        and "mask", a `uint8` array of shape (num_of_vehicle,).
+    """
+    count = board.num_of_vehicles
+    if count > num_of_vehicle:
+        raise ValueError(
+            f"Board has {count} vehicles, only {num_of_vehicle} slots available")
+    order = np.argsort(board.vehicle_letters, kind="stable")
+    letters = board.vehicle_letters[order]
+    horizontal = board.vehicle_orientations[order] == HORIZONTAL
+    can_back, can_front = board.get_vehicles_movable()
+
+    # Vehicles between the red car and the exit
+    exit_row = board.grid[board.win_x]
+    red_cells = np.flatnonzero(exit_row == ord("X"))
+    ahead = exit_row[red_cells[-1] + 1:] if len(red_cells) else exit_row[:0]
+    blocks_exit = np.isin(letters, ahead[ahead != 0])
+
+    entities = np.zeros((num_of_vehicle, len(ENTITY_FEATURES)), dtype=np.float32)
+    rows = entities[:count]
+    rows[:, 0] = board.vehicle_rows[order] / board.row
+    rows[:, 1] = board.vehicle_cols[order] / board.col
+    rows[:, 2] = board.vehicle_lengths[order] / board.col
+    rows[:, 3] = horizontal
+    rows[:, 4] = ~horizontal
+    rows[:, 5] = letters == ord("X")
+    rows[:, 6] = can_back[order]
+    rows[:, 7] = can_front[order]
+    rows[:, 8] = blocks_exit
+
+    mask = np.zeros(num_of_vehicle, dtype=np.uint8)
+    mask[:count] = 1
+    return {"entities": entities, "mask": mask}
+
+
+def board_observation(board, mode: str, num_of_vehicle: int):
+    """
+    The observation of a board in the given mode.
+    """
+    if mode == "codes":
+        return board.grid.ravel().copy()
+    if mode == "grid":
+        return board_to_one_hot(board, num_of_vehicle)
+    if mode == "entities":
+        return board_to_entities(board, num_of_vehicle)
+    raise ValueError(f"Unknown observation mode {mode!r}, expected one of {OBSERVATION_MODES}")
@@ -1,3 +1,18 @@
+"""
+Reward functions.
+
+Every reward has two forms:
+    * a per-step function, called by the environments with
+      (state_history, current_state, vehicle, valid_move, done, truncated, board, steps, max_steps);
+    * a batched function over arrays of transitions, see `batched_reward`, so vectorized
+      environments compute the rewards of all their boards in one NumPy expression.
+"""
+import numpy as np
+
+# Per-step reward function -> batched version
+BATCHED_REWARDS = {}
+
+
 def basic_reward(state_history, current_state, vehicle, valid_move, done, truncated, board, steps, max_steps=5):
     """
     Basic reward: small penalty per step, heavy penalty for invalid moves, reward for solving.
@@ -18,12 +33,10 @@ def valid_moves_reward(state_history, current_state, vehicle, valid_move, done,
     """
     reward = -1  # Base step penalty
 
-    possible_moves = vehicle.get_possible_moves(board) if vehicle else []
-
-    if valid_move not in possible_moves:
-        reward -= 10
-    else:
+    if valid_move:
         reward += 5
+    else:
+        reward -= 10
 
     if done:
         reward += 1000
@@ -39,12 +52,10 @@ def per_steps_reward(state_history, current_state, vehicle, valid_move, done, tr
     """
     reward = -1 + (1 - steps / max_steps)  # Encourage shorter episodes
 
-    possible_moves = vehicle.get_possible_moves(board) if vehicle else []
-
-    if valid_move not in possible_moves:
-        reward -= 10
-    else:
+    if valid_move:
         reward += 5
+    else:
+        reward -= 10
 
     if done:
         reward += 1000 - 2 * steps
@@ -57,10 +68,12 @@ def per_steps_reward(state_history, current_state, vehicle, valid_move, done, tr
 def reward_function_no_repetition(state_history, current_state, vehicle, valid_move, done, truncated, board, steps, max_steps=5):
     """
     Penalizes repeating board states and rewards exploring new ones.
+
+    `state_history` is the episode's `NoveltyTracker`; the lookup is O(1).
     """
     reward = 0
 
-    if tuple(current_state.flatten()) in state_history:
+    if board.get_zobrist_hash() in state_history:
         reward -= 5
     else:
         reward += 1
@@ -83,4 +96,67 @@ def reward_heuristic(state_history, current_state, vehicle, valid_move, done, tr
     if done:
         reward += 1000
 
-    return reward
\ No newline at end of file
+    return reward
+
+
+def _batched(reward, inputs=()):
+    """
+    Register a batched reward as the batched version of `reward`.
+
+    `inputs` names the optional arrays it reads: "heuristic" (`Board.get_heuristic`
+    of every board after the move) and "repeated" (whether the board after the move
+    was already visited in the episode).
+    """
+    def register(batched):
+        batched.inputs = tuple(inputs)
+        BATCHED_REWARDS[reward] = batched
+        return batched
+    return register
+
+
+def batched_reward(reward):
+    """
+    Get the batched version of a reward function.
+
+    A batched reward takes arrays with one entry per transition,
+    `(valid, done, truncated, steps, max_steps, heuristic=None, repeated=None)`, and
+    returns the rewards as a float array.
+
+    Raises:
+        ValueError: If the reward has no batched version.
+    """
+    if hasattr(reward, "inputs"):
+        return reward
+    if reward not in BATCHED_REWARDS:
+        raise ValueError(f"Reward {getattr(reward, '__name__', reward)} has no batched version")
+    return BATCHED_REWARDS[reward]
+
+
+@_batched(basic_reward)
+def basic_reward_batch(valid, done, truncated, steps, max_steps=5, heuristic=None, repeated=None):
+    return -1.0 - 5.0 * ~valid + 1000.0 * done - 100.0 * truncated
+
+
+@_batched(valid_moves_reward)
+def valid_moves_reward_batch(valid, done, truncated, steps, max_steps=5, heuristic=None,
+                             repeated=None):
+    return -1.0 + np.where(valid, 5.0, -10.0) + 1000.0 * done - 100.0 * truncated
+
+
+@_batched(per_steps_reward)
+def per_steps_reward_batch(valid, done, truncated, steps, max_steps=5, heuristic=None,
+                           repeated=None):
+    reward = -1.0 + (1 - steps / max_steps) + np.where(valid, 5.0, -10.0)
+    return reward + (1000.0 - 2 * steps) * done - 100.0 * truncated
+
+
+@_batched(reward_function_no_repetition, inputs=("repeated",))
+def reward_function_no_repetition_batch(valid, done, truncated, steps, max_steps=5,
+                                        heuristic=None, repeated=None):
+    return np.where(repeated, -5.0, 1.0) + (1000.0 - 3 * steps) * done - 100.0 * truncated
+
+
+@_batched(reward_heuristic, inputs=("heuristic",))
+def reward_heuristic_batch(valid, done, truncated, steps, max_steps=5, heuristic=None,
+                           repeated=None):
+    return -1.0 - heuristic + 1000.0 * done
@@ -1,52 +1,97 @@
 from gymnasium import Env, spaces
 from copy import deepcopy
-from random import choice
 import numpy as np
 from gymnasium import Env, spaces
 
 
 from environments.board import Board
+from environments.board_templates import board_templates
+from environments.novelty import NoveltyTracker
+from environments.observations import board_observation, observation_space
 from environments.rewards import basic_reward
-from environments.init_boards_from_database import initialize_boards, load_specific_board_file
+from environments.init_boards_from_database import LazyBoards, database_boards
 
 
 
 class RushHourEnv(Env):
-    train_boards, test_boards = initialize_boards()
+    # Loaded from the database on first access, see `init_boards_from_database`
+    train_boards = LazyBoards(database_boards, 0)
+    test_boards = LazyBoards(database_boards, 1)
 
-    def __init__(self, num_of_vehicle: int = 6, min_vehicles: int = 4, rewards=basic_reward, train=True):
+    def __init__(self, num_of_vehicle: int = 6, min_vehicles: int = 4, rewards=basic_reward, train=True,
+                 boards=None, curriculum=None, observation="codes", action_mode="moves", max_slide=1,
+                 history_size=4096, shaping=None):
         super().__init__()
-        self.boards = RushHourEnv.train_boards if train else RushHourEnv.test_boards
+        if boards is None:
+            boards = RushHourEnv.train_boards if train else RushHourEnv.test_boards
+        self.boards = boards
         self.max_steps = 100 if train else 50
         #num_of_vehicle = len(self.boards[0].get_all_vehicles_letter())
         self.num_of_vehicle = num_of_vehicle
         self.get_reward = rewards
-        size = self.boards[0].row * self.boards[0].col
+        # "codes", "grid" or "entities", see `observations`; rewards always see the codes
+        self.observation = observation
+        # "moves": U, D, L, R per vehicle slot. "compact": back/forward per vehicle slot,
+        # each with a slide distance of 1 to `max_slide` cells (see `Board.get_all_valid_slides`)
+        if action_mode not in ("moves", "compact"):
+            raise ValueError(f"Unknown action mode {action_mode!r}, expected 'moves' or 'compact'")
+        self.action_mode = action_mode
+        self.max_slide = max_slide if action_mode == "compact" else 1
 
-        self.boards = RushHourEnv.train_boards if train else RushHourEnv.test_boards
         self.max_steps = 200 if train else 100
 
+        self.templates = None  # Built on the first reset, see `board_templates`
+        # Optional `CurriculumSampler`; its board ids refer to its own templates
+        self.curriculum = curriculum
+        if curriculum is not None:
+            self.templates = curriculum.templates
         self.board = None
         self.state = None
         self.num_steps = 0
-        self.state_history = []
+        # Optional `DistanceShaping`, added to the reward of every step
+        self.shaping = shaping
+        # Visited states of the episode, for the repetition rewards
+        self.state_history = NoveltyTracker(history_size)
         self.vehicles_letter = []
 
-        self.action_space = spaces.Discrete(self.num_of_vehicle * 4)
-        self.observation_space = spaces.Box(
-            low=0, high=255, shape=(size,), dtype=np.uint8
-        )
+        if action_mode == "compact":
+            self.action_space = spaces.Discrete(self.num_of_vehicle * 2 * self.max_slide)
+        else:
+            self.action_space = spaces.Discrete(self.num_of_vehicle * 4)
+        self.observation_space = observation_space(
+            observation, self.boards[0].row, self.boards[0].col, self.num_of_vehicle)
 
     def reset(self, board=None, seed=None,options=None):
-        self.board = deepcopy(choice(self.boards)) if board is None else deepcopy(board)
+        """
+        Start an episode from `board`, or from a board of the dataset when it is None.
+
+        `self.board` is a buffer reused by every episode: sampled boards are restored
+        into it in place (see `BoardTemplates.restore`) and steps move its vehicles, so
+        a `Board` reference kept from an earlier episode changes too. Copy the board
+        (e.g. `deepcopy(env.board)`) to keep it. A given `board` is copied, never changed.
+        """
+        super().reset(seed=seed)
+        if board is None and self.curriculum is not None:
+            self.restore_board(self.curriculum.sample(self.np_random))
+        elif board is None:
+            self.restore_board(self.sample_board_id())
+        else:
+            self.board = deepcopy(board)
+        return self._reset_episode()
+
+    def _reset_episode(self):
         self.vehicles_letter = self.board.get_all_vehicles_letter()
         self.num_steps = 0
         self.total_reward = 0
+        self.state_history.reset()
+        self.state_history.visit(self.board.get_zobrist_hash())
+        if self.shaping is not None:
+            self.shaping.reset(self.board)
         self.state = self.board.get_board_flatten().astype(np.uint8)
-        return self.state, self._get_info()
+        return self._get_obs(), self._get_info()
 
     def step(self, action):
-        vehicle_str, move_str = self.parse_action(action)
+        vehicle_str, move_str, distance = self.parse_action(action)
         vehicle = self.board.get_vehicle_by_letter(
             vehicle_str) if vehicle_str else None
 
@@ -54,7 +99,7 @@ class RushHourEnv(Env):
         done = False
 
         if vehicle:
-            valid_move = self.board.move_vehicle(vehicle, move_str)
+            valid_move = self.board.slide_vehicle(vehicle, move_str, distance)
             done = self.board.game_over()
 
         self.num_steps += 1
@@ -72,15 +117,25 @@ class RushHourEnv(Env):
             self.num_steps,
             max_steps=self.max_steps
         )
+        if self.shaping is not None:
+            reward += self.shaping.step(self.board, done)
         self.total_reward += reward
         self.state = current_state
-        return self.state, reward, done, truncated, self._get_info()
+        self.state_history.visit(self.board.get_zobrist_hash())
+        if self.curriculum is not None and (done or truncated):
+            self.curriculum.update(done)
+        return self._get_obs(), reward, done, truncated, self._get_info()
+
+    def _get_obs(self):
+        if self.observation == "codes":
+            return self.state
+        return board_observation(self.board, self.observation, self.num_of_vehicle)
     
     def _get_info(self):
         """
         Ensures that info contains the 'action_mask' required by MaskablePPO.
         """
-        action_mask = self.board.get_all_valid_actions(self.num_of_vehicle)
+        action_mask = self.get_action_mask()
      
         return {
             "red_car_escaped": self.board.game_over(),
@@ -92,14 +147,72 @@ class RushHourEnv(Env):
     def render(self):
         print(self.board)
 
+    def get_action_mask(self):
+        """
+        The valid actions of the current board, in the layout of the action space.
+        """
+        if self.action_mode == "compact":
+            return self.board.get_all_valid_slides(self.num_of_vehicle, self.max_slide)
+        return self.board.get_all_valid_actions(self.num_of_vehicle)
+
     def parse_action(self, action):
+        """
+        Decode an action into (vehicle letter, move, number of cells).
+        """
+        if self.action_mode == "compact":
+            slot, distance = divmod(int(action), self.max_slide)
+            vehicle, forward = divmod(slot, 2)
+            if vehicle >= len(self.vehicles_letter):
+                return None, None, 0
+            vehicle_str = self.vehicles_letter[vehicle]
+            horizontal = self.board.get_vehicle_by_letter(vehicle_str).direction == "RL"
+            move_str = ("LR" if horizontal else "UD")[forward]
+            return vehicle_str, move_str, distance + 1
+
         vehicle = action // 4
         move = action % 4
         move_str = ["U", "D", "L", "R"][move]
+        if vehicle >= len(self.vehicles_letter):
+            return None, None, 0
         vehicle_str = self.vehicles_letter[vehicle]
 
-        return vehicle_str, move_str
+        return vehicle_str, move_str, 1
     
+    def get_templates(self):
+        """
+        The boards packed as templates, built on first use. Only the entity observations
+        accept boards of mixed sizes; the other observations have the shape of the board.
+        """
+        if self.templates is None:
+            templates = board_templates(self.boards)
+            if templates.mixed_sizes and self.observation != "entities":
+                raise ValueError(f"{self.observation!r} observations need boards of a single size, "
+                                 "use observation='entities' for mixed sizes")
+            self.templates = templates
+        return self.templates
+
+    def sample_board_id(self, num_of_vehicle: int = None) -> int:
+        """
+        Pick a random board id, optionally among the boards with `num_of_vehicle`
+        vehicles, using the environment's seeded generator.
+        """
+        if num_of_vehicle is None:
+            return int(self.np_random.integers(len(self.boards)))
+        ids = self.get_templates().board_ids(num_of_vehicle)
+        return int(ids[self.np_random.integers(len(ids))])
+
+    def restore_board(self, board_id: int):
+        """
+        Load a board into the environment's board buffer, without copying `Board` objects.
+        """
+        self.board = self.get_templates().restore(self.board, board_id)
+
+    def sample_board(self):
+        """
+        Pick a random board, using the environment's seeded generator.
+        """
+        return self.boards[self.sample_board_id()]
+
     def get_current_board(self):
         return deepcopy(self.board)
 
@@ -109,14 +222,8 @@ class RushHourEnv(Env):
         """
         Reset the environment with a specific number of vehicles.
         """
-        board = choice(self.boards)
-        count = 0
-        while board.num_of_vehicles != num_of_vehicle :
-            count += 1
-            board = choice(self.boards)
-            if count > 100:
-                raise ValueError(f"No board found with {num_of_vehicle} vehicles.")
-        return self.reset(board)
+        self.restore_board(self.sample_board_id(num_of_vehicle))
+        return self._reset_episode()
 
 if __name__ == "__main__":
     env = RushHourEnv(num_of_vehicle=16)
@@ -1,57 +1,107 @@
 from copy import deepcopy
-from random import choice
 
 import numpy as np
 from gymnasium import Env, spaces
+from PIL import Image
 
 import setup_path  # NOQA
-from GUI.board_to_image import generate_board_image
-from environments.init_boards_from_database import initialize_boards, load_specific_board_file
+from GUI.board_to_image import cached_board_image, render_cache, tile_atlas
+from environments.board_templates import board_templates
+from environments.init_boards_from_database import LazyBoards, database_board_file
+from environments.novelty import NoveltyTracker
 from environments.rewards import basic_reward
 
 
 class RushHourImageEnv(Env):
-    train_boards, test_boards = load_specific_board_file(
-        filename="1000_cards_2_cars_1_trucks.json", input_folder="database")
+    # Loaded on first access, see `init_boards_from_database`
+    train_boards = LazyBoards(database_board_file, 0, "1000_cards_2_cars_1_trucks.json")
+    test_boards = LazyBoards(database_board_file, 1, "1000_cards_2_cars_1_trucks.json")
 
-    def __init__(self, num_of_vehicle: int, image_size=(84, 84), train=True, rewards=basic_reward):
+    def __init__(self, num_of_vehicle: int, image_size=(84, 84), train=True, rewards=basic_reward,
+                 boards=None, history_size=4096, renderer="atlas", image_dtype=np.float32,
+                 cache=render_cache, observation="image"):
         super().__init__()
 
-        self.boards = RushHourImageEnv.train_boards if train else RushHourImageEnv.test_boards
+        if boards is None:
+            boards = RushHourImageEnv.train_boards if train else RushHourImageEnv.test_boards
+        self.boards = boards
         self.max_steps = 200 if train else 100
 
         self.image_size = image_size
+        # "atlas": NumPy lookup renderer (nearest-neighbor resize, see `TileAtlas`).
+        # "pil": the original `generate_board_image` + bicubic resize, for older models
+        if renderer not in ("atlas", "pil"):
+            raise ValueError(f"Unknown renderer {renderer!r}, expected 'atlas' or 'pil'")
+        self.renderer = renderer
+        # `RenderCache` of the "pil" frames and `render`; the atlas redraws two cells per
+        # step, which costs about as much as a lookup, so it does not use the cache
+        self.cache = cache
+        # float32 images in [0, 1], or uint8 images in [0, 255] (4x smaller rollout buffers;
+        # `RushHourCNN` normalizes them)
+        self.image_dtype = np.dtype(image_dtype)
+        if self.image_dtype not in (np.float32, np.uint8):
+            raise ValueError(f"Unknown image dtype {self.image_dtype}, expected float32 or uint8")
+        # "image": rendered frames. "atlas_codes": the (row, col) letter codes, rendered inside
+        # the policy by `RushHourAtlasCNN`, so the environment and the rollout buffer hold no images
+        if observation not in ("image", "atlas_codes"):
+            raise ValueError(
+                f"Unknown observation {observation!r}, expected 'image' or 'atlas_codes'")
+        self.observation = observation
         self.num_of_vehicle = num_of_vehicle
         self.get_reward = rewards
 
         self.action_space = spaces.Discrete(num_of_vehicle * 4)
-        self.observation_space = spaces.Box(
-            low=0, high=1.0, shape=(*image_size, 3), dtype=np.float32
-        )
+        if observation == "atlas_codes":
+            self.observation_space = spaces.Box(
+                low=0, high=255, shape=(self.boards[0].row, self.boards[0].col), dtype=np.uint8)
+        else:
+            self.observation_space = spaces.Box(
+                low=0, high=255 if self.image_dtype == np.uint8 else 1.0, shape=(*image_size, 3),
+                dtype=self.image_dtype
+            )
 
         self.state = None
         self.board = None
+        self.templates = board_templates(self.boards)
+        if observation == "atlas_codes" and self.templates.mixed_sizes:
+            raise ValueError("Code observations need boards of a single size")
         self.vehicles_letter = sorted(
-            list({v.letter for b in self.boards for v in b.vehicles}))
+            chr(code) for code in np.unique(self.templates.letters) if code)
 
         self.num_steps = 0
-        self.state_history = []
+        # Visited states of the episode, for the repetition rewards
+        self.state_history = NoveltyTracker(history_size)
+        # Last rendered frame and the codes it shows, for redrawing only the changed cells
+        self._frame = None
+        self._frame_codes = None
 
         print(f"num_vehicles: {self.num_of_vehicle}")
 
-    def reset(self, board=None, seed=None):
-        self.board = deepcopy(
-            choice(self.boards)) if board is None else deepcopy(board)
+    def reset(self, board=None, seed=None, options=None):
+        """
+        Start an episode from `board`, or from a board of the dataset when it is None.
+
+        `self.board` is a buffer reused by every episode: sampled boards are restored
+        into it in place (see `BoardTemplates.restore`) and steps move its vehicles, so
+        a `Board` reference kept from an earlier episode changes too. Copy the board
+        (e.g. `deepcopy(env.board)`) to keep it. A given `board` is copied, never changed.
+        """
+        super().reset(seed=seed)
+        if board is None:
+            board_id = int(self.np_random.integers(len(self.templates)))
+            self.board = self.templates.restore(self.board, board_id)
+        else:
+            self.board = deepcopy(board)
         self.vehicles_letter = self.board.get_all_vehicles_letter()
         self.num_steps = 0
-        self.state_history = []
+        self.state_history.reset()
 
-        self.state = self._board_to_image(self.board)
-        self.state_history.append(tuple(self.state.flatten()))
+        self.state = self._get_obs(self.board)
+        self.state_history.visit(self.board.get_zobrist_hash())
         return self.state, self._get_info()
 
     def step(self, action):
-        vehicle_str, move_str = self.parse_action(action)
+        vehicle_str, move_str, distance = self.parse_action(action)
         vehicle = self.board.get_vehicle_by_letter(
             vehicle_str) if vehicle_str else None
 
@@ -59,13 +109,13 @@ class RushHourImageEnv(Env):
         done = False
 
         if vehicle:
-            valid_move = self.board.move_vehicle(vehicle, move_str)
+            valid_move = self.board.slide_vehicle(vehicle, move_str, distance)
             done = self.board.game_over()
 
         self.num_steps += 1
         truncated = self.num_steps >= self.max_steps
 
-        current_state = self._board_to_image(self.board)
+        current_state = self._get_obs(self.board)
         reward = self.get_reward(
             self.state_history,
             current_state,
@@ -79,30 +129,66 @@ class RushHourImageEnv(Env):
         )
 
         self.state = current_state
-        self.state_history.append(tuple(current_state.flatten()))
+        self.state_history.visit(self.board.get_zobrist_hash())
         return self.state, reward, done, truncated, self._get_info()
 
     def render(self):
-        img = generate_board_image(
-            self.board, scale=self.image_size[0] // 6, draw_letters=True)
-        img.show()
+        img = cached_board_image(
+            self.board, scale=self.image_size[0] // 6, draw_letters=True, cache=self.cache)
+        Image.fromarray(img).show()
+
+    def _get_obs(self, board):
+        if self.observation == "atlas_codes":
+            return board.grid.copy()
+        return self._board_to_image(board)
 
     def _board_to_image(self, board):
-        img = generate_board_image(
-            board, scale=self.image_size[0] // 6, draw_letters=False)
-        img = img.resize(self.image_size)
-        img_array = np.asarray(img).astype(np.float32) / 255.0
-        return np.clip(img_array, 0, 1)
+        if self.renderer == "atlas":
+            img_array = self._render_frame(board)
+        else:
+            img_array = cached_board_image(
+                board, scale=self.image_size[0] // 6, draw_letters=False, size=self.image_size,
+                cache=self.cache)
+        if self.image_dtype == np.uint8:
+            return img_array.copy()
+        return img_array.astype(np.float32) / 255.0
+
+    def _render_frame(self, board):
+        """
+        Render a board with the tile atlas into the frame buffer. Only the cells whose
+        codes changed since the last frame are redrawn, so a step costs the same on any
+        board size.
+        """
+        atlas = tile_atlas(board.row, board.col, board.win_x, board.win_y,
+                           self.image_size[0] // 6, tuple(self.image_size))
+        codes = board.grid
+        if (self._frame is None or self._frame.shape != atlas.shape
+                or self._frame_codes.shape != codes.shape):
+            self._frame = atlas.render(codes)
+        else:
+            changed = np.flatnonzero(codes != self._frame_codes)
+            atlas.draw_cells(self._frame, codes, changed)
+        self._frame_codes = codes.copy()
+        return self._frame
+
+    def get_action_mask(self):
+        """
+        The valid actions of the current board, in the layout of the action space.
+        """
+        return self.board.get_all_valid_actions(self.num_of_vehicle)
 
     def parse_action(self, action):
+        """
+        Decode an action into (vehicle letter, move, number of cells), as `RushHourEnv`.
+        """
         vehicle = action // 4
         move = action % 4
         move_str = ["U", "D", "L", "R"][move]
         try:
             vehicle_str = self.vehicles_letter[vehicle]
         except IndexError: # if send wrong num_of_vehicle 
-            return None, None
-        return vehicle_str, move_str
+            return None, None, 0
+        return vehicle_str, move_str, 1
 
     def _get_info(self):
         non_empty_cells = np.count_nonzero(self.board.board != "")
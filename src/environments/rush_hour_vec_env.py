@@ -0,0 +1,289 @@
+"""
+Batched Rush Hour environment implementing Stable-Baselines3's `VecEnv` interface.
+
+The N boards live in NumPy arrays (code grids, vehicle positions, lengths and
+orientations), and stepping, rewards and action masks are computed for all of
+them at once. Observations, actions and rewards match `RushHourEnv`; rewards use the
+batched form of the reward function (see `rewards.batched_reward`).
+"""
+import setup_path  # NOQA
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from environments.board import ZOBRIST_KEYS
+from environments.board_templates import BoardTemplates
+from environments.init_boards_from_database import database_boards
+from environments.novelty import NoveltyTracker
+from environments.rewards import basic_reward, batched_reward
+from environments.vehicles import HORIZONTAL, VERTICAL
+
+# Row/column offset of one move, indexed by the move part of an action (U, D, L, R)
+MOVE_ROW = np.array([-1, 1, 0, 0], dtype=np.intp)
+MOVE_COL = np.array([0, 0, -1, 1], dtype=np.intp)
+MOVE_FORWARD = np.array([False, True, False, True])
+MOVE_VERTICAL = np.array([True, True, False, False])
+
+
+class RushHourVecEnv(VecEnv):
+    """
+    N Rush Hour boards stepped together, with automatic reset from the dataset.
+
+    Args:
+        num_envs (int): The number of boards stepped together.
+        num_of_vehicle (int): The number of vehicle slots; the action space has 4 actions per slot.
+        train (bool): Whether to sample the train or the test boards.
+        boards: The boards to sample from. Defaults to the database split.
+        seed (int): Seed of the board sampling.
+        rewards: The reward function; it must have a batched version.
+        history_size (int): Capacity of the visited-states record of every board, used
+            by rewards that read "repeated".
+    """
+
+    def __init__(self, num_envs: int, num_of_vehicle: int = 6, train: bool = True,
+                 boards=None, seed: int = None, rewards=basic_reward, history_size: int = 4096):
+        if boards is None:
+            train_boards, test_boards = database_boards()
+            boards = train_boards if train else test_boards
+        self.boards = boards
+        self.templates = boards if isinstance(boards, BoardTemplates) \
+            else BoardTemplates(boards, num_of_vehicle)
+        if self.templates.mixed_sizes:
+            raise ValueError("RushHourVecEnv needs boards of a single size")
+        self.num_of_vehicle = num_of_vehicle
+        self.max_steps = 200 if train else 100
+        self.render_mode = None
+        self._rng = np.random.default_rng(seed)
+
+        row, col = self.templates.row, self.templates.col
+        self.win_x = (row - 1) // 2
+        self.win_y = col - 1
+        self.grids = np.zeros((num_envs, row, col), dtype=np.uint8)
+        self.rows = np.zeros((num_envs, num_of_vehicle), dtype=np.int8)
+        self.cols = np.zeros((num_envs, num_of_vehicle), dtype=np.int8)
+        self.lengths = np.zeros((num_envs, num_of_vehicle), dtype=np.int8)
+        self.orientations = np.zeros((num_envs, num_of_vehicle), dtype=np.int8)
+        self.letters = np.zeros((num_envs, num_of_vehicle), dtype=np.uint8)
+        self.board_ids = np.zeros(num_envs, dtype=np.int64)
+        self.num_steps = np.zeros(num_envs, dtype=np.int64)
+        self.total_rewards = np.zeros(num_envs, dtype=np.float64)
+        self._actions = None
+
+        self.get_rewards = batched_reward(rewards)
+        # Zobrist hash of every board (as `Board.get_zobrist_hash`), updated by every move
+        self.hashes = np.zeros(num_envs, dtype=np.uint64)
+        self._cell_ids = np.arange(row * col)
+        self.state_histories = None
+        if "repeated" in self.get_rewards.inputs:
+            self.state_histories = [NoveltyTracker(history_size) for _ in range(num_envs)]
+
+        action_space = spaces.Discrete(num_of_vehicle * 4)
+        observation_space = spaces.Box(low=0, high=255, shape=(row * col,), dtype=np.uint8)
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _load(self, env_ids: np.ndarray, board_ids: np.ndarray):
+        """
+        Copy template boards into the given environments.
+        """
+        templates = self.templates
+        self.grids[env_ids] = templates.grids[board_ids]
+        self.rows[env_ids] = templates.rows[board_ids]
+        self.cols[env_ids] = templates.cols[board_ids]
+        self.lengths[env_ids] = templates.lengths[board_ids]
+        self.orientations[env_ids] = templates.orientations[board_ids]
+        self.letters[env_ids] = templates.letters[board_ids]
+        self.board_ids[env_ids] = board_ids
+        self.num_steps[env_ids] = 0
+        self.total_rewards[env_ids] = 0
+
+        grids = self.grids[env_ids].reshape(len(env_ids), -1)
+        keys = np.where(grids != 0, ZOBRIST_KEYS[self._cell_ids, grids], np.uint64(0))
+        self.hashes[env_ids] = np.bitwise_xor.reduce(keys, axis=1)
+        if self.state_histories is not None:
+            for env_id in env_ids:
+                self.state_histories[env_id].reset()
+                self.state_histories[env_id].visit(int(self.hashes[env_id]))
+
+    def _reset_envs(self, env_ids: np.ndarray):
+        self._load(env_ids, self._rng.integers(len(self.templates), size=len(env_ids)))
+
+    def _observations(self) -> np.ndarray:
+        return self.grids.reshape(self.num_envs, -1).copy()
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+        self._reset_envs(np.arange(self.num_envs))
+        return self._observations()
+
+    def step_async(self, actions: np.ndarray):
+        self._actions = np.asarray(actions, dtype=np.intp).reshape(self.num_envs)
+
+    def step_wait(self):
+        env_ids = np.arange(self.num_envs)
+        valid_move, done = self._apply_actions(self._actions)
+        self.num_steps += 1
+        truncated = self.num_steps >= self.max_steps
+
+        rewards = self._compute_rewards(valid_move, done, truncated)
+        if self.state_histories is not None:
+            for env_id in env_ids:
+                self.state_histories[env_id].visit(int(self.hashes[env_id]))
+        self.total_rewards += rewards
+
+        ended = done | truncated
+        infos = [{"red_car_escaped": bool(done[i]), "total_reward": float(self.total_rewards[i])}
+                 for i in env_ids]
+        observations = self._observations()
+        for i in np.flatnonzero(ended):
+            infos[i]["terminal_observation"] = observations[i].copy()
+            infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not done[i])
+        if ended.any():
+            self._reset_envs(np.flatnonzero(ended))
+            observations[ended] = self.grids[ended].reshape(int(ended.sum()), -1)
+        return observations, rewards.astype(np.float32), ended, infos
+
+    def _apply_actions(self, actions: np.ndarray):
+        """
+        Move one vehicle on every board.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Whether each move was valid, and whether
+            each red car reached the exit.
+        """
+        env_ids = np.arange(self.num_envs)
+        slots = np.minimum(actions // 4, self.num_of_vehicle - 1)
+        moves = actions % 4
+
+        rows = self.rows[env_ids, slots].astype(np.intp)
+        cols = self.cols[env_ids, slots].astype(np.intp)
+        lengths = self.lengths[env_ids, slots].astype(np.intp)
+        orientations = self.orientations[env_ids, slots]
+        codes = self.letters[env_ids, slots]
+
+        vertical = orientations == VERTICAL
+        col = self.grids.shape[2]
+        forward = MOVE_FORWARD[moves]
+        # A forward move enters the cell past the vehicle's end, a backward move the one before it
+        step = np.where(forward, lengths, 1)
+        target_rows = rows + MOVE_ROW[moves] * step
+        target_cols = cols + MOVE_COL[moves] * step
+        freed_rows = np.where(forward | ~vertical, rows, rows + lengths - 1)
+        freed_cols = np.where(forward | vertical, cols, cols + lengths - 1)
+
+        valid = (actions // 4 < self.num_of_vehicle) & (codes != 0) & (MOVE_VERTICAL[moves] == vertical)
+        valid &= self._cells_empty(env_ids, target_rows, target_cols)
+
+        moved = np.flatnonzero(valid)
+        self.grids[moved, freed_rows[moved], freed_cols[moved]] = 0
+        self.grids[moved, target_rows[moved], target_cols[moved]] = codes[moved]
+        self.rows[moved, slots[moved]] += MOVE_ROW[moves[moved]].astype(np.int8)
+        self.cols[moved, slots[moved]] += MOVE_COL[moves[moved]].astype(np.int8)
+        freed = freed_rows[moved] * col + freed_cols[moved]
+        target = target_rows[moved] * col + target_cols[moved]
+        self.hashes[moved] ^= ZOBRIST_KEYS[freed, codes[moved]] ^ ZOBRIST_KEYS[target, codes[moved]]
+
+        done = self.grids[:, self.win_x, self.win_y] == ord("X")
+        return valid, done
+
+    def _cells_empty(self, env_ids, rows, cols) -> np.ndarray:
+        """
+        Whether the given cell of each board is inside the board and empty.
+        """
+        _, row, col = self.grids.shape
+        inside = (rows >= 0) & (rows < row) & (cols >= 0) & (cols < col)
+        empty = self.grids[env_ids, np.clip(rows, 0, row - 1), np.clip(cols, 0, col - 1)] == 0
+        return inside & empty
+
+    def _compute_rewards(self, valid_move, done, truncated) -> np.ndarray:
+        """
+        The rewards of the last move of every board, in one call of the batched reward.
+        """
+        inputs = {}
+        if "heuristic" in self.get_rewards.inputs:
+            inputs["heuristic"] = self._heuristics()
+        if "repeated" in self.get_rewards.inputs:
+            inputs["repeated"] = np.array(
+                [int(state_hash) in history
+                 for state_hash, history in zip(self.hashes, self.state_histories)])
+        return self.get_rewards(valid_move, done, truncated, self.num_steps, self.max_steps,
+                                **inputs)
+
+    def _heuristics(self) -> np.ndarray:
+        """
+        `Board.get_heuristic` of every board: the distance of the red car to the exit
+        plus the number of occupied cells in front of it.
+        """
+        _, _, col = self.grids.shape
+        exit_rows = self.grids[:, self.win_x, :]
+        # Column after the red car's last cell
+        red_end = col - np.argmax(exit_rows[:, ::-1] == ord("X"), axis=1)
+        ahead = np.arange(col) >= red_end[:, None]
+        blocking = np.count_nonzero((exit_rows != 0) & ahead, axis=1)
+        return (col - 1 - red_end) + blocking
+
+    def action_masks(self) -> np.ndarray:
+        """
+        Valid actions of every board, shape (N, num_of_vehicle * 4), in the U, D, L, R
+        order of `Board.get_all_valid_actions`.
+        """
+        shape = self.rows.shape
+        env_ids = np.broadcast_to(np.arange(self.num_envs)[:, None], shape)
+        rows = self.rows.astype(np.intp)
+        cols = self.cols.astype(np.intp)
+        lengths = self.lengths.astype(np.intp)
+        vertical = self.orientations == VERTICAL
+        horizontal = (self.orientations == HORIZONTAL) & (self.letters != 0)
+        vertical &= self.letters != 0
+
+        back = self._cells_empty(env_ids, rows - vertical, cols - horizontal)
+        front = self._cells_empty(env_ids, rows + lengths * vertical, cols + lengths * horizontal)
+        masks = np.stack([vertical & back, vertical & front, horizontal & back, horizontal & front],
+                         axis=-1)
+        return masks.reshape(self.num_envs, -1)
+
+    def close(self):
+        pass
+
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        return [value for _ in self._indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        indices = list(self._indices(indices))
+        if method_name == "action_masks":
+            return list(self.action_masks()[indices])
+        result = getattr(self, method_name)(*method_args, **method_kwargs)
+        return [result for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
+
+
+if __name__ == "__main__":
+    import time
+
+    env = RushHourVecEnv(num_envs=1024, num_of_vehicle=16)
+    env.reset()
+    steps = 200
+    start = time.time()
+    for _ in range(steps):
+        # Sample a random valid action per board
+        masks = env.action_masks()
+        actions = np.argmax(np.random.random(masks.shape) * masks, axis=1)
+        env.step(actions)
+    elapsed = time.time() - start
+    print(f"{steps * env.num_envs / elapsed:.0f} steps/s")
@@ -0,0 +1,208 @@
+"""
+Potential-based reward shaping from the exact distance to the goal.
+
+The potential of a state is minus its number of moves to the goal, read from a
+distance table of the episode's start board (see `algorithms.distance_table`), so
+shaping a step costs one binary search. Shaping terms of the form
+`gamma * potential(next) - potential(current)` do not change the optimal policy.
+
+The tables are computed offline, one per start board, by `DistanceTables.precompute`
+(`python src/environments/shaping.py` does it for the training and test boards) and
+stored on disk as sorted hash and distance arrays. Environments only load them: a
+breadth-first search takes seconds per board and would stall the workers. Boards
+without a table, because they were not precomputed or have too many reachable
+states, fall back to `Board.get_heuristic` clamped at 0, a lower bound of the distance.
+"""
+import setup_path  # NOQA
+
+from collections import OrderedDict
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+from tqdm import tqdm
+
+from algorithms.distance_table import distance_table
+from environments.init_boards_from_database import CACHE_FOLDER_NAME, default_database_folder
+
+DISTANCES_FOLDER_NAME = "distances"
+
+
+class DistanceTable:
+    """
+    Distances to the goal of the states reachable from one start board.
+
+    Args:
+        hashes (numpy.ndarray): Sorted `uint64` Zobrist hashes of the states.
+        distances (numpy.ndarray): The `uint16` number of moves to the goal of every state.
+    """
+
+    def __init__(self, hashes: np.ndarray, distances: np.ndarray):
+        self.hashes = hashes
+        self.distances = distances
+
+    @staticmethod
+    def from_dict(table: dict):
+        """
+        Build a table from the output of `distance_table`.
+        """
+        hashes = np.fromiter(table.keys(), dtype=np.uint64, count=len(table))
+        distances = np.fromiter(table.values(), dtype=np.uint16, count=len(table))
+        order = np.argsort(hashes)
+        return DistanceTable(hashes[order], distances[order])
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def get(self, state_hash: int, default=None):
+        """
+        The number of moves to the goal of the state with Zobrist hash `state_hash`,
+        or `default` if the state is not in the table.
+        """
+        state_hash = np.uint64(state_hash)
+        index = np.searchsorted(self.hashes, state_hash)
+        if index < len(self.hashes) and self.hashes[index] == state_hash:
+            return int(self.distances[index])
+        return default
+
+
+EMPTY_TABLE = DistanceTable(np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint16))
+
+
+def _compute_table(args):
+    """
+    Compute the distance table of a board. Runs in the worker processes.
+    """
+    board, max_states = args
+    table = distance_table(board, max_states)
+    return board.get_zobrist_hash(), DistanceTable.from_dict(table or {})
+
+
+class DistanceTables:
+    """
+    Precomputed distance tables of start boards, loaded from disk and kept in memory.
+
+    Args:
+        cache_folder: Folder of the tables. Defaults to `database/.cache/distances`.
+        max_states (int): Boards with more reachable states than this get no table.
+        memory_size (int): The number of tables kept in memory.
+    """
+
+    def __init__(self, cache_folder=None, max_states: int = 200_000, memory_size: int = 64):
+        if cache_folder is None:
+            cache_folder = Path(default_database_folder()) / CACHE_FOLDER_NAME / DISTANCES_FOLDER_NAME
+        self.cache_folder = Path(cache_folder)
+        self.max_states = max_states
+        self.memory_size = memory_size
+        self._tables = OrderedDict()
+
+    def get(self, board) -> DistanceTable:
+        """
+        The distance table of the states reachable from `board`. Empty if the table was
+        not precomputed, or the board is unsolvable or has too many states.
+        """
+        key = board.get_zobrist_hash()
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+            return table
+
+        table = self._load(key)
+        self._tables[key] = table
+        if len(self._tables) > self.memory_size:
+            self._tables.popitem(last=False)
+        return table
+
+    def precompute(self, boards, processes: int = None) -> dict:
+        """
+        Compute and save the tables of `boards` that are not on disk yet.
+
+        Args:
+            boards: The start boards.
+            processes (int): Number of worker processes. Defaults to the number of CPUs.
+
+        Returns:
+            dict: The number of "computed" tables, of boards that were "cached" already and
+            of boards "skipped" because they are unsolvable or have too many states.
+        """
+        stats = dict(computed=0, cached=0, skipped=0)
+        missing = {}
+        for board in boards:
+            key = board.get_zobrist_hash()
+            if self._path(key).exists():
+                stats["cached"] += 1
+            else:
+                missing.setdefault(key, board)
+
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        tasks = [(board, self.max_states) for board in missing.values()]
+        with Pool(processes) as pool:
+            results = pool.imap_unordered(_compute_table, tasks)
+            for key, table in tqdm(results, total=len(tasks), desc="Distance tables", unit=" boards"):
+                # Empty tables are saved too, so the search is not repeated
+                np.savez(self._path(key), hashes=table.hashes, distances=table.distances)
+                stats["computed" if len(table) else "skipped"] += 1
+        return stats
+
+    def _path(self, key: int) -> Path:
+        return self.cache_folder / f"{key:016x}-{self.max_states}.npz"
+
+    def _load(self, key: int) -> DistanceTable:
+        if not self._path(key).exists():
+            return EMPTY_TABLE
+        with np.load(self._path(key)) as data:
+            return DistanceTable(data["hashes"], data["distances"])
+
+
+class DistanceShaping:
+    """
+    Shaping term `scale * (gamma * potential(next) - potential(current))` of every step,
+    with `potential = -distance to the goal`.
+
+    Args:
+        gamma (float): The discount factor of the agent.
+        scale (float): Weight of the shaping term.
+        tables (DistanceTables): Where the precomputed distance tables come from.
+    """
+
+    def __init__(self, gamma: float = 0.99, scale: float = 1.0, tables: DistanceTables = None):
+        self.gamma = gamma
+        self.scale = scale
+        self.tables = tables if tables is not None else DistanceTables()
+        self._table = EMPTY_TABLE
+        self._potential = 0.0
+
+    def potential(self, board) -> float:
+        distance = self._table.get(board.get_zobrist_hash())
+        if distance is None:
+            # `get_heuristic` is -1 with the red car at the exit
+            distance = max(board.get_heuristic(), 0)
+        return -float(distance)
+
+    def reset(self, board):
+        """
+        Start an episode from `board`.
+        """
+        self._table = self.tables.get(board)
+        self._potential = self.potential(board)
+
+    def step(self, board, done: bool) -> float:
+        """
+        The shaping term of the step that led to `board`.
+        """
+        potential = 0.0 if done else self.potential(board)
+        shaping = self.scale * (self.gamma * potential - self._potential)
+        self._potential = potential
+        return shaping
+
+
+def main():
+    from environments.rush_hour_env import RushHourEnv
+
+    tables = DistanceTables()
+    for name, boards in (("train", RushHourEnv.train_boards), ("test", RushHourEnv.test_boards)):
+        print(f"{name}: {tables.precompute(boards)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,20 @@ from abc import ABC
 from typing import List
 
 
+HORIZONTAL = 0
+VERTICAL = 1
+DIRECTION_CODES = {"RL": HORIZONTAL, "UD": VERTICAL}
+DIRECTION_NAMES = ("RL", "UD")
+
+
 class Vehicle(ABC):
     """
     Represents a generic vehicle on the board.
 
+    A vehicle that has not been added to a board keeps its own state. Once a board
+    adopts it, the vehicle becomes a lightweight view over the board's parallel
+    vehicle arrays, so moving it on the board is reflected in `row` and `col`.
+
     Attributes:
         length (int): The number of squares the vehicle occupies.
         direction (str): Whether the vehicle is horizontal or vertical.
@@ -22,12 +32,64 @@ class Vehicle(ABC):
         col (int): The leftmost column position of the vehicle.
     """
 
+    __slots__ = ("_board", "_index", "_length", "_direction", "_letter", "_row", "_col")
+
     def __init__(self, length: int, direction: str, letter: str, row: int, col: int):
+        self._board = None
+        self._index = -1
         self._length = length
         self._direction = direction
         self._letter = letter
-        self.row = row
-        self.col = col
+        self._row = row
+        self._col = col
+
+    @classmethod
+    def view(cls, board, index: int) -> "Vehicle":
+        """
+        Create a vehicle bound to the vehicle arrays of `board` at `index`.
+        """
+        vehicle = cls.__new__(cls)
+        vehicle._board = board
+        vehicle._index = index
+        vehicle._length = int(board.vehicle_lengths[index])
+        vehicle._direction = DIRECTION_NAMES[board.vehicle_orientations[index]]
+        vehicle._letter = chr(board.vehicle_letters[index])
+        vehicle._row = -1
+        vehicle._col = -1
+        return vehicle
+
+    def bind(self, board, index: int):
+        """
+        Turn this vehicle into a view over the vehicle arrays of `board` at `index`.
+        """
+        self._board = board
+        self._index = index
+
+    @property
+    def row(self) -> int:
+        if self._board is None:
+            return self._row
+        return int(self._board.vehicle_rows[self._index])
+
+    @row.setter
+    def row(self, value: int):
+        if self._board is None:
+            self._row = value
+        else:
+            self._board.vehicle_rows[self._index] = value
+
+    @property
+    def col(self) -> int:
+        if self._board is None:
+            return self._col
+        return int(self._board.vehicle_cols[self._index])
+
+    @col.setter
+    def col(self, value: int):
+        if self._board is None:
+            self._col = value
+        else:
+            self._board.vehicle_cols[self._index] = value
 
     @property
     def length(self) -> int:
@@ -49,6 +111,8 @@ class Vehicle(ABC):
             self._direction = "UD"
         else:
             self._direction = "RL"
+        if self._board is not None:
+            self._board.vehicle_orientations[self._index] = DIRECTION_CODES[self._direction]
 
     def get_possible_moves(self, board) -> List[str]:
         """
@@ -89,6 +153,8 @@ class Car(Vehicle):
     A Car is a type of Vehicle with length 2.
     """
 
+    __slots__ = ()
+
     def __init__(self, direction: str, letter: str, row: int = -1, col: int = -1):
         super().__init__(2, direction, letter, row, col)
 
@@ -99,6 +165,8 @@ class RedCar(Car):
     Typically placed at a known position.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("RL", "X", 2, 4)
 
@@ -108,10 +176,23 @@ class Truck(Vehicle):
     A Truck is a type of Vehicle with length 3.
     """
 
+    __slots__ = ()
+
     def __init__(self, direction: str, letter: str, row: int = -1, col: int = -1):
         super().__init__(3, direction, letter, row, col)
 
 
+def vehicle_class(length: int, letter: str) -> type:
+    """
+    Get the vehicle class matching a vehicle's length and letter.
+    """
+    if length == 3:
+        return Truck
+    if letter == "X":
+        return RedCar
+    return Car
+
+
 def create_vehicle(vehicle_data: dict) -> Vehicle:
     """
     Create a vehicle object based on the provided data.
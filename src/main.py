@@ -2,14 +2,14 @@ import time
 from pathlib import Path
 from stable_baselines3 import DQN, A2C
 from sb3_contrib.ppo_mask import MaskablePPO as PPO
-from sb3_contrib.common.wrappers import ActionMasker
 from models.RL_model import RLModel
 from environments.rush_hour_env import RushHourEnv
 from environments.rush_hour_image_env import RushHourImageEnv
 from environments.rewards import basic_reward, per_steps_reward
+from environments.env_factory import make_vec_env
 from utils.analyze_logs import analyze_logs
-from GUI.visualizer import run_visualizer
-from utils.config import MODEL_DIR, LOG_DIR, VIDEO_PATH, NUM_VEHICLES
+from GUI.recorder import record_episode
+from utils.config import MODEL_DIR, LOG_DIR, VIDEO_PATH, NUM_VEHICLES, NUM_WORKERS
 
 def load_model_from_path(model_path, env):
     name = model_path.name.lower()
@@ -29,7 +29,11 @@ def analyze_training_logs(logs_files):
     print("✅ Log analysis completed. Plots displayed.")
 
 
-def visualize_all_models(models_paths):
+def visualize_all_models(models_paths, headless=True):
+    """
+    Record a demo video of every model. Headless recording (see `record_episode`) needs
+    no display and runs at full speed; otherwise the episodes play in a pygame window.
+    """
     print("\n🎥 Generating and saving visualizations for all models...")
     for i, model_path in enumerate(models_paths):
         video_path = VIDEO_PATH.parent / f"{model_path.stem}_demo.mp4"
@@ -41,17 +45,14 @@ def visualize_all_models(models_paths):
         print(
             f"🎬 Visualizing model {i + 1}/{len(models_paths)}: {model_path.name}")
         model = load_model_from_path(model_path, env)
-        run_visualizer(model, env, record=True, output_video=str(video_path))
+        video_path.parent.mkdir(parents=True, exist_ok=True)
+        if headless:
+            record_episode(model, env, str(video_path))
+        else:
+            from GUI.visualizer import run_visualizer  # Needs pygame and a display
+            run_visualizer(model, env, record=True, output_video=str(video_path))
         print(f"✅ Video saved at: {video_path}")
 
-def mask_fn(env):
-    """
-    This function returns the valid action mask for the current state of the env.
-    It must return a boolean np.ndarray of shape (env.action_space.n,)
-    """
-    return env.board.get_all_valid_actions()
-
-
 def main():
     start_time = time.time()
     logs_files = []
@@ -83,10 +84,9 @@ def main():
               f"{'CNN' if cnn else 'MLP'} | "
               f"{'EarlyStopping' if early_stopping else 'FullTraining'} ===")
 
-        # Create environment (must be done before RLModel to get obs_space)
-        env = RushHourImageEnv(NUM_VEHICLES, train=True, rewards=basic_reward, image_size=(128, 128)) \
-            if cnn else RushHourEnv(NUM_VEHICLES, train=True, rewards=basic_reward)
-        env = ActionMasker(env, mask_fn) 
+        # Create environments (must be done before RLModel to get obs_space), one per worker
+        env = make_vec_env(NUM_VEHICLES, num_workers=NUM_WORKERS, cnn=cnn, train=True,
+                           rewards=basic_reward)
 
         model = RLModel(
             model_class=model_class,
@@ -94,11 +94,13 @@ def main():
             model_path=model_path,
             log_file=log_file,
             early_stopping=early_stopping,
-            cnn=cnn
+            cnn=cnn,
+            num_workers=NUM_WORKERS
         )
 
         model.train()
         model.save()
+        env.close()
 
         # Create matching test env and evaluate
         test_env = RushHourImageEnv(NUM_VEHICLES, train=False, rewards=basic_reward, image_size=(128, 128)) \
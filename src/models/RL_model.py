@@ -4,27 +4,56 @@ from pathlib import Path
 from environments.rush_hour_env import RushHourEnv
 from environments.rush_hour_image_env import RushHourImageEnv
 from environments.evaluate import evaluate_model
+from environments.env_factory import make_vec_env
 # You can change to another reward here
 from environments.rewards import basic_reward
 
 from stable_baselines3 import DQN, A2C
 from sb3_contrib.ppo_mask import MaskablePPO as PPO
 from stable_baselines3.common.env_checker import check_env
+from stable_baselines3.common.vec_env import VecEnv
 
 from utils.custom_logger import RushHourCSVLogger
 from models.early_stopping import EarlyStoppingRewardCallback
 
-from models.cnn_policy import RushHourCNN
-from stable_baselines3.common.policies import ActorCriticCnnPolicy
+from models.cnn_policy import RushHourAtlasCNN, RushHourCNN, RushHourGridCNN
+from models.entity_policy import RushHourEntityExtractor, RushHourEntityPolicy
+from models.rollout_buffer import CompactRolloutBuffer
 
-from utils.config import MODEL_PATH, LOG_FILE_PATH, NUM_VEHICLES
+from utils.config import MODEL_PATH, LOG_FILE_PATH, NUM_VEHICLES, NUM_WORKERS
 
 
+def env_attr(env, name: str, default=None):
+    """
+    An attribute of the Rush Hour environment under `env`, a (wrapped) environment or
+    a vector environment of identical ones; `default` if it has none.
+    """
+    if isinstance(env, VecEnv):
+        return env.get_attr(name)[0] if env.has_attr(name) else default
+    return getattr(env.unwrapped, name, default)
+
 
 class RLModel:
+    """
+    Trains, saves and evaluates a Stable-Baselines3 model on Rush Hour.
+
+    `env` may be a single environment or a vector environment. When it is None, a
+    vector environment of `num_workers` action-masked environments is built, one per
+    process, each with its own shard of the train boards and seed `seed + rank`; with
+    `vec_env="numpy"`, `num_workers` boards are stepped together in one
+    `RushHourVecEnv` instead (see `make_vec_env`).
+    """
+
     def __init__(self, model_class, env, model_path, log_file,
-                 early_stopping=True, cnn=False):
+                 early_stopping=True, cnn=False, num_workers=1, seed=None,
+                 num_of_vehicle=NUM_VEHICLES, rewards=basic_reward, observation="codes",
+                 env_kwargs=None, vec_env="gym"):
+        if env is None:
+            env = make_vec_env(num_of_vehicle, num_workers=num_workers, cnn=cnn, train=True,
+                               rewards=rewards, seed=seed, observation=observation,
+                               env_kwargs=env_kwargs, backend=vec_env)
         self.env = env
+        self.num_workers = num_workers
         self.model_class = model_class
         self.model_name = model_class.__name__
         self.model_path = model_path
@@ -35,13 +64,42 @@ class RLModel:
 
         print(f"🧠 Initializing {self.model_name} model...")
 
-        # Select policy and CNN-specific kwargs if needed
-        if self.cnn and self.model_name == "PPO":
-            policy = ActorCriticCnnPolicy
+        # Select policy and CNN-specific kwargs if needed, for the observations the
+        # environment actually returns
+        env_observation = env_attr(self.env, "observation")
+        model_kwargs = {}
+        # `PPO` is MaskablePPO here, whose class name is not "PPO"
+        cnn_ppo = self.cnn and issubclass(model_class, PPO)
+        if cnn_ppo and env_observation == "atlas_codes":
+            policy = "MlpPolicy"
+            # Stores the code grids in the rollout buffer; the extractor renders them
+            model_kwargs = dict(rollout_buffer_class=CompactRolloutBuffer)
+            image_size = tuple(env_attr(self.env, "image_size"))
+            policy_kwargs = dict(
+                features_extractor_class=RushHourAtlasCNN,
+                features_extractor_kwargs=dict(features_dim=128, image_size=image_size)
+            )
+        elif cnn_ppo:
+            policy = "CnnPolicy"
+            # Keeps uint8 images as uint8 in the rollout buffer
+            model_kwargs = dict(rollout_buffer_class=CompactRolloutBuffer)
             policy_kwargs = dict(
                 features_extractor_class=RushHourCNN,
+                features_extractor_kwargs=dict(features_dim=128),
+                normalize_images=False  # RushHourCNN normalizes uint8 images itself
+            )
+        elif env_observation == "grid":
+            policy = "MlpPolicy"
+            policy_kwargs = dict(
+                features_extractor_class=RushHourGridCNN,
                 features_extractor_kwargs=dict(features_dim=128)
             )
+        elif env_observation == "entities":
+            policy = RushHourEntityPolicy
+            policy_kwargs = dict(
+                features_extractor_class=RushHourEntityExtractor,
+                features_extractor_kwargs=dict(embed_dim=32, summary_dim=64)
+            )
         else:
             policy = "MlpPolicy"
             policy_kwargs = None
@@ -50,7 +108,9 @@ class RLModel:
             policy,
             self.env,
             verbose=0,
-            policy_kwargs=policy_kwargs
+            policy_kwargs=policy_kwargs,
+            seed=seed,
+            **model_kwargs
         )
 
     def setup_logging(self):
@@ -92,37 +152,37 @@ class RLModel:
         evaluate_model(model, test_env, episodes)
 
 
-def run(num_of_vehicle, model_class, early_stopping=False, cnn=False):
+def run(num_of_vehicle, model_class, early_stopping=False, cnn=False, num_workers=1, seed=None,
+        observation="codes", env_kwargs=None, vec_env="gym"):
     print("🚀 Creating memory-optimized training environment...")
 
     if cnn:
-        train_env = RushHourImageEnv(
-            num_of_vehicle=num_of_vehicle, train=True,
-            image_size=(128, 128), rewards=basic_reward
-        )
         test_env = RushHourImageEnv(
             num_of_vehicle=num_of_vehicle, train=False,
-            image_size=(128, 128), rewards=basic_reward
+            image_size=(128, 128), rewards=basic_reward, **(env_kwargs or {})
         )
     else:
-        train_env = RushHourEnv(
-            num_of_vehicle=num_of_vehicle, train=True,
-            rewards=basic_reward
-        )
         test_env = RushHourEnv(
             num_of_vehicle=num_of_vehicle, train=False,
-            rewards=basic_reward
+            rewards=basic_reward, observation=observation, **(env_kwargs or {})
         )
 
     check_env(test_env, warn=True)
 
     model = RLModel(
         model_class=model_class,
-        env=train_env,
+        env=None,
         model_path=MODEL_PATH,
         log_file=LOG_FILE_PATH,
         early_stopping=early_stopping,
-        cnn=cnn
+        cnn=cnn,
+        num_workers=num_workers,
+        seed=seed,
+        num_of_vehicle=num_of_vehicle,
+        rewards=basic_reward,
+        observation=observation,
+        env_kwargs=env_kwargs,
+        vec_env=vec_env
     )
 
     model.train()
@@ -138,8 +198,14 @@ if __name__ == "__main__":
         num_of_vehicle=NUM_VEHICLES,
         model_class=PPO,
         early_stopping=True,
-        cnn=True
+        cnn=True,
+        num_workers=NUM_WORKERS
     )
     # Try other setups:
     # run(NUM_VEHICLES, DQN, early_stopping=True, cnn=False)
-    # run(NUM_VEHICLES, A2C, early_stopping=True, cnn=False)
\ No newline at end of file
+    # run(NUM_VEHICLES, A2C, early_stopping=True, cnn=False)
+    # run(NUM_VEHICLES, PPO, early_stopping=True, observation="grid")
+    # run(NUM_VEHICLES, PPO, env_kwargs=dict(action_mode="compact", max_slide=4))
+    # run(NUM_VEHICLES, PPO, cnn=True, env_kwargs=dict(image_dtype="uint8"))
+    # run(NUM_VEHICLES, PPO, cnn=True, env_kwargs=dict(observation="atlas_codes"))
+    # run(NUM_VEHICLES, PPO, num_workers=256, vec_env="numpy")
\ No newline at end of file
@@ -1,13 +1,29 @@
+import numpy as np
 import torch as th
 import torch.nn as nn
+from gymnasium import spaces
+from stable_baselines3.common.preprocessing import is_image_space_channels_first
 from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
 
+import setup_path  # NOQA
+from GUI.board_to_image import tile_atlas
+
 
 class RushHourCNN(BaseFeaturesExtractor):
+    """
+    Features of the image observations of `RushHourImageEnv`.
+
+    Takes float images in [0, 1] or uint8 images in [0, 255], which are normalized
+    here (build the policy with `normalize_images=False`). SB3 transposes uint8
+    images to channels-first, so both layouts are accepted.
+    """
+
     def __init__(self, observation_space, features_dim=64):
         super().__init__(observation_space, features_dim)
 
-        n_input_channels = observation_space.shape[-1]
+        self.channels_first = is_image_space_channels_first(observation_space)
+        self.normalize = observation_space.dtype == np.uint8
+        n_input_channels = observation_space.shape[0 if self.channels_first else -1]
 
         self.cnn = nn.Sequential(
             nn.Conv2d(n_input_channels, 8, kernel_size=3, stride=2, padding=1),
@@ -26,7 +42,82 @@ class RushHourCNN(BaseFeaturesExtractor):
         )
 
     def forward(self, observations: th.Tensor) -> th.Tensor:
-        x = observations.permute(0, 3, 1, 2).float()  # NHWC -> NCHW
+        x = observations.float()
+        if not self.channels_first:
+            x = x.permute(0, 3, 1, 2)  # NHWC -> NCHW
+        if self.normalize:
+            x = x / 255.0
         x = self.cnn(x)
         x = self.linear(x)
         return x
+
+
+class RushHourAtlasCNN(RushHourCNN):
+    """
+    `RushHourCNN` on the (row, col) code observations of `RushHourImageEnv`
+    (observation="atlas_codes").
+
+    The codes are rendered on the device with the environment's tile atlas (see
+    `TileAtlas`): one batched gather gives the same uint8 frames as the image
+    observations of the atlas renderer, so the CNN sees the same pixels while the
+    rollout buffer stores a few bytes per observation.
+
+    Args:
+        image_size (tuple): The image size of the matching image observations.
+    """
+
+    def __init__(self, observation_space, features_dim=64, image_size=(128, 128)):
+        rows, cols = observation_space.shape
+        # Exit cell as in `Board`, scale as in `RushHourImageEnv`
+        atlas = tile_atlas(rows, cols, (rows - 1) // 2, cols - 1, image_size[0] // 6, tuple(image_size))
+        super().__init__(spaces.Box(low=0, high=255, shape=atlas.shape, dtype=np.uint8), features_dim)
+        self._observation_space = observation_space
+        self.image_shape = atlas.shape
+
+        self.register_buffer("palette", th.as_tensor(atlas.palette), persistent=False)
+        self.register_buffer("static_colors", th.as_tensor(atlas.static_colors), persistent=False)
+        self.register_buffer("index", th.as_tensor(atlas.index), persistent=False)
+
+    def render(self, observations: th.Tensor) -> th.Tensor:
+        """
+        The (N, H, W, 3) uint8 frames of a batch of code grids.
+        """
+        n = observations.shape[0]
+        colors = self.palette[observations.reshape(n, -1).long()]
+        colors = th.cat([colors, self.static_colors.expand(n, -1, -1)], dim=1)
+        return colors.reshape(n, -1)[:, self.index].reshape(n, *self.image_shape)
+
+    def forward(self, observations: th.Tensor) -> th.Tensor:
+        return super().forward(self.render(observations))
+
+
+class RushHourGridCNN(BaseFeaturesExtractor):
+    """
+    Features of the one-hot (C, H, W) grid observations of `RushHourEnv`.
+
+    The grid is a few cells wide, so the convolutions keep its resolution
+    (stride 1, padding 1) and the result is flattened instead of pooled.
+    """
+
+    def __init__(self, observation_space, features_dim=128):
+        super().__init__(observation_space, features_dim)
+
+        n_input_channels, height, width = observation_space.shape
+
+        self.cnn = nn.Sequential(
+            nn.Conv2d(n_input_channels, 32, kernel_size=3, stride=1, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(32, 64, kernel_size=3, stride=1, padding=1),
+            nn.ReLU(),
+            nn.Flatten()
+        )
+
+        self.linear = nn.Sequential(
+            nn.Linear(64 * height * width, features_dim),
+            nn.ReLU()
+        )
+
+    def forward(self, observations: th.Tensor) -> th.Tensor:
+        x = self.cnn(observations.float())
+        x = self.linear(x)
+        return x
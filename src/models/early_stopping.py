@@ -10,11 +10,10 @@ class EarlyStoppingRewardCallback(BaseCallback):
         self.reward_history = deque(maxlen=window_size)
 
     def _on_step(self) -> bool:
-        done = self.locals["dones"][0]
-        info = self.locals["infos"][0]
-        reward = info.get("total_reward")
-        if done:
-            self.reward_history.append(reward)
+        for done, info in zip(self.locals["dones"], self.locals["infos"]):
+            if not done:
+                continue
+            self.reward_history.append(info.get("total_reward"))
 
             if len(self.reward_history) == self.window_size:
                 avg_reward = sum(self.reward_history) / self.window_size
@@ -25,4 +24,4 @@ class EarlyStoppingRewardCallback(BaseCallback):
                     print("🛑 Early stopping: reward threshold reached!")
                     return False  # Stop training
 
-        return True
\ No newline at end of file
+        return True
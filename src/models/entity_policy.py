@@ -0,0 +1,143 @@
+from functools import partial
+
+import torch as th
+import torch.nn as nn
+from sb3_contrib.common.maskable.policies import MaskableMultiInputActorCriticPolicy
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
+
+
+class RushHourEntityExtractor(BaseFeaturesExtractor):
+    """
+    Features of the entity observations of `RushHourEnv` (observation="entities").
+
+    Every vehicle row goes through the same encoder, and a masked mean and max over
+    the valid rows give a board summary that does not depend on the vehicle order.
+    The features are the summary followed by every slot's encoding (zero for empty
+    slots), so reordering the slots reorders the encodings the same way and
+    `RushHourEntityPolicy` can still address the per-slot actions.
+
+    Args:
+        observation_space: The entity observation space.
+        embed_dim (int): Size of the encoding of every vehicle.
+        summary_dim (int): Size of the board summary.
+    """
+
+    def __init__(self, observation_space, embed_dim=32, summary_dim=64):
+        num_slots, num_features = observation_space["entities"].shape
+        super().__init__(observation_space, features_dim=summary_dim + num_slots * embed_dim)
+        self.num_slots = num_slots
+        self.embed_dim = embed_dim
+        self.summary_dim = summary_dim
+
+        self.encoder = nn.Sequential(
+            nn.Linear(num_features, embed_dim),
+            nn.ReLU(),
+            nn.Linear(embed_dim, embed_dim),
+            nn.ReLU()
+        )
+        self.context = nn.Sequential(
+            nn.Linear(2 * embed_dim, summary_dim),
+            nn.ReLU()
+        )
+
+    def forward(self, observations) -> th.Tensor:
+        entities = observations["entities"].float()
+        mask = observations["mask"].float().unsqueeze(-1)  # (N, S, 1)
+
+        x = self.encoder(entities) * mask
+        count = mask.sum(dim=1).clamp(min=1)
+        mean = x.sum(dim=1) / count
+        # Encodings are >= 0 after the ReLU, so the zeroed empty slots never win the max
+        maximum = x.max(dim=1).values
+        summary = self.context(th.cat([mean, maximum], dim=1))
+        return th.cat([summary, x.flatten(start_dim=1)], dim=1)
+
+
+class EntityHeads(nn.Module):
+    """
+    Policy and value latents of `RushHourEntityExtractor` features.
+
+    The policy latent of every slot comes from the slot's encoding and the board
+    summary, through layers shared by all slots; the value latent only sees the
+    summary, so it does not depend on the vehicle order.
+    """
+
+    def __init__(self, num_slots: int, embed_dim: int, summary_dim: int, hidden_dim: int = 64):
+        super().__init__()
+        self.num_slots = num_slots
+        self.embed_dim = embed_dim
+        self.summary_dim = summary_dim
+        self.hidden_dim = hidden_dim
+        self.latent_dim_pi = num_slots * hidden_dim
+        self.latent_dim_vf = hidden_dim
+
+        self.slot_net = nn.Sequential(nn.Linear(embed_dim + summary_dim, hidden_dim), nn.ReLU())
+        self.value_net = nn.Sequential(nn.Linear(summary_dim, hidden_dim), nn.ReLU())
+
+    def forward(self, features: th.Tensor) -> tuple[th.Tensor, th.Tensor]:
+        return self.forward_actor(features), self.forward_critic(features)
+
+    def forward_actor(self, features: th.Tensor) -> th.Tensor:
+        summary = features[:, :self.summary_dim]
+        slots = features[:, self.summary_dim:].reshape(-1, self.num_slots, self.embed_dim)
+        summary = summary.unsqueeze(1).expand(-1, self.num_slots, -1)
+        return self.slot_net(th.cat([slots, summary], dim=2)).flatten(start_dim=1)
+
+    def forward_critic(self, features: th.Tensor) -> th.Tensor:
+        return self.value_net(features[:, :self.summary_dim])
+
+
+class SlotActionNet(nn.Module):
+    """
+    Logits of the actions of every slot from the slot's policy latent, with weights
+    shared by all slots. Actions are numbered slot by slot, as in `RushHourEnv.parse_action`.
+    """
+
+    def __init__(self, num_slots: int, hidden_dim: int, actions_per_slot: int):
+        super().__init__()
+        self.num_slots = num_slots
+        self.hidden_dim = hidden_dim
+        self.linear = nn.Linear(hidden_dim, actions_per_slot)
+
+    def forward(self, latent_pi: th.Tensor) -> th.Tensor:
+        slots = latent_pi.reshape(-1, self.num_slots, self.hidden_dim)
+        return self.linear(slots).flatten(start_dim=1)
+
+
+class RushHourEntityPolicy(MaskableMultiInputActorCriticPolicy):
+    """
+    MaskablePPO policy for the entity observations, with `RushHourEntityExtractor`.
+
+    The logits of a vehicle's actions only depend on its own encoding and on the
+    board summary, so permuting the vehicle slots permutes the action logits the
+    same way, and the value does not change.
+
+    Args:
+        hidden_dim (int): Size of the policy latent of every slot and of the value latent.
+        The other arguments are those of `MaskableMultiInputActorCriticPolicy`.
+    """
+
+    def __init__(self, *args, hidden_dim: int = 64, **kwargs):
+        self.hidden_dim = hidden_dim
+        kwargs.setdefault("features_extractor_class", RushHourEntityExtractor)
+        super().__init__(*args, **kwargs)
+
+    def _build_mlp_extractor(self) -> None:
+        extractor = self.features_extractor
+        self.mlp_extractor = EntityHeads(
+            extractor.num_slots, extractor.embed_dim, extractor.summary_dim, self.hidden_dim)
+
+    def _build(self, lr_schedule) -> None:
+        super()._build(lr_schedule)
+        # Replace the dense action layer by one shared across the slots
+        num_slots = self.features_extractor.num_slots
+        self.action_net = SlotActionNet(num_slots, self.hidden_dim, self.action_space.n // num_slots)
+        if self.ortho_init:
+            self.action_net.apply(partial(self.init_weights, gain=0.01))
+        self.optimizer = self.optimizer_class(
+            self.parameters(), lr=lr_schedule(1), **self.optimizer_kwargs)
+
+    def _get_constructor_parameters(self) -> dict:
+        data = super()._get_constructor_parameters()
+        data.update(hidden_dim=self.hidden_dim)
+        return data
@@ -0,0 +1,17 @@
+import numpy as np
+from sb3_contrib.common.maskable.buffers import MaskableRolloutBuffer
+
+
+class CompactRolloutBuffer(MaskableRolloutBuffer):
+    """
+    `MaskableRolloutBuffer` that stores the observations in the dtype of the observation
+    space instead of float32, e.g. uint8 images take a quarter of the memory. The
+    policy receives them unchanged, so its feature extractor must normalize them
+    (see `RushHourCNN`).
+    """
+
+    def reset(self) -> None:
+        super().reset()
+        # The float32 array of the parent is never written, so its pages are never committed
+        self.observations = np.zeros((self.buffer_size, self.n_envs, *self.obs_shape),
+                                     dtype=self.observation_space.dtype)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 MODEL_DIR = Path("models_zip/")  # Directory to store models
 LOG_DIR = Path("logs/csv/")  # Directory to store logs
@@ -9,6 +10,7 @@ VIDEO_PATH = VIDEO_DIR / "rush_hour_demo.mp4"
 
 NUM_VEHICLES = 16
 BOARD_SIZE = 8
+NUM_WORKERS = os.cpu_count() or 1  # Training environments, one process each
 
 CNN_MODEL_PATH = MODEL_DIR / "rush_hour_cnn"
 CNN_LOG_FILE_PATH = LOG_DIR / "run_cnn_latest.csv"
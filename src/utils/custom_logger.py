@@ -8,7 +8,7 @@ class RushHourCSVLogger(BaseCallback):
         super().__init__(verbose)
         self.log_path = Path(log_path)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        self.episode_rewards = []
+        self.episode_rewards = None  # Rewards of the running episode of every env
         self.episode_count = 0
 
         # Initialize the CSV file with headers
@@ -18,28 +18,34 @@ class RushHourCSVLogger(BaseCallback):
                 ["episode", "timesteps", "reward", "red_car_escaped"])
 
     def _on_step(self) -> bool:
-        reward = self.locals["rewards"][0]
-        done = self.locals["dones"][0]
-        self.episode_rewards.append(reward)
-
-        if done:
-            total_reward = sum(self.episode_rewards)
-            info = self.locals.get("infos", [{}])[0]
-            escaped = info.get("red_car_escaped", False)
-
-            # Log to CSV
-            try:
-                with open(self.log_path, mode='a', newline='') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(
-                        [self.episode_count, self.num_timesteps, total_reward, int(escaped)])
-            except Exception as e:
-                print(f"❌ Failed to write log: {e}")
-
-            print(
-                f"[Episode {self.episode_count}] Reward: {total_reward:.2f} | Escaped: {escaped}")
-
-            self.episode_count += 1
-            self.episode_rewards = []
+        rewards = self.locals["rewards"]
+        dones = self.locals["dones"]
+        infos = self.locals.get("infos", [{}] * len(dones))
+        if self.episode_rewards is None:
+            self.episode_rewards = [[] for _ in range(len(dones))]
+
+        for env_index, done in enumerate(dones):
+            self.episode_rewards[env_index].append(rewards[env_index])
+            if done:
+                self._log_episode(env_index, infos[env_index])
 
         return True
+
+    def _log_episode(self, env_index, info):
+        total_reward = sum(self.episode_rewards[env_index])
+        escaped = info.get("red_car_escaped", False)
+
+        # Log to CSV
+        try:
+            with open(self.log_path, mode='a', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(
+                    [self.episode_count, self.num_timesteps, total_reward, int(escaped)])
+        except Exception as e:
+            print(f"❌ Failed to write log: {e}")
+
+        print(
+            f"[Episode {self.episode_count}] Reward: {total_reward:.2f} | Escaped: {escaped}")
+
+        self.episode_count += 1
+        self.episode_rewards[env_index] = []
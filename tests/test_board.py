@@ -0,0 +1,22 @@
+import setup_path  # NOQA
+
+import numpy as np
+
+from environments.board import Board
+from environments.vehicles import HORIZONTAL, VERTICAL
+
+
+def board_with_truck(letter, truck_row=0):
+    return Board.from_arrays(6, 6, np.array([2, truck_row], dtype=np.int8),
+                             np.array([0, 4], dtype=np.int8), np.array([2, 3], dtype=np.int8),
+                             np.array([HORIZONTAL, VERTICAL], dtype=np.int8),
+                             np.array([ord("X"), letter], dtype=np.uint8))
+
+
+def test_zobrist_hash_covers_every_letter_code():
+    board = board_with_truck(200)
+    assert board.get_zobrist_hash() != board_with_truck(201).get_zobrist_hash()
+
+    # The incremental update of a move matches hashing the moved board from scratch
+    assert board.move_vehicle(board.get_vehicle_by_letter(chr(200)), "D")
+    assert board.get_zobrist_hash() == board_with_truck(200, truck_row=1).get_zobrist_hash()
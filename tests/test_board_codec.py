@@ -0,0 +1,37 @@
+import setup_path  # NOQA
+
+import numpy as np
+import pytest
+
+from environments.board import Board
+from environments.board_codec import decode_board, encode_board
+
+EXAMPLE = "AAoooOPooQoOPXXQoOPooQooBoooCCBoRRRo"
+
+
+def test_database_boards_round_trip():
+    for board in Board.load_multiple_boards("database/300_cards_4_cars_1_trucks.json"):
+        text = encode_board(board)
+        decoded = decode_board(text, relabel=False)
+
+        assert len(text) == board.row * board.col
+        assert encode_board(decoded) == text
+        np.testing.assert_array_equal(decoded.grid, board.grid)
+
+
+def test_standard_format_round_trip():
+    board = decode_board(EXAMPLE, relabel=False)
+
+    assert (board.row, board.col, board.num_of_vehicles) == (6, 6, 8)
+    assert encode_board(board) == EXAMPLE
+    assert encode_board(decode_board(EXAMPLE.replace("o", "."), relabel=False)) == EXAMPLE
+
+
+@pytest.mark.parametrize("text", [
+    "AAoooOPooQoOPXXQoOPooQooBoooCCBoRRR",   # not square
+    "AAoooOPooQoOPXXQoOPooQooBoooCCBoRRRR",  # vehicle of 4 cells
+    "AAoooOPooQoOPooQoOPooQooBoooCCBoRRRo",  # no red car
+])
+def test_invalid_boards_are_rejected(text):
+    with pytest.raises(ValueError):
+        decode_board(text)
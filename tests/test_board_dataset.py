@@ -0,0 +1,58 @@
+import setup_path  # NOQA
+
+import pickle
+
+import numpy as np
+import pytest
+
+from environments.board import Board
+from environments.board_dataset import BoardDataset, load_boards_binary, save_boards_binary
+
+BOARD_FILE = "database/300_cards_4_cars_1_trucks.json"
+
+
+def vehicle_arrays(board):
+    return [board.vehicle_rows, board.vehicle_cols, board.vehicle_lengths,
+            board.vehicle_orientations, board.vehicle_letters]
+
+
+def test_binary_round_trip(tmp_path):
+    boards = Board.load_multiple_boards(BOARD_FILE)
+    save_boards_binary(boards, str(tmp_path / "boards.rhb"))
+    dataset = load_boards_binary(str(tmp_path / "boards.rhb"))
+
+    assert len(dataset) == len(boards)
+    assert dataset.num_vehicles.tolist() == [board.num_of_vehicles for board in boards]
+    for board, loaded in zip(boards, dataset):
+        assert (loaded.row, loaded.col) == (board.row, board.col)
+        np.testing.assert_array_equal(loaded.grid, board.grid)
+        for array, loaded_array in zip(vehicle_arrays(board), vehicle_arrays(loaded)):
+            np.testing.assert_array_equal(loaded_array, array)
+        assert (loaded.min_steps, loaded.heuristic) == (board.min_steps, board.heuristic)
+        assert loaded.get_zobrist_hash() == board.get_zobrist_hash()
+
+
+def test_dataset_pickles_by_path(tmp_path):
+    boards = Board.load_multiple_boards(BOARD_FILE)[:3]
+    save_boards_binary(boards, str(tmp_path / "boards.rhb"))
+    dataset = pickle.loads(pickle.dumps(load_boards_binary(str(tmp_path / "boards.rhb"))))
+
+    assert len(dataset) == 3
+    np.testing.assert_array_equal(dataset[2].grid, boards[2].grid)
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "boards.rhb").write_bytes(b"not a board dataset")
+    with pytest.raises(ValueError):
+        BoardDataset(tmp_path / "boards.rhb")
+    with pytest.raises(ValueError):
+        save_boards_binary([], str(tmp_path / "empty.rhb"))
+
+
+@pytest.mark.parametrize("heuristic", [float("inf"), 40000, 2.5])
+def test_rejects_heuristics_out_of_int16(tmp_path, heuristic):
+    board = Board.load_multiple_boards(BOARD_FILE)[0]
+    board.heuristic = heuristic
+    with pytest.raises(ValueError):
+        save_boards_binary([board], str(tmp_path / "boards.rhb"))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,61 @@
+import setup_path  # NOQA
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from environments.board import Board
+from environments.rush_hour_env import RushHourEnv
+from GUI.board_to_image import (RenderCache, cached_board_image, generate_board_image, nearest_samples,
+                                render_batch, render_board_array)
+
+
+BOARDS = [RushHourEnv.train_boards[0], RushHourEnv.train_boards[1], Board()]
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_atlas_matches_pil_at_native_size(board):
+    expected = np.asarray(generate_board_image(board, 20))
+    np.testing.assert_array_equal(render_board_array(board, 20), expected)
+
+
+@pytest.mark.parametrize("scale, size", [
+    (16, (84, 84)), (16, (128, 128)), (50, (84, 84)), (50, (64, 96)), (7, (200, 150)), (80, (33, 41)),
+])
+@pytest.mark.parametrize("board", BOARDS)
+def test_atlas_matches_pil_nearest_resize(board, scale, size):
+    expected = np.asarray(generate_board_image(board, scale).resize(size, Image.NEAREST))
+    np.testing.assert_array_equal(render_board_array(board, scale, size), expected)
+
+
+def test_nearest_samples_match_pil():
+    for src in (8, 96, 400, 457):
+        for dst in (1, 33, 84, 128, 500):
+            row = Image.fromarray(np.arange(src, dtype=np.int32)[None], mode="I")
+            expected = np.asarray(row.resize((dst, 1), Image.NEAREST))[0]
+            np.testing.assert_array_equal(nearest_samples(src, dst), expected)
+
+
+def test_render_batch_matches_single_renders():
+    boards = list(RushHourEnv.train_boards)[:5]
+    frames = render_batch(boards, 16, (84, 84))
+
+    assert frames.shape == (5, 84, 84, 3)
+    for board, frame in zip(boards, frames):
+        np.testing.assert_array_equal(frame, render_board_array(board, 16, (84, 84)))
+
+
+def test_render_cache_drops_least_recently_used_frames():
+    boards = list(RushHourEnv.train_boards)[:3]
+    frame_bytes = render_board_array(boards[0], 10).nbytes
+    cache = RenderCache(max_bytes=2 * frame_bytes)
+
+    frames = [cached_board_image(board, 10, cache=cache) for board in boards[:2]]
+    assert cached_board_image(boards[0], 10, cache=cache) is frames[0]
+    cached_board_image(boards[2], 10, cache=cache)
+
+    assert cache.stats() == {"hits": 1, "misses": 3, "hit_rate": 0.25, "frames": 2,
+                             "nbytes": 2 * frame_bytes}
+    assert cached_board_image(boards[0], 10, cache=cache) is frames[0]
+    assert cached_board_image(boards[1], 10, cache=cache) is not frames[1]
+    assert not frames[0].flags.writeable
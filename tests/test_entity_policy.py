@@ -0,0 +1,72 @@
+import setup_path  # NOQA
+
+import numpy as np
+import torch as th
+from sb3_contrib.common.wrappers import ActionMasker
+from sb3_contrib.ppo_mask import MaskablePPO
+
+from environments.board_codec import decode_board
+from environments.env_factory import mask_fn
+from environments.observations import ENTITY_FEATURES, observation_space
+from environments.rush_hour_env import RushHourEnv
+from models.entity_policy import RushHourEntityExtractor, RushHourEntityPolicy
+
+NUM_SLOTS = 8
+
+
+def entities(rows):
+    observations = {"entities": th.zeros(1, NUM_SLOTS, len(ENTITY_FEATURES)),
+                    "mask": th.zeros(1, NUM_SLOTS)}
+    observations["entities"][0, :len(rows)] = rows
+    observations["mask"][0, :len(rows)] = 1
+    return observations
+
+
+def test_extractor_is_permutation_equivariant():
+    th.manual_seed(0)
+    extractor = RushHourEntityExtractor(observation_space("entities", 6, 6, NUM_SLOTS))
+    rows = th.rand(5, len(ENTITY_FEATURES))
+    order = th.tensor([3, 0, 4, 1, 2])
+
+    features = extractor(entities(rows))
+    permuted = extractor(entities(rows[order]))
+    summary, slots = extractor.summary_dim, features[0, extractor.summary_dim:].view(NUM_SLOTS, -1)
+    th.testing.assert_close(permuted[:, :summary], features[:, :summary])
+    th.testing.assert_close(permuted[0, summary:].view(NUM_SLOTS, -1)[:5], slots[order])
+    # Empty slots have zero encodings
+    assert not slots[5:].any()
+
+
+def test_policy_logits_follow_the_vehicles():
+    th.manual_seed(0)
+    env = RushHourEnv(NUM_SLOTS, observation="entities")
+    policy = RushHourEntityPolicy(env.observation_space, env.action_space, lambda _: 3e-4)
+    rows = th.rand(5, len(ENTITY_FEATURES))
+    order = th.tensor([3, 0, 4, 1, 2])
+
+    with th.no_grad():
+        logits = policy.get_distribution(entities(rows)).distribution.logits.view(NUM_SLOTS, 4)
+        permuted = policy.get_distribution(entities(rows[order])).distribution.logits.view(NUM_SLOTS, 4)
+        th.testing.assert_close(permuted[:5], logits[order])
+        th.testing.assert_close(policy.predict_values(entities(rows[order])),
+                                policy.predict_values(entities(rows)))
+    # Different vehicles get different logits
+    assert not th.allclose(logits[0], logits[1])
+
+
+def test_trains_on_mixed_board_sizes(tmp_path):
+    small = [decode_board("AAoooOPooQoOPXXQoOPooQooBoooCCBoRRRo", relabel=False),
+             decode_board("ooooooooooooXXoBoooooBoooooooooooooo", relabel=False)]
+    boards = small + list(RushHourEnv.train_boards)[:2]
+    env = RushHourEnv(16, boards=boards, observation="entities")
+    sizes = {env.reset(seed=seed) and env.board.row for seed in range(20)}
+    assert sizes == {6, 8}
+
+    model = MaskablePPO(RushHourEntityPolicy, ActionMasker(env, mask_fn), n_steps=64, batch_size=32,
+                        n_epochs=1, seed=0)
+    model.learn(64)
+    model.save(tmp_path / "entities")
+    loaded = MaskablePPO.load(tmp_path / "entities")
+    assert loaded.policy.hidden_dim == model.policy.hidden_dim
+    observation, _ = loaded.policy.obs_to_tensor(env.reset()[0])
+    assert np.isfinite(loaded.policy.predict_values(observation).item())
@@ -0,0 +1,45 @@
+import setup_path  # NOQA
+
+import pytest
+
+from environments.board_codec import decode_board, encode_board
+from environments.board_dataset import load_boards_binary
+from environments.import_puzzles import import_puzzles, main
+
+PUZZLES = [
+    "12 oooBoooooBooAAoBoooooooooooooooooooo 3",
+    "# a comment",
+    "3 ooooooooooooAAoooooooooooooooooooooo 1",
+    "2 ooooooooooooAAoooooBoooooooooooooooo 1",
+]
+
+
+def test_import_into_binary_dataset(tmp_path):
+    txt_path = tmp_path / "puzzles.txt"
+    txt_path.write_text("\n".join(PUZZLES))
+
+    stats = import_puzzles(txt_path, tmp_path / "puzzles.rhb", processes=1)
+    boards = load_boards_binary(str(tmp_path / "puzzles.rhb"))
+
+    assert stats == {"boards": 2, "rejected": 1}
+    expected = [decode_board(PUZZLES[index].split()[1], "A") for index in (0, 2)]
+    assert [encode_board(board) for board in boards] == [encode_board(board) for board in expected]
+
+
+def test_failed_import_leaves_no_temporary_file(tmp_path):
+    txt_path = tmp_path / "puzzles.txt"
+    txt_path.write_text(PUZZLES[0] + "\n" + "o" * 24 + "AA" + "o" * 38)
+
+    with pytest.raises(ValueError):
+        import_puzzles(txt_path, tmp_path / "puzzles.rhb", processes=1)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["puzzles.txt"]
+
+
+def test_main_takes_the_puzzle_file_from_argv(tmp_path):
+    txt_path = tmp_path / "puzzles.txt"
+    txt_path.write_text(PUZZLES[2])
+
+    main([str(txt_path)])
+    assert len(load_boards_binary(str(tmp_path / "puzzles.rhb"))) == 1
+    with pytest.raises(SystemExit):
+        main([])
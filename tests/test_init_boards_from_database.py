@@ -0,0 +1,28 @@
+import setup_path  # NOQA
+
+import shutil
+
+from environments.init_boards_from_database import load_boards_cached
+
+BOARD_FILE = "database/300_cards_4_cars_1_trucks.json"
+
+
+def test_empty_board_files_are_skipped(tmp_path):
+    empty = tmp_path / "empty.json"
+    empty.write_text("[]")
+    train, test = load_boards_cached([empty], tmp_path / "cache")
+    assert len(train) == len(test) == 0
+
+    board_file = shutil.copy(BOARD_FILE, tmp_path)
+    train, test = load_boards_cached([empty, board_file], tmp_path / "cache")
+    assert len(train) + len(test) == 300
+    assert train[0].row == 8
+
+
+def test_split_is_reloaded_from_the_cache(tmp_path):
+    train, test = load_boards_cached([BOARD_FILE], tmp_path)
+    cached_train, cached_test = load_boards_cached([BOARD_FILE], tmp_path)
+
+    assert list(cached_train.indices) == list(train.indices)
+    assert list(cached_test.indices) == list(test.indices)
+    assert cached_train[3].get_board_flatten().tolist() == train[3].get_board_flatten().tolist()
@@ -0,0 +1,25 @@
+import setup_path  # NOQA
+
+import pytest
+
+from environments.novelty import NoveltyTracker
+
+
+def test_counts_visits_and_forgets_the_oldest_state():
+    tracker = NoveltyTracker(capacity=2)
+
+    assert tracker.visit(1) == 1
+    assert tracker.visit(1) == 2
+    tracker.visit(2)
+    tracker.visit(3)
+
+    assert 1 not in tracker and tracker.count(1) == 0
+    assert tracker.count(2) == tracker.count(3) == 1
+    assert len(tracker) == 2
+    tracker.reset()
+    assert len(tracker) == 0
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        NoveltyTracker(capacity=0)
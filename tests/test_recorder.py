@@ -0,0 +1,37 @@
+import setup_path  # NOQA
+
+import imageio.v2 as imageio
+import pytest
+from PIL import Image
+from sb3_contrib.ppo_mask import MaskablePPO
+
+from environments.rush_hour_env import RushHourEnv
+from environments.rush_hour_image_env import RushHourImageEnv
+from GUI.recorder import record_episode
+
+
+def test_masked_episode_of_image_env(tmp_path):
+    env = RushHourImageEnv(16, image_size=(32, 32), boards=RushHourEnv.train_boards, image_dtype="uint8")
+    model = MaskablePPO("MlpPolicy", env, n_steps=64, seed=0)
+    masks = []
+    predict = model.predict
+    model.predict = lambda obs, **kwargs: masks.append(kwargs["action_masks"]) or predict(obs, **kwargs)
+    video = tmp_path / "episode.gif"
+
+    stats = record_episode(model, env, str(video), scale=10)
+
+    assert stats["steps"] == env.num_steps > 0
+    assert all(mask is not None and mask.any() for mask in masks)
+    assert len(imageio.mimread(video)) == stats["steps"] + 1
+
+
+@pytest.mark.filterwarnings("error::DeprecationWarning")
+def test_gif_frames_last_one_over_fps(tmp_path):
+    env = RushHourEnv(16, boards=RushHourEnv.train_boards)
+    model = MaskablePPO("MlpPolicy", env, n_steps=64, seed=0)
+    video = tmp_path / "episode.gif"
+
+    record_episode(model, env, str(video), fps=4, scale=10)
+
+    with Image.open(video) as gif:
+        assert gif.info["duration"] == 250
@@ -0,0 +1,48 @@
+import setup_path  # NOQA
+
+import numpy as np
+from sb3_contrib.common.maskable.utils import is_masking_supported
+from sb3_contrib.common.wrappers import ActionMasker
+
+from environments.env_factory import mask_fn
+from environments.rush_hour_env import RushHourEnv
+from environments.rush_hour_image_env import RushHourImageEnv
+from environments.rush_hour_vec_env import RushHourVecEnv
+from models.cnn_policy import RushHourAtlasCNN, RushHourCNN
+from models.RL_model import PPO, RLModel
+
+
+def image_env(**kwargs):
+    env = RushHourImageEnv(16, image_size=(64, 64), boards=RushHourEnv.train_boards, **kwargs)
+    return ActionMasker(env, mask_fn)
+
+
+def test_cnn_ppo_keeps_uint8_images(tmp_path):
+    model = RLModel(PPO, image_env(image_dtype="uint8"), tmp_path / "model", tmp_path / "log.csv",
+                    cnn=True, num_of_vehicle=16).model
+
+    assert isinstance(model.policy.features_extractor, RushHourCNN)
+    assert not model.policy.normalize_images
+    assert model.rollout_buffer.observations.dtype == np.uint8
+
+
+def test_cnn_ppo_renders_code_observations(tmp_path):
+    env = image_env(observation="atlas_codes")
+    model = RLModel(PPO, env, tmp_path / "model", tmp_path / "log.csv",
+                    cnn=True, num_of_vehicle=16).model
+
+    assert isinstance(model.policy.features_extractor, RushHourAtlasCNN)
+    # Renders frames of the environment's image size
+    assert model.policy.features_extractor.image_shape == (64, 64, 3)
+    assert model.rollout_buffer.observations.dtype == np.uint8
+
+
+def test_trains_on_the_numpy_vec_env(tmp_path):
+    model = RLModel(PPO, None, tmp_path / "model", tmp_path / "log.csv", num_workers=4, seed=0,
+                    num_of_vehicle=16, vec_env="numpy").model
+    assert isinstance(model.get_env().unwrapped, RushHourVecEnv)
+    assert is_masking_supported(model.get_env())
+
+    # One rollout of `n_steps` on every board, and one round of updates
+    model.learn(1)
+    assert model.num_timesteps == model.n_steps * 4
@@ -0,0 +1,16 @@
+import setup_path  # NOQA
+
+from environments.rush_hour_env import RushHourEnv
+from environments.rush_hour_image_env import RushHourImageEnv
+
+
+def test_image_env_parses_actions_like_rush_hour_env():
+    env = RushHourEnv(16)
+    image_env = RushHourImageEnv(16, image_size=(32, 32), boards=RushHourEnv.train_boards)
+    env.reset(seed=1)
+    image_env.reset(seed=1)
+    image_env.vehicles_letter = list(env.vehicles_letter)
+
+    for action in range(env.action_space.n):
+        assert image_env.parse_action(action) == env.parse_action(action)
+    assert env.parse_action(env.action_space.n - 1) == (None, None, 0)
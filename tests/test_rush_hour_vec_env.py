@@ -0,0 +1,40 @@
+import setup_path  # NOQA
+
+import numpy as np
+import pytest
+
+from environments.rewards import (basic_reward, per_steps_reward, reward_function_no_repetition,
+                                  reward_heuristic, valid_moves_reward)
+from environments.rush_hour_env import RushHourEnv
+from environments.rush_hour_vec_env import RushHourVecEnv
+
+
+@pytest.mark.parametrize("rewards", [basic_reward, valid_moves_reward, per_steps_reward,
+                                     reward_function_no_repetition, reward_heuristic])
+@pytest.mark.parametrize("board_id", [0, 7, 42])
+def test_steps_match_rush_hour_env(board_id, rewards):
+    board = RushHourEnv.train_boards[board_id]
+    env = RushHourEnv(16, boards=[board], rewards=rewards)
+    vec_env = RushHourVecEnv(1, 16, boards=[board], rewards=rewards)
+    vec_env.max_steps = env.max_steps
+    rng = np.random.default_rng(board_id)
+
+    obs, _ = env.reset(seed=0)
+    np.testing.assert_array_equal(vec_env.reset()[0], obs)
+    for _ in range(env.max_steps):
+        mask = env.get_action_mask()
+        np.testing.assert_array_equal(vec_env.action_masks()[0], mask)
+        # Mostly valid moves, with some invalid ones for their penalties
+        valid = np.flatnonzero(mask)
+        action = rng.choice(valid) if rng.random() < 0.8 else rng.integers(len(mask))
+
+        obs, reward, done, truncated, _ = env.step(action)
+        vec_obs, vec_rewards, vec_ended, vec_infos = vec_env.step(np.array([action]))
+        assert vec_rewards[0] == pytest.approx(reward)
+        assert vec_ended[0] == (done or truncated)
+        if done or truncated:
+            np.testing.assert_array_equal(vec_infos[0]["terminal_observation"], obs)
+            assert vec_infos[0]["red_car_escaped"] == done
+            break
+        np.testing.assert_array_equal(vec_obs[0], obs)
+        assert int(vec_env.hashes[0]) == env.board.get_zobrist_hash()
@@ -0,0 +1,36 @@
+import setup_path  # NOQA
+
+import json
+
+from algorithms.distance_table import distance_table
+from environments.board import Board
+from environments.shaping import DistanceShaping, DistanceTables
+
+
+def database_boards(count):
+    with open("database/300_cards_4_cars_1_trucks.json") as file:
+        return [Board.from_dict(board) for board in json.load(file)[:count]]
+
+
+def test_precomputed_tables_match_the_search(tmp_path):
+    boards = database_boards(2)
+    assert DistanceTables(tmp_path).precompute(boards, processes=1)["computed"] == 2
+    assert DistanceTables(tmp_path).precompute(boards, processes=1)["cached"] == 2
+
+    tables = DistanceTables(tmp_path)
+    for board in boards:
+        expected = distance_table(board)
+        table = tables.get(board)
+        assert len(table) == len(expected)
+        assert all(table.get(state) == distance for state, distance in expected.items())
+        assert table.get(0) is None
+
+
+def test_shaping_without_table_uses_the_clamped_heuristic(tmp_path):
+    board = database_boards(1)[0]
+    shaping = DistanceShaping(tables=DistanceTables(tmp_path))
+    shaping.reset(board)
+
+    assert len(shaping.tables.get(board)) == 0
+    assert shaping.potential(board) == -max(board.get_heuristic(), 0)
+    assert not list(tmp_path.iterdir())